@@ -0,0 +1,70 @@
+"""Benchmark building an OSCAddressSpace with add_node() and add_nodes().
+
+Build time should grow linearly with the number of nodes, both for a tree where every container has FAN_OUT children
+and for a single container that holds all nodes, whether they are added one at a time or all at once.
+
+Run with:
+    $ python benchmarks/bench_add_nodes.py
+"""
+
+import time
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+SIZES = (1_000, 10_000, 100_000)
+FAN_OUT = 100
+
+
+def make_nodes(number_of_nodes: int) -> list[OSCPathNode]:
+    return [
+        OSCPathNode(
+            f"/rig/fixture{i // FAN_OUT}/channel{i % FAN_OUT}",
+            value=0.0,
+            access=OSCAccess.READWRITE_VALUE,
+        )
+        for i in range(number_of_nodes)
+    ]
+
+
+def make_wide_nodes(number_of_nodes: int) -> list[OSCPathNode]:
+    return [
+        OSCPathNode(f"/rig/channel{i}", value=0.0, access=OSCAccess.READWRITE_VALUE)
+        for i in range(number_of_nodes)
+    ]
+
+
+def time_add_node(nodes: list[OSCPathNode]) -> float:
+    address_space = OSCAddressSpace()
+    start = time.perf_counter()
+    for node in nodes:
+        address_space.add_node(node)
+    return time.perf_counter() - start
+
+
+def time_add_nodes(nodes: list[OSCPathNode]) -> float:
+    address_space = OSCAddressSpace()
+    start = time.perf_counter()
+    address_space.add_nodes(nodes)
+    return time.perf_counter() - start
+
+
+def main():
+    print(
+        f"{'nodes':>10} {'add_node (s)':>14} {'add_nodes (s)':>14} "
+        f"{'add_node, one container (s)':>28} {'add_nodes, one container (s)':>29}"
+    )
+    for size in SIZES:
+        single = time_add_node(make_nodes(size))
+        bulk = time_add_nodes(make_nodes(size))
+        wide_single = time_add_node(make_wide_nodes(size))
+        wide_bulk = time_add_nodes(make_wide_nodes(size))
+        print(
+            f"{size:>10} {single:>14.4f} {bulk:>14.4f} "
+            f"{wide_single:>28.4f} {wide_bulk:>29.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
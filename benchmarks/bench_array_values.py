@@ -0,0 +1,61 @@
+"""Benchmark nodes with many float values, kept in a list compared to a typed array.
+
+Sets the 512 values of a node from an array (as an application that fills a buffer would) and from a tuple (as
+python-osc passes the arguments of a message), renders the VALUE attribute, and measures the memory the values take.
+
+Run with:
+    $ python benchmarks/bench_array_values.py
+"""
+
+import timeit
+import tracemalloc
+from array import array
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+VALUES = 512
+REPEAT = 2_000
+
+
+def main():
+    buffer = array("d", (i / VALUES for i in range(VALUES)))
+    arguments = tuple(buffer)
+
+    print(
+        f"{'node':>6} {'set from array (µs)':>20} {'set from tuple (µs)':>20} "
+        f"{'render VALUE (µs)':>18} {'memory (bytes)':>15}"
+    )
+    for name, initial in (
+        ("list", [0.0] * VALUES),
+        ("array", array("d", bytes(8 * VALUES))),
+    ):
+        node = OSCPathNode("/meters", value=initial, access=OSCAccess.READWRITE_VALUE)
+
+        def set_value(values):
+            node.value = values
+
+        def render():
+            node._mark_changed()
+            node.to_json(OSCQueryAttribute.VALUE)
+
+        timings = [
+            min(timeit.repeat(lambda: set_value(buffer), number=REPEAT, repeat=5)),
+            min(timeit.repeat(lambda: set_value(arguments), number=REPEAT, repeat=5)),
+            min(timeit.repeat(render, number=REPEAT, repeat=5)),
+        ]
+
+        tracemalloc.start()
+        node.value = buffer
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        print(
+            f"{name:>6} {timings[0] / REPEAT * 1e6:>20.2f} {timings[1] / REPEAT * 1e6:>20.2f} "
+            f"{timings[2] / REPEAT * 1e6:>18.2f} {memory:>15,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark dispatching dense OSC bundles to mapped nodes.
+
+Each bundle holds MESSAGES_PER_BUNDLE messages, spread over NODES nodes. Compares python-osc's Dispatcher, which
+calls the wrapper for every message, with BundleDispatcher, which validates the messages of each node in one go,
+once calling the callback per message and once calling a batch callback per node.
+
+Run with:
+    $ python benchmarks/bench_bundle_dispatch.py
+"""
+
+import timeit
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from pythonoscquery.pythonosc_callback_wrapper import BundleDispatcher, map_node
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+NODES = 16
+MESSAGES_PER_BUNDLE = 512
+BUNDLES = 200
+
+
+def callback(*args):
+    pass
+
+
+def build_bundle() -> bytes:
+    builder = OscBundleBuilder(IMMEDIATELY)
+    for i in range(MESSAGES_PER_BUNDLE):
+        message = OscMessageBuilder(f"/layer{i % NODES}/opacity")
+        message.add_arg(i / MESSAGES_PER_BUNDLE)
+        message.add_arg(i)
+        builder.add_content(message.build())
+    return builder.build().dgram
+
+
+def build_dispatcher(dispatcher: Dispatcher, batch: bool) -> Dispatcher:
+    for i in range(NODES):
+        node = OSCPathNode(
+            f"/layer{i}/opacity", value=[0.0, 0], access=OSCAccess.READWRITE_VALUE
+        )
+        map_node(node, dispatcher, callback, batch_callback=callback if batch else None)
+    return dispatcher
+
+
+def main():
+    bundle = build_bundle()
+    dispatchers = {
+        "Dispatcher": build_dispatcher(Dispatcher(), batch=False),
+        "BundleDispatcher": build_dispatcher(BundleDispatcher(), batch=False),
+        "BundleDispatcher (batch callback)": build_dispatcher(
+            BundleDispatcher(), batch=True
+        ),
+    }
+
+    print(f"{'dispatcher':>34} {'messages/s':>12}")
+    for name, dispatcher in dispatchers.items():
+
+        def dispatch():
+            for _ in range(BUNDLES):
+                dispatcher.call_handlers_for_packet(bundle, ("127.0.0.1", 9000))
+
+        seconds = min(timeit.repeat(dispatch, number=1, repeat=5))
+        print(f"{name:>34} {BUNDLES * MESSAGES_PER_BUNDLE / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark the number of OSC messages per second that pass through OSCCallbackWrapper.
+
+Calls the wrapper with the arguments python-osc passes to it, for nodes with different type signatures, and compares
+it to calling the callback directly. Values that already have the right types take the fast path of the validator;
+the last case has ints that stand in for bools, which need to be converted.
+
+Run with:
+    $ python benchmarks/bench_callback_wrapper.py
+"""
+
+import timeit
+
+from pythonosc.dispatcher import Dispatcher
+
+from pythonoscquery.pythonosc_callback_wrapper import map_node
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+MESSAGES = 200_000
+
+CASES = {
+    "1 float": ([0.0], (0.5,)),
+    "4 mixed": ([0, 0.0, "", True], (7, 0.5, "go", False)),
+    "16 floats": ([0.0] * 16, tuple(float(i) for i in range(16))),
+    "bool substitutes": ([True, False, True], (0, 1, 0)),
+}
+
+
+def callback(*args):
+    pass
+
+
+def main():
+    print(
+        f"{'node':>18} {'callback (msg/s)':>17} {'wrapper (msg/s)':>16} {'overhead (µs)':>14}"
+    )
+    for name, (node_value, message_values) in CASES.items():
+        node = OSCPathNode("/bench", value=node_value, access=OSCAccess.READWRITE_VALUE)
+        dispatcher = Dispatcher()
+        handler = map_node(node, dispatcher, callback)
+        wrapper = handler.callback
+        args = (node.full_path, *message_values)
+
+        def call_callback():
+            for _ in range(MESSAGES):
+                callback(*args)
+
+        def call_wrapper():
+            for _ in range(MESSAGES):
+                wrapper(*args)
+
+        callback_seconds = min(timeit.repeat(call_callback, number=1, repeat=5))
+        wrapper_seconds = min(timeit.repeat(call_wrapper, number=1, repeat=5))
+        overhead = (wrapper_seconds - callback_seconds) / MESSAGES * 1e6
+        print(
+            f"{name:>18} {MESSAGES / callback_seconds:>17,.0f} "
+            f"{MESSAGES / wrapper_seconds:>16,.0f} {overhead:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
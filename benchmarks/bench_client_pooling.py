@@ -0,0 +1,100 @@
+"""Benchmark sequential OSCQueryClient queries with and without connection pooling.
+
+The server runs in a separate process. A single client queries a VALUE attribute over and over, once with a new
+connection per request (like bare requests.get() does), and once over the pooled keep-alive session of the client.
+
+Run with:
+    $ python benchmarks/bench_client_pooling.py
+"""
+
+import multiprocessing
+import socket
+import statistics
+import time
+
+import requests
+from zeroconf import ServiceInfo
+
+from pythonoscquery.osc_query_client import OSCQueryClient
+from pythonoscquery.osc_query_service import OSCQueryHTTPHandler, OSCQueryHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+PORT = 9124
+REQUESTS = 1000
+PATH = "/fixture7/channel3"
+
+
+class QuietHandler(OSCQueryHTTPHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(ready: multiprocessing.Event):
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        OSCPathNode(
+            f"/fixture{i // 16}/channel{i % 16}",
+            value=0.0,
+            access=OSCAccess.READWRITE_VALUE,
+        )
+        for i in range(1024)
+    )
+    host_info = OSCHostInfo("Benchmark", {}, "127.0.0.1", PORT, "UDP")
+    server = OSCQueryHTTPServer(
+        address_space, host_info, ("127.0.0.1", PORT), QuietHandler
+    )
+    ready.set()
+    server.serve_forever()
+
+
+class UnpooledSession(requests.Session):
+    """Sends every request like requests.get() does: from a new session, over a new connection."""
+
+    def get(self, url, **kwargs):
+        with requests.Session() as session:
+            return session.get(url, **kwargs)
+
+
+def measure(client: OSCQueryClient) -> list[float]:
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.query_node(PATH)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(ready,))
+    process.start()
+    ready.wait()
+    time.sleep(0.2)
+
+    service_info = ServiceInfo(
+        "_oscjson._tcp.local.",
+        "Benchmark._oscjson._tcp.local.",
+        port=PORT,
+        addresses=[socket.inet_aton("127.0.0.1")],
+    )
+    try:
+        print(f"{'session':<10} {'median (ms)':>12} {'p99 (ms)':>10} {'req/s':>8}")
+        for name, session in (("unpooled", UnpooledSession()), ("pooled", None)):
+            with OSCQueryClient(service_info, session=session) as client:
+                latencies = measure(client)
+            median = statistics.median(latencies)
+            p99 = statistics.quantiles(latencies, n=100)[98]
+            print(
+                f"{name:<10} {median * 1000:>12.3f} {p99 * 1000:>10.3f} "
+                f"{len(latencies) / sum(latencies):>8.0f}"
+            )
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
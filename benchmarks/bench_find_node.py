@@ -0,0 +1,48 @@
+"""Benchmark OSCAddressSpace.find_node() for address spaces of growing size.
+
+The lookup time should stay flat, regardless of the number of nodes in the space.
+
+Run with:
+    $ python benchmarks/bench_find_node.py
+"""
+
+import random
+import timeit
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+SIZES = (100, 10_000, 100_000, 1_000_000)
+FAN_OUT = 100
+LOOKUPS = 10_000
+
+
+def build_address_space(number_of_nodes: int) -> tuple[OSCAddressSpace, list[str]]:
+    address_space = OSCAddressSpace()
+    paths = []
+    for i in range(number_of_nodes):
+        path = f"/group{i // FAN_OUT}/channel{i % FAN_OUT}"
+        address_space.add_node(
+            OSCPathNode(path, value=0.0, access=OSCAccess.READWRITE_VALUE)
+        )
+        paths.append(path)
+    return address_space, paths
+
+
+def main():
+    print(f"{'nodes':>10} {'lookup (µs)':>12}")
+    for size in SIZES:
+        address_space, paths = build_address_space(size)
+        sample = random.choices(paths, k=LOOKUPS)
+
+        def lookup():
+            for path in sample:
+                address_space.find_node(path)
+
+        seconds = min(timeit.repeat(lookup, number=1, repeat=5))
+        print(f"{size:>10} {seconds / LOOKUPS * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
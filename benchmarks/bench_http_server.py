@@ -0,0 +1,101 @@
+"""Load benchmark comparing the threaded and the asyncio OSCQuery HTTP server.
+
+The server runs in a separate process. Many client threads poll a VALUE attribute concurrently. Reports requests per
+second and the 99th percentile latency. Both servers are benchmarked as OSCQueryService runs them, including the size
+of their connection backlog.
+
+Run with:
+    $ python benchmarks/bench_http_server.py
+"""
+
+import http.client
+import multiprocessing
+import statistics
+import threading
+import time
+
+from pythonoscquery.osc_query_async_server import OSCQueryAsyncHTTPServer
+from pythonoscquery.osc_query_service import OSCQueryHTTPHandler, OSCQueryHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+PORT = 9123
+CLIENTS = (16, 64, 256)
+REQUESTS_PER_CLIENT = 50
+PATH = "/fixture7/channel3?VALUE"
+
+
+class QuietHandler(OSCQueryHTTPHandler):
+    # Only keeps the handler from printing every request to stderr
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(use_asyncio: bool, ready: multiprocessing.Event):
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        OSCPathNode(
+            f"/fixture{i // 16}/channel{i % 16}",
+            value=0.0,
+            access=OSCAccess.READWRITE_VALUE,
+        )
+        for i in range(1024)
+    )
+    host_info = OSCHostInfo("Benchmark", {}, "127.0.0.1", PORT, "UDP")
+    if use_asyncio:
+        server = OSCQueryAsyncHTTPServer(address_space, host_info, ("127.0.0.1", PORT))
+    else:
+        server = OSCQueryHTTPServer(
+            address_space, host_info, ("127.0.0.1", PORT), QuietHandler
+        )
+    ready.set()
+    server.serve_forever()
+
+
+def poll(latencies: list[float]):
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", PORT)
+        connection.request("GET", PATH)
+        connection.getresponse().read()
+        connection.close()
+        latencies.append(time.perf_counter() - start)
+
+
+def run(use_asyncio: bool, clients: int) -> tuple[float, float]:
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(use_asyncio, ready))
+    process.start()
+    ready.wait()
+    time.sleep(0.2)
+
+    latencies = []
+    threads = [threading.Thread(target=poll, args=(latencies,)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    process.terminate()
+    process.join()
+
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    return len(latencies) / elapsed, p99
+
+
+def main():
+    print(f"{'server':<10} {'clients':>8} {'req/s':>10} {'p99 (ms)':>10}")
+    for clients in CLIENTS:
+        for use_asyncio, name in ((False, "threading"), (True, "asyncio")):
+            requests_per_second, p99 = run(use_asyncio, clients)
+            print(
+                f"{name:<10} {clients:>8} {requests_per_second:>10.0f} {p99 * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Contention benchmark for the address space lock.
+
+N reader threads stream the root namespace, as the HTTP server does with stream_responses=True, while one writer
+thread keeps adding nodes. Every written chunk sleeps briefly to stand in for a socket write. Compares readers that
+hold a single mutex or the read lock of OSCAddressSpace while streaming with lock-free reads, which is what the
+server does.
+
+Run with:
+    $ python benchmarks/bench_lock_contention.py
+"""
+
+import contextlib
+import threading
+import time
+
+from pythonoscquery.osc_query_http import resolve_request
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+READERS = (1, 2, 4, 8, 16)
+DURATION = 2.0
+CHUNK_WRITE_TIME = 0.0005
+
+
+class Mutex:
+    """Stands in for the read/write lock, but only ever lets one thread in, like a threading.Lock."""
+
+    def __init__(self):
+        self.read_lock = self.write_lock = threading.Lock()
+
+    def __enter__(self):
+        self.write_lock.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.write_lock.release()
+
+
+def build_address_space() -> OSCAddressSpace:
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        OSCPathNode(
+            f"/fixture{i // 16}/channel{i % 16}",
+            value=0.0,
+            access=OSCAccess.READWRITE_VALUE,
+        )
+        for i in range(4096)
+    )
+    return address_space
+
+
+MODES = ("mutex", "rw lock", "lock-free")
+
+
+def run(readers: int, mode: str) -> tuple[float, float]:
+    address_space = build_address_space()
+    if mode == "mutex":
+        address_space._lock = Mutex()
+    if mode == "lock-free":
+        read_lock = contextlib.nullcontext()
+    else:
+        read_lock = address_space.lock.read_lock
+    host_info = OSCHostInfo("Benchmark", {})
+    stop = threading.Event()
+    responses = [0] * readers
+    write_waits = []
+
+    def read(index: int):
+        while not stop.is_set():
+            with read_lock:
+                response = resolve_request(address_space, host_info, "/", stream=True)
+                for _ in response.iter_encoded_body():
+                    time.sleep(CHUNK_WRITE_TIME)
+            responses[index] += 1
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            address_space.add_node(OSCPathNode(f"/added/node{i}"))
+            write_waits.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return sum(responses) / DURATION, max(write_waits)
+
+
+def main():
+    print(f"{'readers':>8}", end="")
+    for mode in MODES:
+        print(f" {mode + ' resp/s':>16} {mode + ' max write (ms)':>24}", end="")
+    print()
+    for readers in READERS:
+        print(f"{readers:>8}", end="")
+        for mode in MODES:
+            throughput, write_wait = run(readers, mode)
+            print(f" {throughput:>16.1f} {write_wait * 1000:>24.1f}", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the overhead of OSCCallbackWrapper over the raw callback, with debug logging switched off and on.
+
+With logging off (the default WARNING level), the debug message of the wrapper must not be formatted, so the overhead
+per message is just the validation and should stay below MAX_OVERHEAD. With DEBUG on, every message is formatted and
+handed to a handler that drops it, which shows what the guard saves.
+
+Run with:
+    $ python benchmarks/bench_logging_overhead.py
+"""
+
+import logging
+import sys
+import timeit
+
+from pythonosc.dispatcher import Dispatcher
+
+from pythonoscquery.pythonosc_callback_wrapper import map_node
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+MESSAGES = 200_000
+
+# Microseconds per message the wrapper may add to the callback with logging off
+MAX_OVERHEAD = 2.0
+
+
+def callback(*args):
+    pass
+
+
+def measure_overhead(wrapper, args: tuple) -> float:
+    """Microseconds per message the wrapper adds to calling the callback directly."""
+
+    def call_callback():
+        for _ in range(MESSAGES):
+            callback(*args)
+
+    def call_wrapper():
+        for _ in range(MESSAGES):
+            wrapper(*args)
+
+    callback_seconds = min(timeit.repeat(call_callback, number=1, repeat=5))
+    wrapper_seconds = min(timeit.repeat(call_wrapper, number=1, repeat=5))
+    return (wrapper_seconds - callback_seconds) / MESSAGES * 1e6
+
+
+def main():
+    node = OSCPathNode(
+        "/bench", value=[0, 0.0, "", True], access=OSCAccess.READWRITE_VALUE
+    )
+    handler = map_node(node, Dispatcher(), callback)
+    args = (node.full_path, 7, 0.5, "go", False)
+
+    wrapper_logger = logging.getLogger("pythonoscquery.pythonosc_callback_wrapper")
+    wrapper_logger.addHandler(logging.NullHandler())
+    wrapper_logger.propagate = False
+
+    wrapper_logger.setLevel(logging.WARNING)
+    overhead_off = measure_overhead(handler.callback, args)
+    wrapper_logger.setLevel(logging.DEBUG)
+    overhead_on = measure_overhead(handler.callback, args)
+
+    print(f"{'logging':>8} {'overhead (µs)':>14}")
+    print(f"{'off':>8} {overhead_off:>14.3f}")
+    print(f"{'DEBUG':>8} {overhead_on:>14.3f}")
+
+    if overhead_off > MAX_OVERHEAD:
+        print(f"Overhead with logging off exceeds {MAX_OVERHEAD} µs per message")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
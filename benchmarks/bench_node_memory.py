@@ -0,0 +1,113 @@
+"""Measure the memory footprint of OSCPathNode instances.
+
+Builds an address space and reports the number of bytes allocated per node, as traced by tracemalloc. The value
+list of each node is included, since every method node owns one.
+
+Compares OSCPathNode with BaselineNode, which stores its fields like OSCPathNode did before it used __slots__: in an
+instance dict, with the OSCQuery attributes in a second dict and the argument types in a list per node.
+
+Run with:
+    $ python benchmarks/bench_node_memory.py
+"""
+
+import gc
+import tracemalloc
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+NUMBER_OF_NODES = 100_000
+FAN_OUT = 100
+
+
+class BaselineNode:
+    """Stores the fields of a node like OSCPathNode did before it used __slots__."""
+
+    def __init__(
+        self,
+        full_path: str,
+        access: OSCAccess = OSCAccess.NO_VALUE,
+        value=None,
+        description: str = None,
+        contents: list = None,
+    ):
+        self._attributes = {}
+        self._attributes[OSCQueryAttribute.FULL_PATH] = full_path
+        self._attributes[OSCQueryAttribute.CONTENTS] = contents
+        if value is not None and not isinstance(value, list):
+            value = [value]
+        self._attributes[OSCQueryAttribute.VALUE] = value if value else None
+        self._attributes[OSCQueryAttribute.TYPE] = (
+            [type(v) for v in value] if value else None
+        )
+        self._attributes[OSCQueryAttribute.ACCESS] = access
+        self._attributes[OSCQueryAttribute.DESCRIPTION] = description
+
+
+def measure(create) -> float:
+    """Return the bytes allocated per node by create()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep_alive = create()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep_alive
+    return (after - before) / NUMBER_OF_NODES
+
+
+def method_nodes(node_class=OSCPathNode):
+    # The paths are created up front, so that they are not part of the measurement
+    paths = [
+        f"/fixture{i // FAN_OUT}/channel{i % FAN_OUT}" for i in range(NUMBER_OF_NODES)
+    ]
+
+    def create():
+        return [
+            node_class(path, value=0.0, access=OSCAccess.READWRITE_VALUE)
+            for path in paths
+        ]
+
+    return create
+
+
+def container_nodes(node_class=OSCPathNode):
+    paths = [f"/container{i}" for i in range(NUMBER_OF_NODES)]
+
+    def create():
+        return [node_class(path) for path in paths]
+
+    return create
+
+
+def address_space():
+    nodes = method_nodes()()
+
+    def create():
+        space = OSCAddressSpace()
+        space.add_nodes(nodes)
+        return space
+
+    return create
+
+
+def main():
+    print(
+        f"{'scenario':<36} {'baseline (bytes/node)':>22} {'OSCPathNode (bytes/node)':>25}"
+    )
+    for name, scenario in (
+        ("method node (one float value)", method_nodes),
+        ("container node", container_nodes),
+    ):
+        baseline = measure(scenario(BaselineNode))
+        current = measure(scenario())
+        print(f"{name:<36} {baseline:>22.1f} {current:>25.1f}")
+    print(
+        f"{'address space overhead (index etc.)':<36} {'':>22} {measure(address_space()):>25.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
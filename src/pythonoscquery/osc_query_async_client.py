@@ -0,0 +1,320 @@
+import asyncio
+import gzip
+import http.client
+import io
+import json
+import logging
+import zlib
+from collections.abc import Iterable
+from typing import Any
+
+from zeroconf import ServiceInfo
+
+from .osc_query_client import (
+    ACCEPT_ENCODING,
+    DEFAULT_TIMEOUT,
+    attribute_from_response,
+    get_service_ip,
+    host_info_from_json,
+    validate_service_info,
+)
+from .osc_query_http import is_keep_alive
+from .shared.osc_host_info import OSCHostInfo
+from .shared.osc_path_node import OSCPathNode
+from .shared.oscquery_spec import OSCQueryAttribute
+
+logger = logging.getLogger(__name__)
+
+# Maximum size of the status line and of each header line of a response
+MAX_LINE_LENGTH = 64 * 1024
+
+# Errors that mean the service couldn't be reached or didn't answer properly. ValueError is raised for lines that
+# exceed MAX_LINE_LENGTH, and EOFError for responses that end early.
+_REQUEST_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    asyncio.TimeoutError,
+    http.client.HTTPException,
+)
+
+_decompressors = {
+    "gzip": gzip.decompress,
+    "deflate": zlib.decompress,
+}
+
+
+class AsyncOSCQueryClient:
+    """Queries an OSCQuery service from an asyncio event loop.
+
+    Offers the queries of OSCQueryClient as coroutines. Requests are sent over a small pool of keep-alive
+    connections, so a single event loop can keep many remote address spaces in sync without a thread per service.
+
+    Example:
+        async with AsyncOSCQueryClient(service_info) as client:
+            node = await client.query_node("/foo")
+    """
+
+    def __init__(
+        self,
+        service_info: ServiceInfo,
+        pool_size: int = 4,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            service_info: The zeroconf service info of the OSCQuery service to query
+            pool_size: Maximum number of connections to the service, and thereby of requests that are sent at once
+            timeout: Seconds to wait for the service, either for connecting and reading alike, or as a
+                (connect timeout, read timeout) tuple. None waits forever.
+        """
+        validate_service_info(service_info)
+
+        self.service_info = service_info
+        self.host = get_service_ip(service_info)
+        self.port = service_info.port
+        if isinstance(timeout, tuple):
+            self.connect_timeout, self.read_timeout = timeout
+        else:
+            self.connect_timeout = self.read_timeout = timeout
+        self.last_json = None
+
+        # JSON of previous node queries with the entity tag it was served with, keyed by path
+        self._cached_json: dict[str, tuple[str, Any]] = {}
+        self._idle_connections: list[
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] = []
+        self._connection_slots = asyncio.Semaphore(pool_size)
+
+    async def query_node(self, node: str = "/") -> OSCPathNode | None:
+        """Query a node and its children.
+        If the node has been queried before and didn't change since, the server doesn't send it again.
+
+        Returns:
+            The node, or None if it doesn't exist or the service couldn't be reached
+        """
+        cached = self._cached_json.get(node)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        try:
+            response = await self._get(node, headers)
+        except _REQUEST_ERRORS as ex:
+            logger.warning(f"Error querying node {node}: {ex!r}")
+            return None
+
+        if response.status == 404:
+            self._cached_json.pop(node, None)
+            return None
+
+        if response.status == 304 and cached:
+            self.last_json = cached[1]
+            return OSCPathNode.from_json(self.last_json)
+
+        if response.status != 200:
+            raise Exception(
+                "Node query error: (HTTP", response.status, ") ", response.body
+            )
+
+        self.last_json = response.json()
+        if "ETag" in response.headers:
+            self._cached_json[node] = (response.headers["ETag"], self.last_json)
+
+        return OSCPathNode.from_json(self.last_json)
+
+    async def query_attribute(self, node: str, attribute: OSCQueryAttribute) -> Any:
+        """Query a single attribute of a node, e.g. its value. Child nodes are not transferred.
+
+        Args:
+            node: The address of the node, e.g. "/foo/bar"
+            attribute: The attribute to query
+        Returns:
+            The attribute as sent by the service, e.g. the list of values for OSCQueryAttribute.VALUE. None if the
+            node doesn't exist or doesn't have the attribute, or if the service couldn't be reached.
+        """
+        try:
+            response = await self._get(f"{node}?{attribute.name}")
+        except _REQUEST_ERRORS as ex:
+            logger.warning(f"Error querying {attribute.name} of {node}: {ex!r}")
+            return None
+
+        return attribute_from_response(
+            response.status, response.json, response.body, attribute
+        )
+
+    async def query_value(self, node: str) -> list[Any] | None:
+        """Query the values of a node. Shortcut for query_attribute(node, OSCQueryAttribute.VALUE)."""
+        return await self.query_attribute(node, OSCQueryAttribute.VALUE)
+
+    async def query_attribute_batch(
+        self, nodes: Iterable[str], attribute: OSCQueryAttribute
+    ) -> dict[str, Any]:
+        """Query a single attribute of many nodes. The queries are sent concurrently, over up to pool_size
+        connections.
+
+        Args:
+            nodes: The addresses of the nodes
+            attribute: The attribute to query
+        Returns:
+            The attribute of each node, keyed by address. See query_attribute().
+        """
+        nodes = list(nodes)
+        attributes = await asyncio.gather(
+            *(self.query_attribute(node, attribute) for node in nodes)
+        )
+        return dict(zip(nodes, attributes))
+
+    async def query_values(self, nodes: Iterable[str]) -> dict[str, list[Any] | None]:
+        """Query the values of many nodes. Shortcut for query_attribute_batch(nodes, OSCQueryAttribute.VALUE)."""
+        return await self.query_attribute_batch(nodes, OSCQueryAttribute.VALUE)
+
+    async def get_host_info(self) -> OSCHostInfo | None:
+        """Query the host info of the service.
+
+        Returns:
+            The host info, or None if the service couldn't be reached
+        """
+        try:
+            response = await self._get("/?HOST_INFO")
+        except _REQUEST_ERRORS as ex:
+            logger.warning(f"Error querying HOST_INFO: {ex!r}")
+            return None
+
+        if response.status != 200:
+            raise Exception(
+                "Node query error: (HTTP", response.status, ") ", response.body
+            )
+
+        return host_info_from_json(response.json(), self.service_info)
+
+    async def close(self):
+        """Close the idle connections to the service."""
+        connections, self._idle_connections = self._idle_connections, []
+        for _, writer in connections:
+            writer.close()
+        for _, writer in connections:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _get(
+        self, path: str, headers: dict[str, str] | None = None
+    ) -> "_Response":
+        request = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Accept-Encoding: {ACCEPT_ENCODING}",
+        ]
+        if headers:
+            request.extend(f"{keyword}: {value}" for keyword, value in headers.items())
+        request = bytes("\r\n".join(request) + "\r\n\r\n", "latin-1")
+
+        async with self._connection_slots:
+            while self._idle_connections:
+                reader, writer = self._idle_connections.pop()
+                try:
+                    return await self._send(reader, writer, request)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The service closed the idle connection in the meantime; try the next one
+                    writer.close()
+
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, limit=MAX_LINE_LENGTH),
+                self.connect_timeout,
+            )
+            return await self._send(reader, writer, request)
+
+    async def _send(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        request: bytes,
+    ) -> "_Response":
+        """Send the request and read the response. Puts the connection back into the pool if it can be reused."""
+        try:
+            writer.write(request)
+            await writer.drain()
+            response, keep_alive = await asyncio.wait_for(
+                self._read_response(reader), self.read_timeout
+            )
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive:
+            self._idle_connections.append((reader, writer))
+        else:
+            writer.close()
+        return response
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> tuple["_Response", bool]:
+        """Read a response.
+        Returns:
+            The response, and whether the connection can be used for further requests
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the service")
+
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line)
+
+        try:
+            version, status = status_line.decode("latin-1").split(maxsplit=2)[:2]
+            status = int(status)
+        except ValueError:
+            raise http.client.BadStatusLine(status_line.decode("latin-1"))
+        headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines)))
+        keep_alive = is_keep_alive(version, headers.get("Connection"))
+
+        if status in (204, 304):
+            body = b""
+        elif headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if size == 0:
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            # Skip the trailer
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = b"".join(chunks)
+        elif "Content-Length" in headers:
+            body = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            # The end of the body is signalled by closing the connection
+            body = await reader.read()
+            keep_alive = False
+
+        encoding = headers.get("Content-Encoding")
+        if encoding in _decompressors:
+            body = _decompressors[encoding](body)
+
+        return _Response(status, headers, body), keep_alive
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.host}:{self.port})"
+
+
+class _Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: http.client.HTTPMessage, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body)
@@ -0,0 +1,238 @@
+import asyncio
+import http.client
+import io
+import logging
+import socket
+import threading
+from http import HTTPStatus
+
+from pythonoscquery.osc_query_http import (
+    LAST_CHUNK,
+    MAX_BATCH_QUERY_SIZE,
+    OSCQueryResponse,
+    encode_chunk,
+    is_keep_alive,
+    request_body_length,
+    resolve_batch_request,
+    resolve_request,
+)
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+
+logger = logging.getLogger(__name__)
+
+
+class OSCQueryAsyncHTTPServer:
+    """OSCQuery HTTP server that serves all connections from a single asyncio event loop.
+
+    Answers the same requests as OSCQueryHTTPServer with OSCQueryHTTPHandler, but doesn't need a thread per
+    connection. Offers the same serve_forever() / shutdown() interface, so it can be run in a thread by
+    OSCQueryService. In an existing asyncio application, await serve() instead.
+    """
+
+    # Size of the queue of connections that are not accepted yet. Bursts of polling clients must not overflow it.
+    request_queue_size = socket.SOMAXCONN
+
+    # Seconds after which an idle connection is closed
+    timeout = 30
+
+    def __init__(
+        self,
+        address_space: OSCAddressSpace,
+        host_info: OSCHostInfo,
+        server_address: tuple[str, int],
+        stream_responses: bool = False,
+    ) -> None:
+        """
+        Args:
+            address_space: OSC address space to serve
+            host_info: Host info to serve
+            server_address: Address and port to bind to. An empty address binds to all interfaces.
+            stream_responses: Write namespace responses in chunks while they are rendered
+        """
+        self.address_space = address_space
+        self.host_info = host_info
+        self.stream_responses = stream_responses
+
+        # Bind right away, so that errors (like a port that is already in use) are raised here
+        self.socket = socket.create_server(
+            server_address, backlog=self.request_queue_size
+        )
+        self.server_address = self.socket.getsockname()[:2]
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_serving: asyncio.Event | None = None
+        self._stopped = threading.Event()
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    def serve_forever(self):
+        """Serve requests on a new event loop until shutdown() is called."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """Serve requests on the running event loop until shutdown() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stop_serving = asyncio.Event()
+        self._stopped.clear()
+        try:
+            server = await asyncio.start_server(
+                self._handle_connection,
+                sock=self.socket,
+                backlog=self.request_queue_size,
+            )
+            async with server:
+                await self._stop_serving.wait()
+                # Idle keep-alive connections would otherwise stay open until they time out
+                for writer in list(self._connections):
+                    writer.close()
+                # Their handlers still wait for the next request, and must end before the loop does
+                for handler in list(self._handlers):
+                    handler.cancel()
+                await asyncio.gather(*self._handlers, return_exceptions=True)
+        finally:
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serving and wait until the server has stopped. Can be called from any other thread."""
+        if self._loop is None:
+            self.socket.close()
+            return
+
+        self._loop.call_soon_threadsafe(self._stop_serving.set)
+        self._stopped.wait()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._connections.add(writer)
+        self._handlers.add(asyncio.current_task())
+        try:
+            keep_alive = True
+            while keep_alive:
+                keep_alive = await self._handle_request(reader, writer)
+        except (ConnectionError, ValueError, asyncio.TimeoutError) as e:
+            # ValueError is raised by the reader for lines that exceed its limit
+            logger.debug("Connection closed: %r", e)
+        except asyncio.CancelledError:
+            # Cancelled by serve() on shutdown. The handler ends normally, as asyncio's stream protocol reports
+            # handlers that end cancelled as errors.
+            logger.debug("Connection closed on shutdown")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Read and answer one request.
+        Returns:
+            Whether the connection should be kept open for further requests
+        """
+        request_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        if not request_line:
+            return False
+
+        header_lines = []
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line)
+
+        try:
+            method, path, version = request_line.decode("latin-1").split()
+            headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines)))
+        except (ValueError, http.client.HTTPException):
+            await self._respond(
+                writer, OSCQueryResponse(400, "Bad request"), "HTTP/1.1", False
+            )
+            return False
+
+        keep_alive = is_keep_alive(version, headers.get("Connection"))
+
+        content_length = request_body_length(headers)
+        if content_length is None:
+            # Without a known length, the end of the body can't be found
+            await self._respond(
+                writer,
+                OSCQueryResponse(
+                    400, "Bad request: invalid Content-Length or Transfer-Encoding"
+                ),
+                version,
+                False,
+            )
+            return False
+        if content_length > MAX_BATCH_QUERY_SIZE:
+            # The body is not read, so the connection can't be used for further requests
+            await self._respond(
+                writer, OSCQueryResponse(413, "Request too large"), version, False
+            )
+            return False
+        # Even where the body is not used, it must not be mistaken for the next request
+        body = await reader.readexactly(content_length) if content_length else b""
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{method} {path} (from {writer.get_extra_info('peername')})")
+        if method == "GET":
+            response = resolve_request(
+                self.address_space,
+                self.host_info,
+                path,
+                stream=self.stream_responses,
+                headers=headers,
+            )
+        elif method == "POST":
+            response = resolve_batch_request(
+                self.address_space, path, body, headers=headers
+            )
+        else:
+            response = OSCQueryResponse(501, f"Unsupported method {method}")
+        return await self._respond(writer, response, version, keep_alive)
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        response: OSCQueryResponse,
+        request_version: str,
+        keep_alive: bool,
+    ) -> bool:
+        """Write the response.
+        Returns:
+            Whether the connection can be kept open for further requests
+        """
+        chunked = request_version != "HTTP/1.0"
+        if response.is_streamed and not chunked:
+            # Without chunked encoding, the end of the body is signalled by closing the connection
+            keep_alive = False
+
+        status = HTTPStatus(response.status)
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-type: text/json"]
+        head.extend(
+            f"{keyword}: {value}" for keyword, value in response.headers.items()
+        )
+        if not keep_alive:
+            head.append("Connection: close")
+        elif request_version == "HTTP/1.0":
+            head.append("Connection: keep-alive")
+
+        if not response.has_body:
+            writer.write(bytes("\r\n".join(head) + "\r\n\r\n", "latin-1"))
+        elif not response.is_streamed:
+            body = response.encoded_body()
+            head.append(f"Content-Length: {len(body)}")
+            writer.write(bytes("\r\n".join(head) + "\r\n\r\n", "latin-1") + body)
+        else:
+            if chunked:
+                head.append("Transfer-Encoding: chunked")
+            writer.write(bytes("\r\n".join(head) + "\r\n\r\n", "latin-1"))
+            for chunk in response.iter_encoded_body():
+                writer.write(encode_chunk(chunk) if chunked else chunk)
+                # Rendering doesn't lock the address space, so slow clients can be waited for between chunks
+                await writer.drain()
+            if chunked:
+                writer.write(LAST_CHUNK)
+
+        await writer.drain()
+        return keep_alive
@@ -1,17 +1,56 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Generic, TypeVar
+
 from zeroconf import ServiceBrowser, ServiceInfo, ServiceListener, Zeroconf
 
-from .osc_query_client import OSCQueryClient
+from .osc_query_client import DEFAULT_TIMEOUT, OSCQueryClient, make_session
 from .shared.osc_host_info import OSCHostInfo
 from .shared.osc_path_node import OSCPathNode
 
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+V = TypeVar("V")
+
+# Seconds that host infos and namespaces of discovered services are cached by default
+DEFAULT_CACHE_TTL = 60.0
+
 
 class OSCQueryBrowser:
-    def __init__(self) -> None:
-        self.listener = OSCQueryListener()
+    def __init__(
+        self,
+        max_workers: int = 16,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_namespaces: bool = False,
+    ) -> None:
+        """
+        Args:
+            max_workers: Maximum number of services that are queried at the same time
+            timeout: Seconds to wait for each service, see OSCQueryClient. A service that doesn't answer in time is
+                skipped.
+            cache_ttl: Seconds that the host info (and namespace) of a service is reused before it is queried again.
+                The cache entry of a service is also dropped when zeroconf announces that it was updated or removed.
+                0 disables caching.
+            cache_namespaces: Also cache the complete namespace of each service, and look up nodes in it instead of
+                querying them. Only use this for services whose namespace is small and rarely changes.
+        """
+        self.timeout = timeout
+        self.cache_namespaces = cache_namespaces
+        self.listener = OSCQueryListener(cache_ttl)
         self.zc = Zeroconf()
         self.browser = ServiceBrowser(
             self.zc, ["_oscjson._tcp.local.", "_osc._udp.local."], self.listener
         )
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="OSCQueryBrowser"
+        )
+        # Shared by the clients of all services, so that connections are kept open between lookups
+        self._session = make_session(hosts=max_workers)
 
     def get_discovered_osc(self):
         return [oscsvc[1] for oscsvc in self.listener.osc_services.items()]
@@ -19,34 +58,197 @@ class OSCQueryBrowser:
     def get_discovered_oscquery(self):
         return [oscjssvc[1] for oscjssvc in self.listener.oscjson_services.items()]
 
-    def find_service_by_name(self, name: str):
-        for svc in self.get_discovered_oscquery():
-            client = OSCQueryClient(svc)
-            if name in client.get_host_info().name:
-                return svc
+    def find_service_by_name(self, name: str) -> ServiceInfo | None:
+        """Find a discovered OSCQuery service whose host info name contains the given name.
+        All services are asked at the same time; the first one that answers with a matching name is returned.
+        """
+        for svc, _ in self.iter_host_infos(lambda host_info: name in host_info.name):
+            return svc
 
         return None
 
     def find_nodes_by_endpoint_address(
         self, address: str
     ) -> list[tuple[ServiceInfo, OSCHostInfo, OSCPathNode]]:
-        svcs = []
-        for svc in self.get_discovered_oscquery():
-            client = OSCQueryClient(svc)
-            hi = client.get_host_info()
+        """Find the node with the given address in all discovered OSCQuery services.
+        Returns:
+            The services that have the node, with their host info and the node, in the order they answered
+        """
+        return list(self.iter_nodes_by_endpoint_address(address))
+
+    def iter_nodes_by_endpoint_address(
+        self, address: str
+    ) -> Iterator[tuple[ServiceInfo, OSCHostInfo, OSCPathNode]]:
+        """Like find_nodes_by_endpoint_address(), but yields each service as soon as it has answered."""
+        return self._iter_services(self._query_node, address)
+
+    def iter_host_infos(
+        self, predicate: Callable[[OSCHostInfo], bool] | None = None
+    ) -> Iterator[tuple[ServiceInfo, OSCHostInfo]]:
+        """Query the host info of all discovered OSCQuery services at the same time.
+        Args:
+            predicate: If given, only services whose host info satisfies it are yielded
+        Returns:
+            Iterator over the services and their host info, as soon as they have answered
+        """
+        return self._iter_services(self._query_host_info, predicate)
+
+    def get_host_info(self, svc: ServiceInfo) -> OSCHostInfo | None:
+        """Get the host info of a discovered service, from the cache if possible.
+        Returns:
+            The host info, or None if the service couldn't be reached
+        """
+        return self._get_cached(
+            self.listener.host_infos, svc, OSCQueryClient.get_host_info
+        )
+
+    def get_namespace(self, svc: ServiceInfo) -> OSCPathNode | None:
+        """Get the complete namespace of a discovered service. It is cached, if cache_namespaces is set.
+        Returns:
+            The root node of the namespace, or None if the service couldn't be reached
+        """
+        if not self.cache_namespaces:
+            return self._get_client(svc).query_node("/")
+        return self._get_cached(
+            self.listener.namespaces, svc, OSCQueryClient.query_node
+        )
+
+    def close(self):
+        """Stop browsing for services."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.zc.close()
+        self.listener.clients.clear()
+        self._session.close()
+
+    def _iter_services(self, query: Callable[..., R | None], *args) -> Iterator[R]:
+        """Run the query for every discovered OSCQuery service in the worker pool.
+        Yields the results that are not None, in the order they arrive. Services that are not queried yet when the
+        iteration is stopped are skipped."""
+        futures = [
+            self._executor.submit(query, svc, *args)
+            for svc in self.get_discovered_oscquery()
+        ]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _query_host_info(
+        self,
+        svc: ServiceInfo,
+        predicate: Callable[[OSCHostInfo], bool] | None,
+    ) -> tuple[ServiceInfo, OSCHostInfo] | None:
+        try:
+            hi = self.get_host_info(svc)
+        except Exception as ex:
+            logger.warning(f"Error querying host info of {svc.name}: {ex!r}")
+            return None
+
+        if hi is None or (predicate is not None and not predicate(hi)):
+            return None
+        return svc, hi
+
+    def _query_node(
+        self, svc: ServiceInfo, address: str
+    ) -> tuple[ServiceInfo, OSCHostInfo, OSCPathNode] | None:
+        try:
+            hi = self.get_host_info(svc)
             if hi is None:
-                continue
-            node = client.query_node(address)
-            if node is not None:
-                svcs.append((svc, hi, node))
+                return None
+            if self.cache_namespaces:
+                namespace = self.get_namespace(svc)
+                node = namespace.find_subnode(address) if namespace else None
+            else:
+                node = self._get_client(svc).query_node(address)
+        except Exception as ex:
+            logger.warning(f"Error querying {address} of {svc.name}: {ex!r}")
+            return None
+
+        if node is None:
+            return None
+        return svc, hi, node
+
+    def _get_cached(
+        self,
+        cache: "ServiceCache[V]",
+        svc: ServiceInfo,
+        query: Callable[[OSCQueryClient], V | None],
+    ) -> V | None:
+        value = cache.get(svc.name)
+        if value is not None:
+            return value
+
+        generation = cache.generation(svc.name)
+        value = query(self._get_client(svc))
+        if value is not None:
+            cache.put(svc.name, value, generation)
+        return value
+
+    def _get_client(self, svc: ServiceInfo) -> OSCQueryClient:
+        """The client for the service. It is kept until the service is updated or removed, so that repeated lookups
+        reuse its connections and cached responses."""
+        client = self.listener.clients.get(svc.name)
+        if client is None or client.service_info is not svc:
+            client = OSCQueryClient(svc, timeout=self.timeout, session=self._session)
+            self.listener.clients[svc.name] = client
+        return client
+
 
-        return svcs
+class ServiceCache(Generic[V]):
+    """Data of discovered services, keyed by service name, that expires after a fixed time.
+
+    Thread-safe. Values that were queried before the service was invalidated are not stored, see generation().
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """
+        Args:
+            ttl: Seconds after which a value expires. With 0, nothing is cached.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, V]] = {}
+        self._generations: dict[str, int] = {}
+
+    def get(self, name: str) -> V | None:
+        """The cached value for the service, or None if there is none or it has expired."""
+        entry = self._entries.get(name)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def generation(self, name: str) -> int:
+        """The number of times the service was invalidated. Read it before querying the value that will be put."""
+        return self._generations.get(name, 0)
+
+    def put(self, name: str, value: V, generation: int):
+        """Cache the value, unless the service has been invalidated since the given generation."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._generations.get(name, 0) == generation:
+                self._entries[name] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, name: str):
+        """Drop the cached value of the service."""
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            self._entries.pop(name, None)
 
 
 class OSCQueryListener(ServiceListener):
-    def __init__(self) -> None:
+    def __init__(self, cache_ttl: float = DEFAULT_CACHE_TTL) -> None:
         self.osc_services = {}
         self.oscjson_services = {}
+        # Host infos and namespaces of OSCQuery services, see OSCQueryBrowser
+        self.host_infos: ServiceCache[OSCHostInfo] = ServiceCache(cache_ttl)
+        self.namespaces: ServiceCache[OSCPathNode] = ServiceCache(cache_ttl)
+        # Clients of OSCQuery services, see OSCQueryBrowser. They share the browser's session, so they aren't closed.
+        self.clients: dict[str, OSCQueryClient] = {}
 
         super().__init__()
 
@@ -56,6 +258,7 @@ class OSCQueryListener(ServiceListener):
 
         if name in self.oscjson_services:
             del self.oscjson_services[name]
+        self._invalidate(name)
 
     def add_service(self, zc: "Zeroconf", type_: str, name: str) -> None:
         if type_ == "_osc._udp.local.":
@@ -68,3 +271,9 @@ class OSCQueryListener(ServiceListener):
             self.osc_services[name] = zc.get_service_info(type_, name)
         elif type_ == "_oscjson._tcp.local.":
             self.oscjson_services[name] = zc.get_service_info(type_, name)
+            self._invalidate(name)
+
+    def _invalidate(self, name: str):
+        self.host_infos.invalidate(name)
+        self.namespaces.invalidate(name)
+        self.clients.pop(name, None)
@@ -1,53 +1,191 @@
+import logging
+from collections.abc import Callable, Iterable
+from typing import Any
+
 import requests
+from requests.adapters import HTTPAdapter
 from zeroconf import ServiceInfo
 
+from .osc_query_http import BATCH_QUERY_EXTENSION
 from .shared.osc_host_info import OSCHostInfo
 from .shared.osc_path_node import OSCPathNode
+from .shared.oscquery_spec import OSCQueryAttribute
 
+logger = logging.getLogger(__name__)
 
-class OSCQueryClient(object):
-    def __init__(self, service_info) -> None:
-        if not isinstance(service_info, ServiceInfo):
-            raise Exception("service_info isn't a ServiceInfo class!")
+# Namespace responses are highly repetitive JSON, so they are requested compressed
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Seconds to wait for a connection to be established, and for the server to send data
+DEFAULT_TIMEOUT = (3.0, 10.0)
 
-        if service_info.type != "_oscjson._tcp.local.":
-            raise Exception("service_info does not represent an OSCQuery service!")
+
+class OSCQueryClient(object):
+    def __init__(
+        self,
+        service_info,
+        pool_size: int = 4,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        session: requests.Session | None = None,
+    ) -> None:
+        """
+        Args:
+            service_info: The zeroconf service info of the OSCQuery service to query
+            pool_size: Number of connections to the service that are kept open for reuse. Only needs to be larger
+                than 1 if the client is used from several threads at once.
+            timeout: Seconds to wait for the service, either for connecting and reading alike, or as a
+                (connect timeout, read timeout) tuple. None waits forever.
+            session: Session to send the requests with, e.g. to share connection pools between clients. By default,
+                the client creates its own session.
+        """
+        validate_service_info(service_info)
 
         self.service_info = service_info
+        self.timeout = timeout
+        self.session = session if session is not None else make_session(pool_size)
         self.last_json = None
+        # JSON of previous node queries with the entity tag it was served with, keyed by URL
+        self._cached_json: dict[str, tuple[str, Any]] = {}
+        # Whether the service announced batch queries in its host info. None until the host info has been queried.
+        self._supports_batch_query: bool | None = None
 
     def _get_query_root(self) -> str:
         return f"http://{self._get_ip_str()}:{self.service_info.port}"
 
     def _get_ip_str(self) -> str:
-        ip_str = ".".join([str(int(num)) for num in self.service_info.addresses[0]])
-        return ip_str
+        return get_service_ip(self.service_info)
 
     def query_node(self, node: str = "/") -> OSCPathNode | None:
+        """Query a node and its children.
+        If the node has been queried before and didn't change since, the server doesn't send it again.
+        """
         url = self._get_query_root() + node
+        cached = self._cached_json.get(url)
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if cached:
+            headers["If-None-Match"] = cached[0]
         r = None
         try:
-            r = requests.get(url)
+            r = self.session.get(url, headers=headers, timeout=self.timeout)
         except Exception as ex:
             print("Error querying node...", ex)
         if r is None:
             return None
 
         if r.status_code == 404:
+            self._cached_json.pop(url, None)
             return None
 
+        if r.status_code == 304 and cached:
+            self.last_json = cached[1]
+            return OSCPathNode.from_json(self.last_json)
+
         if r.status_code != 200:
             raise Exception("Node query error: (HTTP", r.status_code, ") ", r.content)
 
         self.last_json = r.json()
+        if "ETag" in r.headers:
+            self._cached_json[url] = (r.headers["ETag"], self.last_json)
 
         return OSCPathNode.from_json(self.last_json)
 
+    def query_attribute(self, node: str, attribute: OSCQueryAttribute) -> Any:
+        """Query a single attribute of a node, e.g. its value. Child nodes are not transferred.
+
+        Args:
+            node: The address of the node, e.g. "/foo/bar"
+            attribute: The attribute to query
+        Returns:
+            The attribute as sent by the service, e.g. the list of values for OSCQueryAttribute.VALUE. None if the
+            node doesn't exist or doesn't have the attribute, or if the service couldn't be reached.
+        """
+        url = f"{self._get_query_root()}{node}?{attribute.name}"
+        r = None
+        try:
+            r = self.session.get(
+                url, headers={"Accept-Encoding": ACCEPT_ENCODING}, timeout=self.timeout
+            )
+        except Exception as ex:
+            logger.warning(f"Error querying {attribute.name} of {node}: {ex!r}")
+        if r is None:
+            return None
+
+        return attribute_from_response(r.status_code, r.json, r.content, attribute)
+
+    def query_value(self, node: str) -> list[Any] | None:
+        """Query the values of a node. Shortcut for query_attribute(node, OSCQueryAttribute.VALUE)."""
+        return self.query_attribute(node, OSCQueryAttribute.VALUE)
+
+    def query_attribute_batch(
+        self, nodes: Iterable[str], attribute: OSCQueryAttribute
+    ) -> dict[str, Any]:
+        """Query a single attribute of many nodes.
+        If the service supports batch queries, a single request is sent. Otherwise, the nodes are queried one after
+        another, over the same connection.
+
+        Args:
+            nodes: The addresses of the nodes
+            attribute: The attribute to query
+        Returns:
+            The attribute of each node, keyed by address. See query_attribute().
+        """
+        if not self.supports_batch_query():
+            return {node: self.query_attribute(node, attribute) for node in nodes}
+
+        nodes = list(nodes)
+        try:
+            result = self.query_batch(nodes, [attribute])
+        except Exception as ex:
+            logger.warning(
+                f"Error querying {attribute.name} of a batch of nodes: {ex!r}"
+            )
+            return dict.fromkeys(nodes)
+        return {node: (result.get(node) or {}).get(attribute.name) for node in nodes}
+
+    def query_values(self, nodes: Iterable[str]) -> dict[str, list[Any] | None]:
+        """Query the values of many nodes. Shortcut for query_attribute_batch(nodes, OSCQueryAttribute.VALUE)."""
+        return self.query_attribute_batch(nodes, OSCQueryAttribute.VALUE)
+
+    def query_batch(
+        self,
+        nodes: Iterable[str],
+        attributes: Iterable[OSCQueryAttribute] | None = None,
+    ) -> dict[str, dict[str, Any] | None]:
+        """Query many nodes with a single request.
+        The service must support the BATCH_QUERY extension, see supports_batch_query().
+
+        Args:
+            nodes: The addresses of the nodes
+            attributes: The attributes to query of each node. By default, complete nodes are queried.
+        Returns:
+            The JSON of each node, keyed by address, or None for nodes that don't exist
+        Raises:
+            Exception if the service can't be reached or doesn't support batch queries
+        """
+        query = {"PATHS": list(nodes)}
+        if attributes is not None:
+            query["ATTRIBUTES"] = [attribute.name for attribute in attributes]
+        r = self.session.post(
+            self._get_query_root() + "/",
+            json=query,
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            timeout=self.timeout,
+        )
+        if r.status_code != 200:
+            raise Exception("Batch query error: (HTTP", r.status_code, ") ", r.content)
+        return r.json()
+
+    def supports_batch_query(self) -> bool:
+        """Whether the service supports batch queries. Queries the host info once, if it hasn't been queried yet."""
+        if self._supports_batch_query is None:
+            self.get_host_info()
+        return bool(self._supports_batch_query)
+
     def get_host_info(self) -> OSCHostInfo | None:
         url = self._get_query_root() + "/?HOST_INFO"
         r = None
         try:
-            r = requests.get(url)
+            r = self.session.get(url, timeout=self.timeout)
         except Exception:
             # print("Error querying HOST_INFO...", ex)
             pass
@@ -57,21 +195,106 @@ class OSCQueryClient(object):
         if r.status_code != 200:
             raise Exception("Node query error: (HTTP", r.status_code, ") ", r.content)
 
-        json = r.json()
-        hi = OSCHostInfo(json["NAME"], json["EXTENSIONS"])
-        if "OSC_IP" in json:
-            hi.osc_ip = json["OSC_IP"]
-        else:
-            hi.osc_ip = self._get_ip_str()
+        hi = host_info_from_json(r.json(), self.service_info)
+        self._supports_batch_query = bool(hi.extensions.get(BATCH_QUERY_EXTENSION))
+        return hi
 
-        if "OSC_PORT" in json:
-            hi.osc_port = json["OSC_PORT"]
-        else:
-            hi.osc_port = self.service_info.port
+    def close(self):
+        """Close the connections to the service."""
+        self.session.close()
 
-        if "OSC_TRANSPORT" in json:
-            hi.osc_transport = json["OSC_TRANSPORT"]
-        else:
-            hi.osc_transport = "UDP"
+    def __enter__(self):
+        return self
 
-        return hi
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def validate_service_info(service_info):
+    """Raise an exception if the service info doesn't describe an OSCQuery service."""
+    if not isinstance(service_info, ServiceInfo):
+        raise Exception("service_info isn't a ServiceInfo class!")
+
+    if service_info.type != "_oscjson._tcp.local.":
+        raise Exception("service_info does not represent an OSCQuery service!")
+
+
+def get_service_ip(service_info: ServiceInfo) -> str:
+    """The first IPv4 address of the service, e.g. "192.168.1.10"."""
+    return ".".join([str(int(num)) for num in service_info.addresses[0]])
+
+
+def host_info_from_json(
+    json_data: dict[str, Any], service_info: ServiceInfo
+) -> OSCHostInfo:
+    """Create the host info from a HOST_INFO response.
+    Missing OSC connection details are filled in from the service info.
+
+    Args:
+        json_data: The parsed HOST_INFO JSON
+        service_info: The zeroconf service info of the service that sent it
+    Returns:
+        The host info
+    """
+    hi = OSCHostInfo(json_data["NAME"], json_data["EXTENSIONS"])
+    if "OSC_IP" in json_data:
+        hi.osc_ip = json_data["OSC_IP"]
+    else:
+        hi.osc_ip = get_service_ip(service_info)
+
+    if "OSC_PORT" in json_data:
+        hi.osc_port = json_data["OSC_PORT"]
+    else:
+        hi.osc_port = service_info.port
+
+    if "OSC_TRANSPORT" in json_data:
+        hi.osc_transport = json_data["OSC_TRANSPORT"]
+    else:
+        hi.osc_transport = "UDP"
+
+    hi.ws_ip = json_data.get("WS_IP")
+    hi.ws_port = json_data.get("WS_PORT")
+
+    return hi
+
+
+def attribute_from_response(
+    status: int,
+    get_json: Callable[[], Any],
+    content: bytes,
+    attribute: OSCQueryAttribute,
+) -> Any:
+    """Extract the attribute from the response to an attribute query.
+
+    Args:
+        status: HTTP status code of the response
+        get_json: Parses the body of the response
+        content: The body of the response, for error messages
+        attribute: The attribute that was queried
+    Returns:
+        The attribute, or None if the node doesn't exist or doesn't have the attribute
+    """
+    # The service answers "204 No Content" if the node has no value, or the value can't be read
+    if status in (204, 404):
+        return None
+
+    if status != 200:
+        raise Exception("Node query error: (HTTP", status, ") ", content)
+
+    return get_json().get(attribute.name)
+
+
+def make_session(pool_size: int = 4, hosts: int = 1) -> requests.Session:
+    """Create a session that keeps connections open for reuse.
+
+    Args:
+        pool_size: Maximum number of connections per host that are kept open
+        hosts: Number of hosts to keep connections to. Raise it for a session that is shared between clients.
+    Returns:
+        The session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
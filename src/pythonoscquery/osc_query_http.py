@@ -0,0 +1,399 @@
+import json
+import logging
+import secrets
+import urllib
+import zlib
+from collections.abc import Iterable, Iterator, Mapping
+
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+logger = logging.getLogger(__name__)
+
+# Node versions start over with every process. The prefix keeps entity tags from before a restart from matching.
+_ETAG_PREFIX = secrets.token_hex(4)
+
+# Query strings that are understood by the server
+QUERY_ATTRIBUTES = (
+    "HOST_INFO",
+    "FULL_PATH",
+    "CONTENTS",
+    "TYPE",
+    "VALUE",
+    "ACCESS",
+    "RANGE",
+    "DESCRIPTION",
+)
+
+# Name of the extension in the host info that announces batch queries, see resolve_batch_request()
+BATCH_QUERY_EXTENSION = "BATCH_QUERY"
+
+# Maximum size in bytes of the body of a batch query
+MAX_BATCH_QUERY_SIZE = 1024 * 1024
+
+# Streamed responses are collected into chunks of at least this many characters before being written
+CHUNK_SIZE = 64 * 1024
+
+# Supported content encodings, in order of preference
+ENCODINGS = ("gzip", "deflate")
+
+# Namespace responses shorter than this many characters are not compressed, since it wouldn't make them smaller
+MIN_COMPRESSED_SIZE = 256
+
+# Responses with these status codes must not have a body
+NO_BODY_STATUS = (204, 304)
+
+# Terminates a response with chunked transfer encoding
+LAST_CHUNK = b"0\r\n\r\n"
+
+
+class OSCQueryResponse:
+    """The response to an OSCQuery HTTP request, independent of the server implementation that sends it.
+
+    The body is either complete (a string, or bytes that are already encoded), or an iterable of strings that is
+    rendered while the response is written.
+    """
+
+    def __init__(
+        self,
+        status: int,
+        body: str | bytes | Iterable[str] = "",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers if headers is not None else {}
+
+    @property
+    def is_streamed(self) -> bool:
+        return not isinstance(self.body, (str, bytes))
+
+    def encoded_body(self) -> bytes:
+        """The complete body of a response that is not streamed."""
+        if isinstance(self.body, bytes):
+            return self.body
+        return bytes(self.body, "utf-8")
+
+    def iter_encoded_body(self) -> Iterator[bytes]:
+        """The body of a streamed response, in chunks. Compressed, if the response has a Content-Encoding."""
+        chunks = iter_chunks(self.body)
+        encoding = self.headers.get("Content-Encoding")
+        if encoding is None:
+            return chunks
+        return _iter_compressed(chunks, encoding)
+
+    @property
+    def has_body(self) -> bool:
+        return self.status not in NO_BODY_STATUS
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.status}, streamed={self.is_streamed})"
+
+
+def resolve_request(
+    address_space: OSCAddressSpace,
+    host_info: OSCHostInfo,
+    path: str,
+    stream: bool = False,
+    headers: Mapping[str, str] | None = None,
+) -> OSCQueryResponse:
+    """Answer an OSCQuery GET request.
+
+    Namespace responses carry an ETag that changes whenever the node or one of its children changes. If the request
+    sends a matching If-None-Match header, the response is 304 Not Modified without a body.
+
+    Namespace responses are compressed if the request accepts it (see the Accept-Encoding header), unless they are
+    very short.
+
+    Doesn't lock the address space; requests are answered while nodes are added, removed or changed.
+
+    Args:
+        address_space: The address space that is served
+        host_info: The host info that is served
+        path: The request path including the query string, e.g. "/foo/bar?VALUE"
+        stream: Whether namespace responses should be rendered while they are written
+        headers: The request headers
+    Returns:
+        The response to send
+    """
+    parsed_url = urllib.parse.urlparse(path)
+    query_params = urllib.parse.parse_qs(parsed_url.query, keep_blank_values=True)
+
+    for query in query_params:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"   {query}")
+        if query not in QUERY_ATTRIBUTES:
+            logger.error(f"Attribute {query} not understood by server")
+            return OSCQueryResponse(400, f"Attribute {query} not understood by server")
+
+    if "HOST_INFO" in query_params:
+        return OSCQueryResponse(200, host_info.to_json())
+
+    node: OSCPathNode = address_space.find_node(parsed_url.path)
+    if node is None:
+        return OSCQueryResponse(404, "OSC Path not found")
+
+    attribute = None
+    if query_params:
+        query = list(query_params)[0]
+        try:
+            attribute = OSCQueryAttribute(query.upper())
+        except ValueError:
+            return OSCQueryResponse(
+                500,
+                f"Internal server error - Query {query} not mappable to OSC attribute",
+            )
+
+        if attribute is OSCQueryAttribute.VALUE and node.access in (
+            OSCAccess.NO_VALUE,
+            OSCAccess.WRITEONLY_VALUE,
+        ):
+            logger.debug("Attribute %s not valid - node is not accessible.", query)
+            return OSCQueryResponse(204)
+
+    encoding = None
+    if headers is not None:
+        encoding = negotiate_encoding(headers.get("Accept-Encoding"))
+    if encoding is not None and not stream:
+        if len(node.to_json(attribute)) < MIN_COMPRESSED_SIZE:
+            encoding = None
+
+    # The version is read before the body is rendered. If the node changes in between, the body is newer than the
+    # entity tag, which only costs the client a full response next time, but never makes it keep outdated data.
+    etag = make_etag(node, attribute, encoding)
+    response_headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if encoding is not None:
+        response_headers["Content-Encoding"] = encoding
+
+    if headers is not None and etag_matches(etag, headers.get("If-None-Match")):
+        return OSCQueryResponse(304, headers=response_headers)
+
+    if not stream:
+        if encoding is not None:
+            body = node.to_compressed_json(attribute, encoding)
+        else:
+            body = node.to_json(attribute)
+        return OSCQueryResponse(200, body, response_headers)
+
+    return OSCQueryResponse(200, node.iter_json(attribute), response_headers)
+
+
+def resolve_batch_request(
+    address_space: OSCAddressSpace,
+    path: str,
+    body: bytes,
+    headers: Mapping[str, str] | None = None,
+) -> OSCQueryResponse:
+    """Answer a batch query, which reads many nodes with a single request.
+
+    This is an extension of the OSCQuery protocol, announced as BATCH_QUERY in the host info extensions. The client
+    POSTs a JSON object to "/" that lists the paths to read, and optionally the attributes to read from each of them:
+
+        {"PATHS": ["/foo", "/bar/baz"], "ATTRIBUTES": ["VALUE"]}
+
+    The response maps each path to the JSON of its node, like a GET request for it would return. Without ATTRIBUTES,
+    the complete nodes are returned. Paths that don't exist map to null.
+
+        {"/foo": {"VALUE": [1.5]}, "/bar/baz": null}
+
+    All nodes are read while holding the read lock of the address space, so none are added or removed in between.
+
+    Args:
+        address_space: The address space that is served
+        path: The request path
+        body: The request body
+        headers: The request headers
+    Returns:
+        The response to send
+    """
+    if urllib.parse.urlparse(path).path != "/":
+        return OSCQueryResponse(404, "Batch queries must be sent to /")
+
+    try:
+        query = json.loads(body)
+        paths = query["PATHS"]
+        attribute_names = query.get("ATTRIBUTES") or []
+        attributes = list(dict.fromkeys(OSCQueryAttribute(n) for n in attribute_names))
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            raise TypeError("PATHS must be a list of strings")
+        if OSCQueryAttribute.HOST_INFO in attributes:
+            raise ValueError("HOST_INFO is not an attribute of nodes")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.error(f"Invalid batch query: {e!r}")
+        return OSCQueryResponse(400, f"Invalid batch query: {e}")
+
+    with address_space.lock.read_lock:
+        items = [
+            f"{json.dumps(node_path)}: "
+            f"{_render_batch_node(address_space.find_node(node_path), attributes)}"
+            for node_path in dict.fromkeys(paths)
+        ]
+    rendered = "{" + ", ".join(items) + "}"
+
+    response_headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+    encoding = None
+    if headers is not None:
+        encoding = negotiate_encoding(headers.get("Accept-Encoding"))
+    if encoding is None or len(rendered) < MIN_COMPRESSED_SIZE:
+        return OSCQueryResponse(200, rendered, response_headers)
+
+    response_headers["Content-Encoding"] = encoding
+    compressed = b"".join(_iter_compressed([bytes(rendered, "utf-8")], encoding))
+    return OSCQueryResponse(200, compressed, response_headers)
+
+
+def make_etag(
+    node: OSCPathNode,
+    attribute: OSCQueryAttribute | None,
+    encoding: str | None = None,
+) -> str:
+    """The entity tag for the JSON of the node, with the given attribute filter and content encoding."""
+    query = attribute.name if attribute is not None else ""
+    return f'"{_ETAG_PREFIX}-{node.version}-{query}-{encoding or ""}"'
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Choose the content encoding for a response.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding request header, e.g. "gzip, deflate;q=0.5"
+    Returns:
+        The supported encoding that the client prefers, or None if the response should not be compressed
+    """
+    if not accept_encoding:
+        return None
+
+    # Quality of each listed coding. "*" stands for all codings that are not listed themselves.
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        qualities[coding] = quality
+
+    best = None
+    best_quality = 0.0
+    # On equal quality, the encoding that comes first in ENCODINGS is kept
+    for coding in ENCODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best = coding
+            best_quality = quality
+
+    return best
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Whether the entity tag matches a value of an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def iter_chunks(parts: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join the given string parts into encoded chunks of at least chunk_size characters (except for the last one)."""
+    buffered = []
+    size = 0
+    for part in parts:
+        buffered.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield bytes("".join(buffered), "utf-8")
+            buffered.clear()
+            size = 0
+
+    if buffered:
+        yield bytes("".join(buffered), "utf-8")
+
+
+def is_keep_alive(request_version: str, connection: str | None) -> bool:
+    """Whether the connection should be kept open after the response.
+
+    Args:
+        request_version: HTTP version of the request, e.g. "HTTP/1.1"
+        connection: Value of the "Connection" request header, if any
+    """
+    tokens = [t.strip().lower() for t in connection.split(",")] if connection else []
+    if "close" in tokens:
+        return False
+    if request_version == "HTTP/1.0":
+        return "keep-alive" in tokens
+    return request_version.startswith("HTTP/1.")
+
+
+def request_body_length(headers) -> int | None:
+    """The length of the body of a request, from its headers.
+
+    Args:
+        headers: The request headers
+    Returns:
+        The number of bytes in the body, or None if the end of the body can't be determined: The Content-Length is
+        not a non-negative integer, or the body is sent with a transfer coding, which the servers don't decode.
+        Such a request must be answered with 400, and the connection closed.
+    """
+    if headers.get("Transfer-Encoding") is not None:
+        return None
+
+    content_length = headers.get("Content-Length")
+    if content_length is None:
+        return 0
+    content_length = content_length.strip()
+    if not (content_length.isascii() and content_length.isdigit()):
+        return None
+    return int(content_length)
+
+
+def encode_chunk(data: bytes) -> bytes:
+    """Frame the data as one chunk of an HTTP response with chunked transfer encoding."""
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+def _render_batch_node(
+    node: OSCPathNode | None, attributes: list[OSCQueryAttribute]
+) -> str:
+    if node is None:
+        return "null"
+    if not attributes:
+        return node.to_json()
+
+    items = []
+    for attribute in attributes:
+        if attribute is OSCQueryAttribute.VALUE and node.access in (
+            OSCAccess.NO_VALUE,
+            OSCAccess.WRITEONLY_VALUE,
+        ):
+            continue
+        # Reuse the cached JSON of the single attribute, without its braces
+        rendered = node.to_json(attribute)[1:-1]
+        if rendered:
+            items.append(rendered)
+    return "{" + ", ".join(items) + "}"
+
+
+def _iter_compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    # gzip and zlib (HTTP "deflate") format only differ in the header and trailer
+    wbits = 31 if encoding == "gzip" else 15
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,18 +1,32 @@
 import atexit
 import ipaddress
 import logging
+import socket
 import threading
-import urllib
+from collections.abc import Iterable
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from ipaddress import IPv4Address, IPv6Address
 
 from zeroconf import ServiceInfo, Zeroconf
 
-from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.osc_query_async_server import OSCQueryAsyncHTTPServer
+from pythonoscquery.osc_query_http import (
+    BATCH_QUERY_EXTENSION,
+    LAST_CHUNK,
+    MAX_BATCH_QUERY_SIZE,
+    NO_BODY_STATUS,
+    encode_chunk,
+    request_body_length,
+    resolve_batch_request,
+    resolve_request,
+)
+from pythonoscquery.osc_query_ws import (
+    DEFAULT_MAX_SEND_RATE,
+    LISTEN_EXTENSION,
+    OSCQueryWebSocketServer,
+)
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
 from pythonoscquery.shared.osc_host_info import OSCHostInfo
-from pythonoscquery.shared.osc_path_node import OSCPathNode
-from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +43,10 @@ class OSCQueryService:
         http_port: int,
         osc_port: int,
         osc_ip: IPv4Address | IPv6Address | str = "127.0.0.1",
+        stream_responses: bool = False,
+        use_asyncio: bool = False,
+        ws_port: int | None = None,
+        ws_max_send_rate: float | None = DEFAULT_MAX_SEND_RATE,
     ) -> None:
         """
         Args:
@@ -37,14 +55,27 @@ class OSCQueryService:
             http_port: TCP port number for the oscquery HTTP server
             osc_port: TCP/UDP port number that is announced for the osc server
             osc_ip: IP address of the oscquery server. This is also announced as the ip for the osc server
+            stream_responses: Stream namespace responses in chunks while they are rendered, instead of rendering
+                (and caching) the complete JSON document first. Keeps memory usage flat for huge address spaces.
+            use_asyncio: Serve HTTP from a single asyncio event loop instead of one thread per connection. Scales
+                better with many concurrently polling clients.
+            ws_port: TCP port number for a WebSocket server that pushes value changes to clients that LISTEN to
+                nodes. It is announced in the host info. None doesn't start a WebSocket server.
+            ws_max_send_rate: Maximum number of value updates sent to each WebSocket client per second. Values that
+                change more often are coalesced, see OSCQueryWebSocketServer.
         """
         self._address_space = address_space
         self.server_name = server_name
         self.http_port = http_port
         self.osc_port = osc_port
         self.osc_ip = ipaddress.ip_address(osc_ip)
+        self.stream_responses = stream_responses
+        self.use_asyncio = use_asyncio
+        self.ws_port = ws_port
+        self.ws_max_send_rate = ws_max_send_rate
         self.zeroconf = None
         self.http_server = None
+        self.ws_server = None
 
         self.host_info = OSCHostInfo(
             server_name,
@@ -54,11 +85,16 @@ class OSCQueryService:
                 "RANGE": False,
                 "TYPE": True,
                 "VALUE": True,
+                BATCH_QUERY_EXTENSION: True,
             },
             str(self.osc_ip),
             self.osc_port,
             "UDP",
         )
+        if ws_port is not None:
+            self.host_info.ws_ip = str(self.osc_ip)
+            self.host_info.ws_port = ws_port
+            self.host_info.extensions[LISTEN_EXTENSION] = True
 
         def cleanup():
             self.stop()
@@ -67,18 +103,41 @@ class OSCQueryService:
 
     def start(self):
         if not self.http_server:
-            self.http_server = OSCQueryHTTPServer(
-                self._address_space,
-                self.host_info,
-                ("", self.http_port),
-                OSCQueryHTTPHandler,
+            if self.use_asyncio:
+                self.http_server = OSCQueryAsyncHTTPServer(
+                    self._address_space,
+                    self.host_info,
+                    ("", self.http_port),
+                    stream_responses=self.stream_responses,
+                )
+            else:
+                self.http_server = OSCQueryHTTPServer(
+                    self._address_space,
+                    self.host_info,
+                    ("", self.http_port),
+                    OSCQueryHTTPHandler,
+                    stream_responses=self.stream_responses,
+                )
+            http_thread = threading.Thread(
+                target=self.http_server.serve_forever, daemon=True
             )
-            http_thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
             http_thread.start()
             logger.info(
                 f"Service started as {self.server_name} on {self.osc_ip}:{self.http_port}"
             )
 
+        if self.ws_port is not None and not self.ws_server:
+            self.ws_server = OSCQueryWebSocketServer(
+                self._address_space,
+                ("", self.ws_port),
+                max_send_rate=self.ws_max_send_rate,
+            )
+            ws_thread = threading.Thread(
+                target=self.ws_server.serve_forever, daemon=True
+            )
+            ws_thread.start()
+            logger.info(f"WebSocket server started on {self.osc_ip}:{self.ws_port}")
+
         if not self.zeroconf:
             self.zeroconf = Zeroconf(interfaces=[str(self.osc_ip)])
             self._advertise_osc_query_service(self.zeroconf)
@@ -90,6 +149,11 @@ class OSCQueryService:
             self.http_server.shutdown()
             self.http_server = None
 
+        if self.ws_server:
+            logger.debug("Stopping WebSocket server")
+            self.ws_server.shutdown()
+            self.ws_server = None
+
         if self.zeroconf:
             logger.debug("Unregistering zeroconf services")
             self.zeroconf.unregister_all_services()
@@ -134,6 +198,10 @@ class OSCQueryService:
 
 
 class OSCQueryHTTPServer(ThreadingHTTPServer):
+    # Size of the queue of connections that are not accepted yet. The default of 5 makes bursts of polling clients
+    # wait for SYN retransmits. Same as OSCQueryAsyncHTTPServer.
+    request_queue_size = socket.SOMAXCONN
+
     def __init__(
         self,
         address_space: OSCAddressSpace,
@@ -141,72 +209,115 @@ class OSCQueryHTTPServer(ThreadingHTTPServer):
         server_address: tuple[str, int],
         request_handler_class,
         bind_and_activate: bool = ...,
+        stream_responses: bool = False,
     ) -> None:
         super().__init__(server_address, request_handler_class, bind_and_activate)
         self.address_space = address_space
         self.host_info = host_info
+        self.stream_responses = stream_responses
 
 
 class OSCQueryHTTPHandler(SimpleHTTPRequestHandler):
-    def _respond(self, code, data=None):
+    # HTTP/1.1 keeps connections open between requests, so polling clients can reuse them
+    protocol_version = "HTTP/1.1"
+
+    # Seconds after which an idle connection is closed
+    timeout = 30
+
+    def _respond(self, code, data=None, headers: dict[str, str] | None = None):
+        self.send_response(code)
+        self.send_header("Content-type", "text/json")
+        self._send_headers(headers)
+        self._send_connection_header()
+        if code in NO_BODY_STATUS:
+            self.end_headers()
+            return
+
+        if data is None:
+            body = b""
+        elif isinstance(data, bytes):
+            body = data
+        else:
+            body = bytes(data, "utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond_streamed(
+        self, code, chunks: Iterable[bytes], headers: dict[str, str] | None = None
+    ):
+        """Write the response body while it is being rendered.
+        Uses chunked transfer encoding, or for HTTP/1.0 clients, a body that ends when the connection is closed."""
+        chunked = self.request_version != "HTTP/1.0"
         self.send_response(code)
         self.send_header("Content-type", "text/json")
+        self._send_headers(headers)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self._send_connection_header()
         self.end_headers()
-        self.wfile.write(bytes(data, "utf-8"))
+
+        for chunk in chunks:
+            self.wfile.write(encode_chunk(chunk) if chunked else chunk)
+
+        if chunked:
+            self.wfile.write(LAST_CHUNK)
+
+    def _send_headers(self, headers: dict[str, str] | None):
+        if headers:
+            for keyword, value in headers.items():
+                self.send_header(keyword, value)
+
+    def _send_connection_header(self):
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        elif self.request_version == "HTTP/1.0":
+            # HTTP/1.0 clients only keep the connection open when asked to
+            self.send_header("Connection", "keep-alive")
 
     def do_GET(self) -> None:
-        logger.debug(f"GET {self.path} (from {self.client_address})")
-
-        parsed_url = urllib.parse.urlparse(self.path)
-        query_params = urllib.parse.parse_qs(parsed_url.query, keep_blank_values=True)
-
-        for query in query_params:
-            logger.debug(f"   {query}")
-            if query not in (
-                "HOST_INFO",
-                "FULL_PATH",
-                "CONTENTS",
-                "TYPE",
-                "VALUE",
-                "ACCESS",
-                "RANGE",
-                "DESCRIPTION",
-            ):
-                logger.error(f"Attribute {query} not understood by server")
-                self._respond(400, f"Attribute {query} not understood by server")
-                return
-
-        if "HOST_INFO" in query_params:
-            self._respond(200, str(self.server.host_info.to_json()))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"GET {self.path} (from {self.client_address})")
+
+        response = resolve_request(
+            self.server.address_space,
+            self.server.host_info,
+            self.path,
+            stream=self.server.stream_responses,
+            headers=self.headers,
+        )
+
+        if response.is_streamed:
+            self._respond_streamed(
+                response.status, response.iter_encoded_body(), response.headers
+            )
+        else:
+            self._respond(response.status, response.body, response.headers)
+
+    def do_POST(self) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"POST {self.path} (from {self.client_address})")
+
+        content_length = request_body_length(self.headers)
+        if content_length is None:
+            # Without a known length, the end of the body can't be found
+            self.close_connection = True
+            self._respond(
+                400, "Bad request: invalid Content-Length or Transfer-Encoding"
+            )
+            return
+        if content_length > MAX_BATCH_QUERY_SIZE:
+            # The body is not read, so the connection can't be used for further requests
+            self.close_connection = True
+            self._respond(413, "Batch query too large")
             return
 
-        with self.server.address_space.lock:
-            node: OSCPathNode = self.server.address_space.find_node(parsed_url.path)
-            if node is None:
-                self._respond(404, "OSC Path not found")
-                return
-
-            attribute = None
-            if query_params:
-                query = list(query_params)[0]
-                try:
-                    attribute = OSCQueryAttribute(query.upper())
-                except ValueError:
-                    self._respond(
-                        500,
-                        f"Internal server error - Query {query} not mappable to OSC attribute",
-                    )
-                    return
-
-                if attribute is OSCQueryAttribute.VALUE and node.access in (
-                    OSCAccess.NO_VALUE,
-                    OSCAccess.WRITEONLY_VALUE,
-                ):
-                    self._respond(
-                        204, f"Attribute {query} not valid - node is not accessible."
-                    )
-                    return
-
-            json = str(node.to_json(attribute))
-
-            self._respond(200, json)
+        response = resolve_batch_request(
+            self.server.address_space,
+            self.path,
+            self.rfile.read(content_length),
+            headers=self.headers,
+        )
+        self._respond(response.status, response.body, response.headers)
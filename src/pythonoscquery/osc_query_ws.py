@@ -0,0 +1,426 @@
+import asyncio
+import base64
+import hashlib
+import http.client
+import io
+import json
+import logging
+import socket
+import struct
+import threading
+
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+logger = logging.getLogger(__name__)
+
+# Appended to the key of the client to compute the Sec-WebSocket-Accept header (RFC 6455, section 4.2.2)
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Extension of the host info that announces support for the LISTEN and IGNORE commands
+LISTEN_EXTENSION = "LISTEN"
+
+# Maximum number of value updates that are sent to each client per second by default
+DEFAULT_MAX_SEND_RATE = 100.0
+
+# Maximum size of a message from a client. Clients only send short commands.
+MAX_MESSAGE_SIZE = 64 * 1024
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+# Close status codes
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_MESSAGE_TOO_BIG = 1009
+
+
+class OSCQueryWebSocketServer:
+    """WebSocket server for the bi-directional part of the OSCQuery protocol.
+
+    Clients send LISTEN and IGNORE commands as JSON text messages to start or stop listening to the value of a node:
+
+        {"COMMAND": "LISTEN", "DATA": "/foo/bar"}
+
+    Whenever a value is set on a node that a client listens to, the server sends it the new values as a binary OSC
+    message. Each client has its own outbox: Values that are set faster than they can be sent replace the ones that
+    are still waiting, and everything that is waiting is sent at once in a single OSC bundle. So a slow client only
+    misses intermediate values; it never holds up the code that sets them or the other clients.
+
+    All connections are served from a single asyncio event loop. Offers the same serve_forever() / shutdown()
+    interface as the HTTP servers, so it can be run in a thread by OSCQueryService.
+    """
+
+    # Size of the queue of connections that are not accepted yet
+    request_queue_size = socket.SOMAXCONN
+
+    # Seconds to wait for the opening handshake of a client
+    timeout = 30
+
+    def __init__(
+        self,
+        address_space: OSCAddressSpace,
+        server_address: tuple[str, int],
+        max_send_rate: float | None = DEFAULT_MAX_SEND_RATE,
+    ) -> None:
+        """
+        Args:
+            address_space: OSC address space whose nodes can be listened to
+            server_address: Address and port to bind to. An empty address binds to all interfaces.
+            max_send_rate: Maximum number of messages (or bundles) sent to each client per second. Values that change
+                more often are coalesced. None sends as fast as each client reads.
+        """
+        self.address_space = address_space
+        self.max_send_rate = max_send_rate
+
+        # Bind right away, so that errors (like a port that is already in use) are raised here
+        self.socket = socket.create_server(
+            server_address, backlog=self.request_queue_size
+        )
+        self.server_address = self.socket.getsockname()[:2]
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_serving: asyncio.Event | None = None
+        self._stopped = threading.Event()
+        self._connections: set[_WebSocketConnection] = set()
+        self._handlers: set[asyncio.Task] = set()
+        # The connections listening to each node, and the nodes themselves, keyed by path
+        self._listeners: dict[str, set[_WebSocketConnection]] = {}
+        self._listened_nodes: dict[str, OSCPathNode] = {}
+        # Messages of changed values that are not handed to the connections yet, keyed by path
+        self._changed_values: dict[str, OscMessage] = {}
+        self._changed_values_lock = threading.Lock()
+
+    def serve_forever(self):
+        """Serve connections on a new event loop until shutdown() is called."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """Serve connections on the running event loop until shutdown() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stop_serving = asyncio.Event()
+        self._stopped.clear()
+        try:
+            server = await asyncio.start_server(
+                self._handle_connection,
+                sock=self.socket,
+                backlog=self.request_queue_size,
+            )
+            async with server:
+                await self._stop_serving.wait()
+                for connection in list(self._connections):
+                    connection.close(CLOSE_NORMAL)
+                    connection.writer.close()
+                # Handlers wait for the next frame, or for the handshake of clients that haven't sent it yet, and
+                # must end before the loop does
+                for handler in list(self._handlers):
+                    handler.cancel()
+                await asyncio.gather(*self._handlers, return_exceptions=True)
+        finally:
+            for node in self._listened_nodes.values():
+                node.remove_value_listener(self._on_value_changed)
+            self._listeners.clear()
+            self._listened_nodes.clear()
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serving and wait until the server has stopped. Can be called from any other thread."""
+        if self._loop is None:
+            self.socket.close()
+            return
+
+        self._loop.call_soon_threadsafe(self._stop_serving.set)
+        self._stopped.wait()
+
+    def _on_value_changed(self, node: OSCPathNode):
+        # Called in the thread that set the value. The message is built here, so that it has the value that was set.
+        values = node.value or []
+        builder = OscMessageBuilder(node.full_path)
+        for value in values:
+            builder.add_arg(value)
+        message = builder.build()
+
+        with self._changed_values_lock:
+            # The event loop only needs to be woken up if it isn't about to hand out changed values anyway
+            wake_up = not self._changed_values
+            self._changed_values[node.full_path] = message
+        if wake_up:
+            try:
+                self._loop.call_soon_threadsafe(self._hand_out_changed_values)
+            except RuntimeError:
+                # The event loop has been closed
+                pass
+
+    def _hand_out_changed_values(self):
+        with self._changed_values_lock:
+            changed_values, self._changed_values = self._changed_values, {}
+        for path, message in changed_values.items():
+            for connection in self._listeners.get(path, ()):
+                connection.queue_value(path, message)
+
+    def _listen(self, connection: "_WebSocketConnection", path: str):
+        node = self.address_space.find_node(path)
+        if node is None:
+            logger.warning(f"Can't listen to {path}: No such node")
+            return
+
+        path = node.full_path
+        listeners = self._listeners.get(path)
+        if listeners is None:
+            listeners = self._listeners[path] = set()
+            self._listened_nodes[path] = node
+            node.add_value_listener(self._on_value_changed)
+        listeners.add(connection)
+        connection.listened_paths.add(path)
+
+    def _ignore(self, connection: "_WebSocketConnection", path: str):
+        connection.listened_paths.discard(path)
+        listeners = self._listeners.get(path)
+        if listeners is None:
+            return
+
+        listeners.discard(connection)
+        connection.discard_value(path)
+        if not listeners:
+            del self._listeners[path]
+            # The node may have been removed from the address space in the meantime
+            self._listened_nodes.pop(path).remove_value_listener(self._on_value_changed)
+
+    def _handle_command(self, connection: "_WebSocketConnection", message: bytes):
+        try:
+            command = json.loads(message)
+            name, path = command["COMMAND"], command["DATA"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Invalid command {message!r}: {e!r}")
+            return
+
+        logger.debug("%s %s (from %s)", name, path, connection)
+        if name == "LISTEN":
+            self._listen(connection, path)
+        elif name == "IGNORE":
+            self._ignore(connection, path)
+        else:
+            logger.warning(f"Unsupported command {name}")
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._handlers.add(asyncio.current_task())
+        connection = None
+        try:
+            if not await asyncio.wait_for(
+                self._handshake(reader, writer), self.timeout
+            ):
+                return
+
+            connection = _WebSocketConnection(writer)
+            self._connections.add(connection)
+            sender = asyncio.create_task(connection.send_values(self.max_send_rate))
+            while True:
+                opcode, message = await connection.receive(reader)
+                if opcode == OPCODE_TEXT:
+                    self._handle_command(connection, message)
+                elif opcode == OPCODE_BINARY:
+                    logger.debug("Ignoring binary message from %s", connection)
+                elif opcode == OPCODE_CLOSE:
+                    connection.close(CLOSE_NORMAL)
+                    return
+        except _WebSocketError as e:
+            logger.debug("Closing connection: %s", e)
+            connection.close(e.status)
+        except (ConnectionError, EOFError, ValueError, asyncio.TimeoutError) as e:
+            logger.debug("Connection closed: %r", e)
+        except asyncio.CancelledError:
+            # Cancelled by serve() on shutdown. The handler ends normally, as asyncio's stream protocol reports
+            # handlers that end cancelled as errors.
+            logger.debug("Connection closed on shutdown")
+        finally:
+            if connection is not None:
+                sender.cancel()
+                self._connections.discard(connection)
+                for path in list(connection.listened_paths):
+                    self._ignore(connection, path)
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    @staticmethod
+    async def _handshake(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer the opening handshake of a client.
+        Returns:
+            Whether the connection was upgraded to a WebSocket connection
+        """
+        request_line = await reader.readline()
+        header_lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line)
+        headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines)))
+
+        key = headers.get("Sec-WebSocket-Key")
+        if (
+            not request_line.startswith(b"GET ")
+            or headers.get("Upgrade", "").lower() != "websocket"
+            or key is None
+        ):
+            writer.write(
+                b"HTTP/1.1 400 Bad Request\r\nConnection: close\r\n"
+                b"Content-Length: 0\r\n\r\n"
+            )
+            await writer.drain()
+            return False
+
+        accept = base64.b64encode(
+            hashlib.sha1(bytes(key.strip() + WEBSOCKET_GUID, "latin-1")).digest()
+        )
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        await writer.drain()
+        return True
+
+
+class _WebSocketError(Exception):
+    def __init__(self, status: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+
+
+class _WebSocketConnection:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.listened_paths: set[str] = set()
+        self._closed = False
+        # Messages of changed values that are waiting to be sent, keyed by path
+        self._outbox: dict[str, OscMessage] = {}
+        self._outbox_filled = asyncio.Event()
+
+    def send(self, opcode: int, payload: bytes):
+        if self._closed:
+            return
+        self.writer.write(encode_frame(opcode, payload))
+
+    def queue_value(self, path: str, message: OscMessage):
+        """Queue the message to be sent. It replaces a message for the same path that is still waiting."""
+        self._outbox[path] = message
+        self._outbox_filled.set()
+
+    def discard_value(self, path: str):
+        self._outbox.pop(path, None)
+
+    async def send_values(self, max_send_rate: float | None):
+        """Send the queued messages until cancelled. Waits until the client has read what was sent before, and for
+        the interval given by the send rate, while further messages are queued."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / max_send_rate if max_send_rate else 0
+        next_send = loop.time()
+        while not self._closed:
+            await self._outbox_filled.wait()
+            delay = next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self._outbox_filled.clear()
+            messages, self._outbox = list(self._outbox.values()), {}
+            if not messages:
+                continue
+            if len(messages) == 1:
+                packet = messages[0].dgram
+            else:
+                builder = OscBundleBuilder(IMMEDIATELY)
+                for message in messages:
+                    builder.add_content(message)
+                packet = builder.build().dgram
+            self.send(OPCODE_BINARY, packet)
+
+            next_send = loop.time() + interval
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                # The connection is closed by the handler, which notices it when reading
+                return
+
+    def close(self, status: int):
+        """Send a close frame. The connection is closed when the handler returns."""
+        self.send(OPCODE_CLOSE, struct.pack("!H", status))
+        self._closed = True
+
+    async def receive(self, reader: asyncio.StreamReader) -> tuple[int, bytes]:
+        """Read the next message. Answers pings.
+        Returns:
+            The opcode and the payload of the message
+        """
+        message_opcode = None
+        fragments = []
+        size = 0
+        while True:
+            first, second = await reader.readexactly(2)
+            fin = first & 0x80
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if not second & 0x80:
+                raise _WebSocketError(CLOSE_PROTOCOL_ERROR, "Frame is not masked")
+            if length == 126:
+                (length,) = struct.unpack("!H", await reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await reader.readexactly(8))
+            size += length
+            if size > MAX_MESSAGE_SIZE:
+                raise _WebSocketError(CLOSE_MESSAGE_TOO_BIG, "Message too big")
+            mask = await reader.readexactly(4)
+            payload = unmask(await reader.readexactly(length), mask)
+
+            if opcode == OPCODE_PING:
+                self.send(OPCODE_PONG, payload)
+                size -= length
+                continue
+            if opcode == OPCODE_PONG:
+                size -= length
+                continue
+            if opcode == OPCODE_CLOSE:
+                return opcode, payload
+
+            if opcode != OPCODE_CONTINUATION:
+                if message_opcode is not None:
+                    raise _WebSocketError(CLOSE_PROTOCOL_ERROR, "Expected continuation")
+                message_opcode = opcode
+            elif message_opcode is None:
+                raise _WebSocketError(CLOSE_PROTOCOL_ERROR, "Unexpected continuation")
+            fragments.append(payload)
+            if fin:
+                return message_opcode, b"".join(fragments)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.writer.get_extra_info('peername')})"
+
+
+def encode_frame(opcode: int, payload: bytes) -> bytes:
+    """Frame the payload as a single, unmasked WebSocket frame, as sent by servers."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def unmask(payload: bytes, mask: bytes) -> bytes:
+    """Unmask the payload of a frame sent by a client. Masking is symmetric, so this also masks a payload."""
+    length = len(payload)
+    repeated_mask = (mask * (length // 4 + 1))[:length]
+    unmasked = int.from_bytes(payload, "big") ^ int.from_bytes(repeated_mask, "big")
+    return unmasked.to_bytes(length, "big")
@@ -1,8 +1,14 @@
+import itertools
 import logging
+import time
+from collections.abc import Sequence
+from operator import attrgetter
 from typing import Any, Callable
 
 import pythonosc
+from pythonosc import osc_packet
 from pythonosc.dispatcher import Dispatcher, Handler
+from pythonosc.osc_message import OscMessage
 
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
 from pythonoscquery.shared.osc_path_node import OSCPathNode
@@ -13,47 +19,129 @@ logger = logging.getLogger(__name__)
 class OSCCallbackWrapper:
     """Wrapper class to type-check python-osc callbacks."""
 
-    def __init__(self, node: OSCPathNode, callback: Callable):
+    def __init__(
+        self,
+        node: OSCPathNode,
+        callback: Callable | None,
+        batch_callback: Callable | None = None,
+        store_values: bool = False,
+    ):
+        """
+        Args:
+            node: OSCPathNode to use for type checking
+            callback: The callback that is called with the values of each valid message. May be None if the values
+                are only stored.
+            batch_callback: If given, BundleDispatcher calls it once with the values of all valid messages for the
+                node in a bundle, instead of calling the callback for each message. See call_batch().
+            store_values: Set the values of each valid message as the current value of the node, before the
+                callback is called. The OSCQuery server then reports the last values that were received.
+        """
         self.node = node
         self.callback = callback
+        self.batch_callback = batch_callback
+        self.store_values = store_values
         self.handler: pythonosc.dispatcher.Handler | None = None
+        # The validator is compiled once for the types of the node, see OSCPathNode.validator
+        self._validate = node.validator
+        # Index of the first OSC value in the arguments the handler is called with
+        self._values_start = 1
 
     def register_handler(self, handler: pythonosc.dispatcher.Handler):
         self.handler = handler
+        # The osc client address, when required by the callback, is always the first argument, followed by the osc
+        # message address and, when required by the callback, the fixed parameters. We don't need to check them.
+        self._values_start = (
+            1 + bool(handler.needs_reply_address) + (1 if handler.args else 0)
+        )
 
     def __call__(self, *args, **kwargs):
-        logger.debug(f"{self} called with args={args} kwargs={kwargs}")
+        # Formatting the message calls __repr__, which is too expensive to do for every message that isn't logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{self} called with args={args} kwargs={kwargs}")
 
         if not self.handler:
             raise TypeError(
                 f"{self.__class__.__name__} for {self.node.full_path} has no handler"
             )
 
-        values = list(args)
-        rebuild_args = []
-
-        if self.handler.needs_reply_address:
-            # the osc client address, when required by the callback, is always the first argument. We don't need to check it.
-            rebuild_args.append(values.pop(0))
-
-        # the osc message address is always the next argument. We don't need to check it.
-        rebuild_args.append(values.pop(0))
-
-        if self.handler.args:
-            # fixed parameters, when required by the callback, are always the next argument. We don't need to check them.
-            rebuild_args.append(values.pop(0))
-
+        values = args[self._values_start :]
         try:
-            values = self.node.validate_values(values)
+            validated = self._validate(values)
         except TypeError as e:
             logger.error(f"Type check failed, {str(e)}")
             return None
 
-        # Re-create the original args, but with sanitized values
-        rebuild_args.extend(values)
-        rebuild_args = tuple(rebuild_args)
+        if self.store_values:
+            self.node.set_validated_values(validated)
+
+        if self.callback is None:
+            return None
+
+        if validated is not values:
+            # Re-create the original args, but with sanitized values
+            args = (*args[: self._values_start], *validated)
+
+        return self.callback(*args, **kwargs)
+
+    def call_batch(
+        self, client_address: tuple[str, int], messages: Sequence[OscMessage]
+    ) -> list:
+        """Validate the values of many messages for the node, e.g. all messages of a bundle, and pass the valid ones
+        on. Invalid messages are logged and skipped.
+
+        If there is a batch callback, it is called once, with the same leading arguments as the callback, and the list
+        of the values of all valid messages (each a list or tuple) as the last argument:
+
+            batch_callback([client_address,] node_address, [fixed_args,] values)
+
+        Otherwise, the callback is called for each valid message, as for single messages. When values are stored,
+        only the values of the last valid message are set on the node, before any callback is called.
+
+        Returns:
+            The results of the calls that are not None
+        """
+        if not self.handler:
+            raise TypeError(
+                f"{self.__class__.__name__} for {self.node.full_path} has no handler"
+            )
+
+        validate = self._validate
+        valid_messages = []
+        for message in messages:
+            try:
+                valid_messages.append((message.address, validate(message.params)))
+            except TypeError as e:
+                logger.error(f"Type check failed, {str(e)}")
+
+        if not valid_messages:
+            return []
+
+        if self.store_values:
+            # The earlier values would be replaced right away
+            self.node.set_validated_values(valid_messages[-1][1])
+
+        handler = self.handler
+        leading_args = (client_address,) if handler.needs_reply_address else ()
+        fixed_args = (handler.args,) if handler.args else ()
+
+        if self.batch_callback:
+            result = self.batch_callback(
+                *leading_args,
+                self.node.full_path,
+                *fixed_args,
+                [values for _, values in valid_messages],
+            )
+            return [] if result is None else [result]
+
+        if self.callback is None:
+            return []
 
-        return self.callback(*rebuild_args, **kwargs)
+        results = []
+        for address, values in valid_messages:
+            result = self.callback(*leading_args, address, *fixed_args, *values)
+            if result is not None:
+                results.append(result)
+        return results
 
     def __repr__(self):
         return f"{self.__class__.__name__}(address: {self.node.full_path} callback={repr(self.callback)})"
@@ -62,10 +150,12 @@ class OSCCallbackWrapper:
 def map_node(
     node: OSCPathNode,
     dispatcher: Dispatcher,
-    callback: Callable,
+    callback: Callable | None,
     address_space: OSCAddressSpace | None = None,
     *args: Any | list[Any],
     needs_reply_address: bool = False,
+    batch_callback: Callable | None = None,
+    store_values: bool = False,
 ) -> Handler:
     """Map the given callback on the given dispatcher.
     Wraps the callback so that the values can be checked if they match the values from the given node.
@@ -73,16 +163,27 @@ def map_node(
     Args:
         node: OSCPathNode to use for type checking
         dispatcher: python-osc dispatcher
-        callback: the callback function that is called when the python-osc server receives a matching message
+        callback: the callback function that is called when the python-osc server receives a matching message. May
+            be None if the values are only stored.
         address_space: When given, adds the node to this address space for us in the OSCQuery server
         *args: Fixed arguments that will be passed to the callback function
         needs_reply_address: Whether the IP address from which the message originated from shall be passed as
             an argument to the handler callback
+        batch_callback: Function that is called once with the values of all messages for the node in a bundle,
+            see OSCCallbackWrapper.call_batch(). Requires a BundleDispatcher.
+        store_values: Whether the values of each valid message are set as the current value of the node, so that
+            the OSCQuery server reports (and pushes to listeners) the values that were received last
 
     Returns:
         The python-osc handler object that will be invoked should the given address match
+
+    Raises:
+        TypeError if a batch callback is given, but the dispatcher is not a BundleDispatcher
     """
-    wrapper = OSCCallbackWrapper(node, callback)
+    if batch_callback is not None and not isinstance(dispatcher, BundleDispatcher):
+        raise TypeError(f"A batch callback requires a {BundleDispatcher.__name__}")
+
+    wrapper = OSCCallbackWrapper(node, callback, batch_callback, store_values)
     handler = dispatcher.map(
         node.full_path, wrapper, *args, needs_reply_address=needs_reply_address
     )
@@ -92,3 +193,63 @@ def map_node(
         address_space.add_node(node)
 
     return handler
+
+
+class BundleDispatcher(Dispatcher):
+    """Dispatcher that hands all messages of a bundle for the same node to its OSCCallbackWrapper at once.
+
+    python-osc calls the handler of each message of a bundle separately. This dispatcher groups the messages of a
+    packet by the wrapper they are mapped to, and calls OSCCallbackWrapper.call_batch() once per wrapper, which
+    validates them in one go and can pass them to a batch callback. The handlers for each address are only looked up
+    once per packet. This saves most of the per-message overhead for dense bundles, e.g. from media servers.
+
+    Messages are grouped per time tag: With strict timing, messages that are scheduled for later are still handled
+    when they are due. Within a group, each wrapper is called in the order its first message appears, with its
+    messages in the order they appear. Handlers that are not OSCCallbackWrapper instances are called for each message
+    while the messages are grouped, i.e. before the wrappers.
+
+    Only call_handlers_for_packet() groups messages; the async variant handles them one by one.
+    """
+
+    def call_handlers_for_packet(
+        self, data: bytes, client_address: tuple[str, int]
+    ) -> list:
+        results = []
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            return results
+
+        # Dense bundles address the same nodes over and over, so the handlers are only looked up once per address
+        handlers_by_address: dict[str, list[Handler]] = {}
+
+        # The messages are sorted by time
+        for due, timed_messages in itertools.groupby(
+            packet.messages, key=attrgetter("time")
+        ):
+            now = time.time()
+            if self._strict_timing and due > now:
+                time.sleep(due - now)
+
+            batches: dict[OSCCallbackWrapper, list[OscMessage]] = {}
+            for timed_message in timed_messages:
+                message = timed_message.message
+                handlers = handlers_by_address.get(message.address)
+                if handlers is None:
+                    handlers = handlers_by_address[message.address] = list(
+                        self.handlers_for_address(message.address)
+                    )
+
+                for handler in handlers:
+                    if isinstance(handler.callback, OSCCallbackWrapper):
+                        batches.setdefault(handler.callback, []).append(message)
+                        continue
+
+                    result = handler.invoke(client_address, message)
+                    if result is not None:
+                        results.append(result)
+
+            for wrapper, messages in batches.items():
+                results.extend(wrapper.call_batch(client_address, messages))
+
+        return results
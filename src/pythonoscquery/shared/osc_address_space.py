@@ -1,8 +1,8 @@
 import logging
-import threading
-from functools import lru_cache
+from collections.abc import Iterable
 
 from .osc_path_node import OSCPathNode
+from .read_write_lock import ReadWriteLock
 
 logger = logging.getLogger(__name__)
 
@@ -13,29 +13,42 @@ class OSCAddressSpace:
     This resembles a tree structure.  The leaves of this tree are the *OSC methods* and the branch nodes are called *OSC containers*.
 
     Always contains a root node with address "/".
+
+    Reading the space (finding nodes, rendering JSON, iterating over nodes) doesn't need a lock, not even while other
+    threads add or remove nodes: The child nodes of a container are held in a copy-on-write mapping, so a reader
+    always sees either the old or the new set of children of a node, never one that is half changed. The mapping is
+    only copied on the first change after a reader has iterated it, so adding nodes one at a time stays cheap even
+    for containers with many thousands of children.
     """
 
     def __init__(self):
         self._root = OSCPathNode("/", description="root node")
-        self._lock = threading.Lock()
+        self._lock = ReadWriteLock()
+        # Maps the full path of every node in the space to the node itself, so that lookups don't have to walk the tree.
+        # Lookups are single dict operations, which are atomic, so they are safe while a writer changes the index.
+        self._index: dict[str, OSCPathNode] = {self._root.full_path: self._root}
 
     @property
-    def lock(self) -> threading.Lock:
+    def lock(self) -> ReadWriteLock:
+        """Lock that serializes changes to the structure of the address space.
+        add_node(), add_nodes() and remove_node() acquire it for writing. Reads don't need it; acquire lock.read_lock
+        only to keep the structure from changing across several reads."""
         return self._lock
 
+    @property
+    def version(self) -> int:
+        """Changes whenever any node in the address space changes, or nodes are added or removed."""
+        return self._root.version
+
     @property
     def root_node(self) -> OSCPathNode:
         """The root node of the address space."""
         return self._root
 
     @property
-    @lru_cache()
     def number_of_nodes(self) -> int:
         """The number of nodes in the address space. Includes the root node."""
-        number_of_nodes = 0
-        for _ in self._root:
-            number_of_nodes += 1
-        return number_of_nodes
+        return len(self._index)
 
     def add_node(self, node: OSCPathNode):
         """Add a node to the address space.
@@ -51,39 +64,46 @@ class OSCAddressSpace:
         Args:
             node: OSC path node that will be added to the address space
         """
-        if self.find_node(node.full_path) is not None:
-            logger.warning(
-                "Node (%s) already exists, not added again to address space",
-                node.full_path,
-            )
-            return
+        with self.lock:
+            self._add_nodes([node])
+
+    def add_nodes(self, nodes: Iterable[OSCPathNode]):
+        """Add many nodes to the address space at once.
+        Behaves like calling add_node() for each of the nodes, but takes the lock only once, and hands all new children
+        of a container to it at once. Each container copies its children only once per call, so this stays linear in
+        the number of nodes even for containers with many thousands of children. Prefer this when loading large
+        address spaces.
 
-        path = node.full_path.split("/")
+        Args:
+            nodes: OSC path nodes that will be added to the address space, in the given order
+        """
+        with self.lock:
+            self._add_nodes(nodes)
 
-        child_path = ""
-        current_node = self._root
+    def remove_node(self, address: str) -> OSCPathNode | None:
+        """Remove a node and all of its child nodes from the address space.
+        The root node can't be removed.
 
-        for path_segment in path:
-            if path_segment == "":
-                continue
-            child_path += "/" + path_segment
+        Args:
+            address: The address of the node to remove. Example: "/foo/bar/baz/my_node"
+        Returns:
+            The removed node if it existed, otherwise None
+        """
+        if address == self._root.full_path:
+            raise ValueError("The root node can't be removed from the address space")
 
-            if child_path == node.full_path:
-                # All nodes up to the destination have been created, the last node is the actual node that is to be added
-                with self.lock:
-                    current_node.add_child(node)
-                break
-            else:
-                child = self.find_node(child_path)
-                if not child:
-                    child = OSCPathNode(child_path)
+        with self.lock:
+            node = self._index.get(address)
+            if node is None:
+                return None
 
-                    with self.lock:
-                        current_node.add_child(child)
+            parent_path = address.rsplit("/", 1)[0] or "/"
+            self._index[parent_path].remove_child(node)
 
-            current_node = child
+            for sub_node in node:
+                del self._index[sub_node.full_path]
 
-        self.__class__.number_of_nodes.fget.cache_clear()
+        return node
 
     def find_node(self, address: str) -> OSCPathNode | None:
         """Find a node in the address space.
@@ -92,7 +112,79 @@ class OSCAddressSpace:
         Returns:
             The node if it exists, otherwise None
         """
-        return self.root_node.find_subnode(address)
+        return self._index.get(address)
+
+    def _add_nodes(self, nodes: Iterable[OSCPathNode]):
+        """Add nodes, creating missing containers on their paths. The caller must hold the lock.
+
+        The nodes are collected first and published afterwards, a container at a time, so that readers still see each
+        container either with all or none of its new children. If a node can't be added, the nodes before it are
+        published nonetheless, like they would have been by separate add_node() calls.
+        """
+        # Nodes of this batch, keyed by path, and the new children of each container, keyed by the container's path
+        new_nodes: dict[str, OSCPathNode] = {}
+        new_children: dict[str, list[OSCPathNode]] = {}
+        try:
+            for node in nodes:
+                self._collect_node(node, new_nodes, new_children)
+        finally:
+            # Containers created in this batch come after their parents, so publishing in reverse order fills them
+            # before they become reachable from the root
+            for path, children in reversed(new_children.items()):
+                parent = new_nodes.get(path) or self._index[path]
+                parent.add_children(children)
+            self._index.update(new_nodes)
+
+    def _collect_node(
+        self,
+        node: OSCPathNode,
+        new_nodes: dict[str, OSCPathNode],
+        new_children: dict[str, list[OSCPathNode]],
+    ):
+        """Add a node and the missing containers on its path to the batch of new nodes."""
+        if node.full_path in self._index or node.full_path in new_nodes:
+            logger.warning(
+                "Node (%s) already exists, not added again to address space",
+                node.full_path,
+            )
+            return
+
+        parent = self._get_or_create_container(
+            node.full_path.rsplit("/", 1)[0] or "/", new_nodes, new_children
+        )
+        if not parent.is_container:
+            raise ValueError(
+                f"Can only add child nodes to an OSC container. Node '{parent.full_path}' is not a container"
+            )
+        new_children.setdefault(parent.full_path, []).append(node)
+        for sub_node in node:
+            new_nodes[sub_node.full_path] = sub_node
+
+    def _get_or_create_container(
+        self,
+        address: str,
+        new_nodes: dict[str, OSCPathNode],
+        new_children: dict[str, list[OSCPathNode]],
+    ) -> OSCPathNode:
+        """Return the node with the given address, creating it and all missing nodes above it as part of the batch."""
+        missing_paths = []
+        container = self._index.get(address) or new_nodes.get(address)
+        while container is None:
+            missing_paths.append(address)
+            address = address.rsplit("/", 1)[0] or "/"
+            container = self._index.get(address) or new_nodes.get(address)
+
+        for path in reversed(missing_paths):
+            if not container.is_container:
+                raise ValueError(
+                    f"Can only add child nodes to an OSC container. Node '{container.full_path}' is not a container"
+                )
+            child = OSCPathNode(path)
+            new_children.setdefault(container.full_path, []).append(child)
+            new_nodes[path] = child
+            container = child
+
+        return container
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.number_of_nodes} nodes)"
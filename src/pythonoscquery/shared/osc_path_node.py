@@ -1,7 +1,13 @@
 import builtins
+import functools
+import gzip
+import itertools
 import json
 import logging
-from collections.abc import Iterable
+import threading
+import zlib
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from json import JSONEncoder
 from typing import Any, TypeVar, Union
 
@@ -28,18 +34,14 @@ class OSCNodeEncoder(JSONEncoder):
                 if self.attribute_filter is not None and self.attribute_filter != k:
                     continue
 
+                if type(v) is array:
+                    v = v.tolist()
+
                 match k:
                     case OSCQueryAttribute.CONTENTS:
                         if len(v) < 1:
                             continue
-                        obj_dict["CONTENTS"] = {}
-                        sub_node: OSCPathNode
-                        for sub_node in v:
-                            obj_dict["CONTENTS"][
-                                sub_node.attributes[OSCQueryAttribute.FULL_PATH].split(
-                                    "/"
-                                )[-1]
-                            ] = sub_node
+                        obj_dict["CONTENTS"] = dict(o._children)
                     case OSCQueryAttribute.TYPE:
                         obj_dict["TYPE"] = python_type_list_to_osc_type(v)
                     case _:
@@ -53,9 +55,50 @@ class OSCNodeEncoder(JSONEncoder):
 T = TypeVar("T", bound=int | float | bool | str)
 
 
+# Source of node versions. Shared by all nodes, so that a version is never reused, not even by another node.
+_versions = itertools.count()
+
+# Compression formats for to_compressed_json(). gzip output doesn't contain a timestamp, so it is the same every time.
+_compressors = {
+    "gzip": functools.partial(gzip.compress, compresslevel=6, mtime=0),
+    "deflate": functools.partial(zlib.compress, level=6),
+}
+
+# Nodes with the same argument types share a single type tuple
+_type_signatures: dict[tuple[type, ...], tuple[type, ...]] = {}
+
+# Validators compiled for each type signature, see compile_validator(). None stands for nodes without values.
+_validators: dict[tuple[type, ...] | None, Callable[[Sequence], Sequence]] = {}
+
+# Validators for array-backed nodes, keyed by type code and number of values, see compile_array_validator()
+_array_validators: dict[tuple[str, int], Callable[[Sequence], Sequence]] = {}
+
+# Type codes of the arrays that can hold the values of a node: Integers and floats, but not characters
+ARRAY_TYPECODES = frozenset("bBhHiIlLqQfd")
+
+# Makes marking the children of a node as shared (by a reader) and changing them in place (by a writer) mutually
+# exclusive, see OSCPathNode._shared_children(). Held only for those short steps, never while iterating.
+_children_lock = threading.Lock()
+
+
 class OSCPathNode:
     """A node in the OSC address space tree."""
 
+    # Address spaces can hold a huge number of nodes, so nodes don't carry an instance dict
+    __slots__ = (
+        "_full_path",
+        "_children",
+        "_children_shared",
+        "_value",
+        "_type",
+        "_access",
+        "_description",
+        "_parent",
+        "_json_cache",
+        "_version",
+        "_value_listeners",
+    )
+
     @classmethod
     def from_json(cls, json_data: dict[str, Any]) -> "OSCPathNode":
         """Factory method to create an instance of OSCPathNode from JSON data."""
@@ -100,7 +143,7 @@ class OSCPathNode:
         self,
         full_path: str,
         access: OSCAccess = OSCAccess.NO_VALUE,
-        value: Union[T, list[T]] = None,
+        value: Union[T, list[T], array, memoryview] = None,
         description: str = None,
         contents: list["OSCPathNode"] = None,
     ):
@@ -109,7 +152,10 @@ class OSCPathNode:
             full_path: The OSC address path, e.g. "/test/foo/bar"
             access: The access mode of the node
             value: A list of initial values for the node. The argument types are derived from those values
-                If the actual value does not matter, a placeholder with the correct type can be used instead
+                If the actual value does not matter, a placeholder with the correct type can be used instead.
+                Many numeric values of the same type (e.g. the 512 channels of a DMX universe) can be given as an
+                array.array (or a one-dimensional memoryview) of integers or floats instead. They are then kept in
+                that compact typed array, and validated and rendered as a whole. See compile_array_validator().
             description: A textual description of the node's purpose
             contents: The child nodes of this node. Don't use this directly, but  add new node via the AddressSpace.
                 This parameter exists for instantiation via json data.
@@ -128,15 +174,48 @@ class OSCPathNode:
                 "A node can either have child nodes (for OSC containers) or values (for OSC methods), but not both."
             )
 
-        self._attributes: dict[OSCQueryAttribute, Any] = {}
-
-        self._attributes[OSCQueryAttribute.FULL_PATH] = full_path
-
-        self._attributes[OSCQueryAttribute.CONTENTS]: list["OSCPathNode"] = contents
+        self._full_path = full_path
+
+        self._parent: "OSCPathNode | None" = None
+
+        self._version = next(_versions)
+
+        # Called with this node whenever its value is set. Copy-on-write, like the children.
+        self._value_listeners: tuple[Callable[["OSCPathNode"], None], ...] = ()
+
+        # Rendered JSON, keyed by the attribute filter (and the encoding, for compressed JSON). Every entry is tagged
+        # with the version it was rendered at and only used while the node still has that version. Dropped whenever
+        # this node or one of its children changes.
+        self._json_cache: dict[Any, tuple[int, str | bytes]] | None = None
+
+        # Child nodes, keyed by the last segment of their path. Keeps insertion order for rendering.
+        # Copy-on-write, but only once a reader iterates the dict: Readers that iterate take it from
+        # _shared_children(), which marks it as shared. A shared dict is never changed again, the next change copies
+        # it first. Until then, adding and removing children changes the dict in place, so that adding many children
+        # one at a time doesn't copy all of them every time. Single lookups can use the dict directly.
+        self._children: dict[str, "OSCPathNode"] | None = None
+        self._children_shared = False
+        if contents:
+            children = {}
+            for child in contents:
+                if child.name in children:
+                    raise ValueError(
+                        f"Node '{full_path}' already has a child node named '{child.name}'"
+                    )
+                children[child.name] = child
+                child._parent = self
+            self._children = children
 
         # Ensure that value is an iterable
         if not isinstance(value, Iterable) or isinstance(value, str):
             value = [value] if value is not None else []
+        elif isinstance(value, memoryview):
+            value = _to_array(value.format, value)
+
+        if type(value) is array and value.typecode not in ARRAY_TYPECODES:
+            raise ValueError(
+                f"Unsupported array type code '{value.typecode}', must be one of {''.join(sorted(ARRAY_TYPECODES))}"
+            )
 
         if not value and access is not OSCAccess.NO_VALUE:
             raise ValueError(
@@ -148,46 +227,125 @@ class OSCPathNode:
                 f"Value(s) given, access must not be {OSCAccess.NO_VALUE.name} for method nodes."
             )
 
-        self._attributes[OSCQueryAttribute.VALUE] = value if value else None
+        self._value: list[T] | None = value if value else None
 
-        types = []
+        self._type: tuple[type, ...] | None = None
         if value:
-            for v in self._attributes[OSCQueryAttribute.VALUE]:
-                types.append(type(v))
+            types = tuple(type(v) for v in value)
+            self._type = _type_signatures.setdefault(types, types)
 
-        self._attributes[OSCQueryAttribute.TYPE] = types if value else None
+        self._access = access
 
-        self._attributes[OSCQueryAttribute.ACCESS] = access
-
-        self._attributes[OSCQueryAttribute.DESCRIPTION] = description
+        self._description = description
 
     @property
     def attributes(self) -> dict[OSCQueryAttribute, Any]:
-        return self._attributes
+        """The OSCQuery attributes of this node. This is a view created on access; changing it has no effect on the
+        node."""
+        return {
+            OSCQueryAttribute.FULL_PATH: self.full_path,
+            OSCQueryAttribute.CONTENTS: self.contents,
+            OSCQueryAttribute.VALUE: self.value,
+            OSCQueryAttribute.TYPE: self.type,
+            OSCQueryAttribute.ACCESS: self.access,
+            OSCQueryAttribute.DESCRIPTION: self.description,
+        }
 
     @property
     def full_path(self) -> str:
-        return self._attributes[OSCQueryAttribute.FULL_PATH]
+        return self._full_path
 
     @property
-    def contents(self) -> list["OSCPathNode"]:
-        return self._attributes[OSCQueryAttribute.CONTENTS]
+    def name(self) -> str:
+        """The last segment of the path, e.g. "bar" for "/foo/bar". Empty for the root node."""
+        return self.full_path.rsplit("/", 1)[1]
+
+    @property
+    def contents(self) -> list["OSCPathNode"] | None:
+        children = self._children
+        if children is None:
+            return None
+        return list(children.values())
 
     @property
     def description(self) -> str:
-        return self._attributes[OSCQueryAttribute.DESCRIPTION]
+        return self._description
+
+    @description.setter
+    def description(self, description: str | None):
+        self._description = description
+        self._mark_changed()
 
     @property
     def access(self) -> OSCAccess:
-        return self._attributes[OSCQueryAttribute.ACCESS]
+        return self._access
 
     @property
     def value(self) -> Any:
-        return self._attributes[OSCQueryAttribute.VALUE]
+        return self._value
+
+    @value.setter
+    def value(self, value: Union[T, list[T]]):
+        """Set new value(s). The number and types of the values must match the values the node was created with.
+
+        Raises:
+            TypeError if the values don't match the types of this node
+        """
+        if not isinstance(value, Iterable) or isinstance(value, str):
+            value = [value]
+        elif not isinstance(value, Sequence):
+            value = list(value)
+        self.set_validated_values(self.validate_values(value))
+
+    def set_validated_values(self, values: Sequence[T]):
+        """Set new values that have already been validated with validate_values(), e.g. by OSCCallbackWrapper.
+
+        Doesn't take a lock: The values are swapped in as a whole, and the cached JSON of this node and its ancestors
+        is invalidated afterwards, so concurrent readers see either the old or the new values, never a mix.
+
+        Args:
+            values: The sanitized values, as returned by validate_values()
+        """
+        current = self._value
+        if type(current) is array:
+            self._value = _to_array(current.typecode, values)
+        else:
+            self._value = list(values) if values else None
+        self._mark_changed()
+        for listener in self._value_listeners:
+            listener(self)
+
+    def add_value_listener(self, listener: Callable[["OSCPathNode"], None]):
+        """Register a function that is called whenever a value is set on this node.
+        The listener is called with the node, in the thread that set the value, after the value has been changed. It
+        must not block.
+
+        Args:
+            listener: The function to call
+        """
+        self._value_listeners = self._value_listeners + (listener,)
+
+    def remove_value_listener(self, listener: Callable[["OSCPathNode"], None]):
+        """Unregister a function that was registered with add_value_listener().
+
+        Raises:
+            ValueError if the listener is not registered
+        """
+        listeners = list(self._value_listeners)
+        listeners.remove(listener)
+        self._value_listeners = tuple(listeners)
 
     @property
-    def type(self) -> Any:
-        return self._attributes[OSCQueryAttribute.TYPE]
+    def type(self) -> list[type] | None:
+        if self._type is None:
+            return None
+        return list(self._type)
+
+    @property
+    def version(self) -> int:
+        """Changes whenever this node or any node below it changes, e.g. when a value is set or a child is added.
+        Suitable as a validator for cached copies of the node."""
+        return self._version
 
     @property
     def is_container(self) -> bool:
@@ -196,23 +354,98 @@ class OSCPathNode:
         To enable gradual build-up of the address tree, nodes are also considered to be containers if they have no
         values configured.
         """
-        if self.contents or not self.value:
+        if self._children or not self.value:
             return True
         return False
 
     def add_child(self, child: "OSCPathNode"):
         """Add a child node to this node.
         *This should not be called directly, but implicitly from OSCAddressSpace.add_node()*"""
+        self.add_children([child])
+
+    def add_children(self, children: Iterable["OSCPathNode"]):
+        """Add many child nodes to this node at once.
+        *This should not be called directly, but implicitly from OSCAddressSpace.add_nodes()*
+
+        Raises:
+            ValueError: If this node is not a container, or already has a child with the same name as one of the new
+                ones. None of the children are added then.
+        """
         if not self.is_container:
             raise ValueError(
                 f"Can only add child nodes to an OSC container. Node '{self.full_path}' is not a container"
             )
-        if self.contents is None:
-            self._attributes[OSCQueryAttribute.CONTENTS] = []
-        self.contents.append(child)
+        children = list(children)
+        existing = self._children or {}
+        names = set()
+        for child in children:
+            name = child.name
+            if name in existing or name in names:
+                raise ValueError(
+                    f"Node '{self.full_path}' already has a child node named '{name}'"
+                )
+            names.add(name)
+
+        for child in children:
+            child._parent = self
+        with _children_lock:
+            own_children = self._own_children()
+            for child in children:
+                own_children[child.name] = child
+            self._children = own_children
+        self._mark_changed()
+
+    def remove_child(self, child: "OSCPathNode"):
+        """Remove a child node from this node.
+        *This should not be called directly, but implicitly from OSCAddressSpace.remove_node()*"""
+        if not self._children or self._children.get(child.name) != child:
+            raise ValueError(
+                f"Node '{child.full_path}' is not a child of '{self.full_path}'"
+            )
+        with _children_lock:
+            own_children = self._own_children()
+            del own_children[child.name]
+            self._children = own_children or None
+        child._parent = None
+        self._mark_changed()
+
+    def _own_children(self) -> dict[str, "OSCPathNode"]:
+        """The children dict, to be changed in place. Copied first if a reader may be iterating it.
+        Must be called with _children_lock held."""
+        children = self._children
+        if children is None:
+            children = {}
+        elif self._children_shared:
+            children = dict(children)
+        self._children_shared = False
+        return children
+
+    def _shared_children(self) -> dict[str, "OSCPathNode"] | None:
+        """The children dict, to be iterated. It won't be changed any more, even if children are added or removed
+        while iterating it."""
+        # Read the dict before the flag: If the flag is set, this dict has been marked as shared, as writers only
+        # replace the dict after it was marked
+        children = self._children
+        if children is None or self._children_shared:
+            return children
+        with _children_lock:
+            self._children_shared = True
+            return self._children
+
+    def get_child(self, name: str) -> "OSCPathNode | None":
+        """Get the direct child node with the given name (the last segment of its path).
+        Args:
+            name: Name of the child node, e.g. "bar" for the child "/foo/bar" of the node "/foo"
+        Returns:
+            The child node or None if there is no such child
+        """
+        children = self._children
+        if children is None:
+            return None
+        return children.get(name)
 
     def find_subnode(self, full_path: str) -> "OSCPathNode | None":
-        """Recursively find a node with the given full path.
+        """Find a node with the given full path below this node, descending one path segment at a time.
         Args:
             full_path: Address of the node to find, e.g. "/test/bar"
         Returns:
@@ -221,27 +454,162 @@ class OSCPathNode:
         if self.full_path == full_path:
             return self
 
-        if not self.contents:
+        prefix = "" if self.full_path == "/" else self.full_path
+        if not full_path.startswith(prefix + "/"):
             return None
 
-        for sub_node in self.contents:
-            found_node = sub_node.find_subnode(full_path)
-            if found_node:
-                return found_node
+        node = self
+        for segment in full_path[len(prefix) + 1 :].split("/"):
+            node = node.get_child(segment)
+            if node is None:
+                return None
 
-        return None
+        return node
+
+    def _mark_changed(self):
+        """Drop the rendered JSON and bump the version of this node and all of its ancestors, which embed it.
+        Must be called *after* the change, so that JSON rendered concurrently from the old state is never tagged
+        with the new version."""
+        node = self
+        while node is not None:
+            node._json_cache = None
+            node._version = next(_versions)
+            node = node._parent
 
     def to_json(self, attribute: OSCQueryAttribute | None = None) -> str:
         """Convert the attributes of this node to json.
+        The result is cached until this node or one of its children changes.
 
         Args:
             attribute: OSC query attribute, e.g. "OSCQueryAttribute.VALUE". If given, only this attribute will be rendered.
         Returns:
             The json string
         """
-        return json.dumps(self, cls=OSCNodeEncoder, attribute_filter=attribute)
+        version = self._version
+        cache = self._json_cache
+        if cache is not None:
+            cached = cache.get(attribute)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        rendered = self._render_json(attribute)
+        self._cache_json(attribute, version, rendered)
+        return rendered
+
+    def to_compressed_json(
+        self, attribute: OSCQueryAttribute | None = None, encoding: str = "gzip"
+    ) -> bytes:
+        """Convert the attributes of this node to compressed json.
+        Like the json string, the result is cached until this node or one of its children changes.
+
+        Args:
+            attribute: OSC query attribute, e.g. "OSCQueryAttribute.VALUE". If given, only this attribute will be rendered.
+            encoding: The compression format, either "gzip" or "deflate" (zlib format, as used by HTTP)
+        Returns:
+            The compressed, utf-8 encoded json string
+        """
+        if encoding not in _compressors:
+            raise ValueError(f"Unsupported encoding {encoding}")
+
+        key = (attribute, encoding)
+        version = self._version
+        cache = self._json_cache
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        compressed = _compressors[encoding](bytes(self.to_json(attribute), "utf-8"))
+        self._cache_json(key, version, compressed)
+        return compressed
+
+    def iter_json(self, attribute: OSCQueryAttribute | None = None) -> Iterator[str]:
+        """Render the same JSON as to_json(), but piece by piece.
+        Cached JSON is reused, but nothing is added to the cache, so the complete document for a big subtree is never
+        held in memory at once.
+
+        Args:
+            attribute: OSC query attribute, e.g. "OSCQueryAttribute.VALUE". If given, only this attribute will be rendered.
+        Returns:
+            Iterator over consecutive parts of the json string
+        """
+        cache = self._json_cache
+        if cache is not None:
+            cached = cache.get(attribute)
+            if cached is not None and cached[0] == self._version:
+                yield cached[1]
+                return
+
+        children = self._shared_children()
+        if not children or attribute not in (None, OSCQueryAttribute.CONTENTS):
+            yield self._render_json(attribute)
+            return
+
+        head, tail = self._json_items(attribute)
+        yield "{" + "".join(item + ", " for item in head) + '"CONTENTS": {'
+        separator = ""
+        for name, child in children.items():
+            yield f"{separator}{json.dumps(name)}: "
+            yield from child.iter_json(attribute)
+            separator = ", "
+        yield "}" + "".join(", " + item for item in tail) + "}"
+
+    def _cache_json(self, key: Any, version: int, rendered: str | bytes):
+        """Cache JSON that was rendered while the node had the given version."""
+        cache = self._json_cache
+        if cache is None:
+            cache = self._json_cache = {}
+        cache[key] = (version, rendered)
+
+    def _render_json(self, attribute: OSCQueryAttribute | None) -> str:
+        """Render the JSON for this node, reusing the cached JSON of the child nodes.
+        The output is the same as json.dumps(self, cls=OSCNodeEncoder, attribute_filter=attribute)."""
+        head, tail = self._json_items(attribute)
+        children = self._shared_children()
+        if children and attribute in (None, OSCQueryAttribute.CONTENTS):
+            contents = ", ".join(
+                f"{json.dumps(name)}: {child.to_json(attribute)}"
+                for name, child in children.items()
+            )
+            head.append(f'"CONTENTS": {{{contents}}}')
+
+        return "{" + ", ".join(head + tail) + "}"
 
-    def validate_values(self, values: list[T]) -> list[T]:
+    def _json_items(
+        self, attribute: OSCQueryAttribute | None
+    ) -> tuple[list[str], list[str]]:
+        """The rendered JSON items of this node, except CONTENTS.
+        Returns:
+            The items that go before CONTENTS, and the items that go after it
+        """
+        head = []
+        tail = []
+
+        if attribute in (None, OSCQueryAttribute.FULL_PATH):
+            head.append(f'"FULL_PATH": {json.dumps(self._full_path)}')
+
+        if attribute in (None, OSCQueryAttribute.VALUE) and self._value is not None:
+            value = self._value
+            # Typed arrays are converted in one go
+            tail.append(
+                f'"VALUE": {json.dumps(value.tolist() if type(value) is array else value)}'
+            )
+
+        if attribute in (None, OSCQueryAttribute.TYPE) and self._type is not None:
+            tail.append(f'"TYPE": "{python_type_list_to_osc_type(self._type)}"')
+
+        if attribute in (None, OSCQueryAttribute.ACCESS) and self._access is not None:
+            tail.append(f'"ACCESS": {int(self._access)}')
+
+        if (
+            attribute in (None, OSCQueryAttribute.DESCRIPTION)
+            and self._description is not None
+        ):
+            tail.append(f'"DESCRIPTION": {json.dumps(self._description)}')
+
+        return head, tail
+
+    def validate_values(self, values: Sequence[T]) -> Sequence[T]:
         """Validate the given value types against the specified types of this node.
 
         Sanitizes some values:
@@ -250,38 +618,32 @@ class OSCPathNode:
         equivalent.
 
         Args:
-            values: List of values to validate. Must be in the same order as configured for this node.
+            values: List (or tuple) of values to validate. Must be in the same order as configured for this node.
         Returns:
-             Sanitized values
+             Sanitized values. If all values already have the right types, this is the given sequence itself, otherwise
+             a new list.
         Raises:
             TypeError if any of the values are invalid, of if the number of values does
             not match the number of types of this node.
         """
-        if not self.type and values:
-            raise TypeError(f"Expected no value(s), got {len(values)}")
-
-        if not self.type:
-            return values
+        return self.validator(values)
 
-        if len(values) != len(self.type):
-            raise TypeError(f"Expected {len(self.type)} value(s), got {len(values)}")
-
-        for i, expected_type in enumerate(self.type):
-            received_type = type(values[i])
-            if received_type is not expected_type:
-                if (
-                    expected_type is builtins.bool
-                    and received_type is builtins.int
-                    and values[i] in (0, 1)
-                ):
-                    # Some clients might send int 0 or 1 as substitute for bool
-                    values[i] = bool(values[i])
-                    continue
-
-                raise TypeError(
-                    f"Expected {expected_type} for value {i}, got {type(values[i])}"
-                )
-        return values
+    @property
+    def validator(self) -> Callable[[Sequence[T]], Sequence[T]]:
+        """The function that validate_values() uses for this node. Callers that validate many messages for the same
+        node can keep it, to skip the lookup."""
+        value = self._value
+        if type(value) is array:
+            key = (value.typecode, len(value))
+            validator = _array_validators.get(key)
+            if validator is None:
+                validator = _array_validators[key] = compile_array_validator(*key)
+            return validator
+
+        validator = _validators.get(self._type)
+        if validator is None:
+            validator = _validators[self._type] = compile_validator(self._type)
+        return validator
 
     def are_values_valid(self, values: list[T]) -> bool:
         """Convenience method for validate_values()."""
@@ -293,8 +655,9 @@ class OSCPathNode:
 
     def __iter__(self):
         yield self
-        if self.contents is not None:
-            for subNode in self.contents:
+        children = self._shared_children()
+        if children is not None:
+            for subNode in children.values():
                 yield from subNode
 
     def __repr__(self) -> str:
@@ -306,6 +669,123 @@ class OSCPathNode:
         return self.full_path == other.full_path
 
 
+def compile_validator(
+    types: tuple[type, ...] | None,
+) -> Callable[[Sequence[T]], Sequence[T]]:
+    """Create a function that validates values against the given types, see OSCPathNode.validate_values().
+
+    Values that already have exactly the expected types are checked with a single comparison and returned as they
+    are. Only values that don't match go through the element-wise check, which converts ints that stand in for bools
+    and raises for everything else.
+    """
+    if not types:
+
+        def validate_no_values(values: Sequence[T]) -> Sequence[T]:
+            if values:
+                raise TypeError(f"Expected no value(s), got {len(values)}")
+            return values
+
+        return validate_no_values
+
+    if len(types) == 1:
+        # Most nodes have a single value
+        (expected_type,) = types
+
+        def validate_value(values: Sequence[T]) -> Sequence[T]:
+            if len(values) == 1 and type(values[0]) is expected_type:
+                return values
+            return _sanitize_values(types, values)
+
+        return validate_value
+
+    def validate_values(values: Sequence[T]) -> Sequence[T]:
+        if tuple(map(type, values)) == types:
+            return values
+        return _sanitize_values(types, values)
+
+    return validate_values
+
+
+def compile_array_validator(
+    typecode: str, count: int
+) -> Callable[[Sequence[T]], Sequence[T]]:
+    """Create a function that validates values for a node whose values are kept in an array with the given type code.
+
+    Arrays and one-dimensional memoryviews with the same type code are accepted as they are, after checking their
+    length. Other sequences are converted into a new array in a single call, which raises for values that don't fit
+    the type code. Bytes and bytearrays are sequences of single byte values, not the machine representation of the
+    values. Like ints that stand in for bools, ints are accepted for float arrays and converted.
+    """
+
+    def validate_array(values: Sequence[T]) -> Sequence[T]:
+        if len(values) != count:
+            raise TypeError(f"Expected {count} value(s), got {len(values)}")
+
+        if (type(values) is array and values.typecode == typecode) or (
+            type(values) is memoryview
+            and values.format == typecode
+            and values.ndim == 1
+        ):
+            return values
+
+        try:
+            validated = _new_array(typecode, values)
+        except (TypeError, OverflowError, NotImplementedError) as e:
+            raise TypeError(
+                f"Expected values of array type '{typecode}', got {values!r:.100}: {e}"
+            ) from None
+        if len(validated) != count:
+            raise TypeError(f"Expected {count} value(s), got {len(validated)}")
+        return validated
+
+    return validate_array
+
+
+def _to_array(typecode: str, values: Sequence[T]) -> array:
+    """Copy the values into a new array. Arrays and memoryviews of the same type are copied as a whole."""
+    if type(values) is array and values.typecode == typecode:
+        return values[:]
+
+    if type(values) is memoryview and values.format == typecode:
+        copy = array(typecode)
+        copy.frombytes(values.tobytes())
+        return copy
+
+    return _new_array(typecode, values)
+
+
+def _new_array(typecode: str, values: Sequence[T]) -> array:
+    """Create an array that holds the values. array() takes bytes and bytearrays as raw machine bytes, so they are
+    passed as a memoryview instead, which yields each byte as a value."""
+    if isinstance(values, (bytes, bytearray)):
+        values = memoryview(values)
+    return array(typecode, values)
+
+
+def _sanitize_values(types: tuple[type, ...], values: Sequence[T]) -> list[T]:
+    """The slow path of the validators: Check each value, and convert ints that stand in for bools."""
+    if len(values) != len(types):
+        raise TypeError(f"Expected {len(types)} value(s), got {len(values)}")
+
+    sanitized = list(values)
+    for i, expected_type in enumerate(types):
+        received_type = type(values[i])
+        if received_type is not expected_type:
+            if (
+                expected_type is builtins.bool
+                and received_type is builtins.int
+                and values[i] in (0, 1)
+            ):
+                # Some clients might send int 0 or 1 as substitute for bool
+                sanitized[i] = bool(values[i])
+                continue
+
+            raise TypeError(
+                f"Expected {expected_type} for value {i}, got {type(values[i])}"
+            )
+    return sanitized
+
+
 def python_type_list_to_osc_type(types_: list[type]) -> str:
     output = []
     for type_ in types_:
@@ -0,0 +1,97 @@
+import threading
+
+
+class ReadWriteLock:
+    """A lock that can be held by many readers at the same time, but by a writer only alone.
+
+    Writers are preferred: As soon as a writer waits for the lock, new readers have to wait as well, so that a steady
+    stream of readers can't starve writers. Therefore, the read lock must not be acquired recursively.
+
+    Used directly as a context manager, the lock is acquired for writing, just like a threading.Lock.
+
+    Example:
+        lock = ReadWriteLock()
+        with lock.read_lock:
+            ...  # Other readers may run concurrently
+        with lock.write_lock:  # or just: with lock:
+            ...  # Exclusive
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self.read_lock = _ReadLock(self)
+        self.write_lock = _WriteLock(self)
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            if self._readers < 1:
+                raise RuntimeError("Read lock released more often than acquired")
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            if not self._writer:
+                raise RuntimeError("Write lock released without being acquired")
+            self._writer = False
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire_write()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release_write()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(readers={self._readers}, writer={self._writer})"
+        )
+
+
+class _ReadLock:
+    __slots__ = ("_lock",)
+
+    def __init__(self, lock: ReadWriteLock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_read()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._lock.release_read()
+
+
+class _WriteLock:
+    __slots__ = ("_lock",)
+
+    def __init__(self, lock: ReadWriteLock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_write()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._lock.release_write()
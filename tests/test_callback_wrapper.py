@@ -1,11 +1,18 @@
 import builtins
+import json
 import logging
+import threading
 
 import pytest
-from pythonosc import osc_message_builder
+from pythonosc import osc_bundle_builder, osc_message_builder
 from pythonosc.dispatcher import Dispatcher
 
-from pythonoscquery.pythonosc_callback_wrapper import OSCCallbackWrapper, map_node
+from pythonoscquery import pythonosc_callback_wrapper
+from pythonoscquery.pythonosc_callback_wrapper import (
+    BundleDispatcher,
+    OSCCallbackWrapper,
+    map_node,
+)
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
 from pythonoscquery.shared.osc_path_node import OSCPathNode
@@ -55,6 +62,20 @@ def address_space():
     return OSCAddressSpace()
 
 
+@pytest.fixture
+def wrapper_log_level():
+    return logging.DEBUG
+
+
+@pytest.fixture(autouse=True)
+def wrapper_logger(wrapper_log_level):
+    logger = pythonosc_callback_wrapper.logger
+    previous_level = logger.level
+    logger.setLevel(wrapper_log_level)
+    yield logger
+    logger.setLevel(previous_level)
+
+
 def get_message_value(osc_path_node):
     """Build message value with the correct type.
     Don't use the same value as in the node spec, but create new one with the same type
@@ -322,3 +343,301 @@ class TestCallbackWrapper:
             assert called == pytest.approx(expected)
 
         callback.assert_called_once()
+
+    @pytest.mark.parametrize("address", ["/test"], indirect=False)
+    @pytest.mark.parametrize(
+        "osc_path_node",
+        [OSCPathNode("/test", value=[True, 99], access=OSCAccess.READWRITE_VALUE)],
+        indirect=False,
+    )
+    @pytest.mark.parametrize("needs_reply_address", [False, True], indirect=False)
+    @pytest.mark.parametrize("fixed_args", [["first fixed", 123], ()], indirect=False)
+    @pytest.mark.parametrize("message_values", [[False, 5], [0, 5]], indirect=False)
+    def test_values_validated_after_reply_address_and_fixed_args(
+        self,
+        osc_path_node,
+        dispatcher,
+        callback,
+        address,
+        needs_reply_address,
+        fixed_args,
+        message_values,
+    ):
+        map_node(
+            osc_path_node,
+            dispatcher,
+            callback,
+            None,
+            *fixed_args,
+            needs_reply_address=needs_reply_address,
+        )
+
+        message_builder = osc_message_builder.OscMessageBuilder(address)
+        for v in message_values:
+            message_builder.add_arg(v)
+        message = message_builder.build()
+
+        for h in dispatcher.handlers_for_address(address):
+            h.invoke(("dummy", 99), message)
+
+        expected_args = [address]
+        if needs_reply_address:
+            expected_args.insert(0, ("dummy", 99))
+        if fixed_args:
+            expected_args.append(fixed_args)
+        callback.assert_called_once_with(*expected_args, False, 5)
+        assert type(callback.call_args.args[-2]) is bool
+
+    @pytest.mark.parametrize(
+        "wrapper_log_level, expected_repr_calls",
+        [(logging.INFO, 0), (logging.DEBUG, 1)],
+        indirect=False,
+    )
+    def test_debug_message_only_formatted_when_debug_enabled(
+        self, osc_path_node, dispatcher, callback, mocker, expected_repr_calls
+    ):
+        handler = map_node(osc_path_node, dispatcher, callback)
+        wrapper_repr = mocker.patch.object(
+            OSCCallbackWrapper, "__repr__", return_value="wrapper"
+        )
+
+        handler.callback(osc_path_node.full_path)
+
+        assert wrapper_repr.call_count == expected_repr_calls
+        callback.assert_called_once_with(osc_path_node.full_path)
+
+    @pytest.mark.parametrize("address", ["/test"], indirect=False)
+    @pytest.mark.parametrize(
+        "osc_path_node",
+        [OSCPathNode("/test", value=[True, 99], access=OSCAccess.READWRITE_VALUE)],
+        indirect=False,
+    )
+    def test_stored_values_are_set_before_callback_is_called(
+        self, osc_path_node, dispatcher, address
+    ):
+        seen_values = []
+        map_node(
+            osc_path_node,
+            dispatcher,
+            lambda *args: seen_values.append(osc_path_node.value),
+            store_values=True,
+        )
+
+        for h in dispatcher.handlers_for_address(address):
+            h.invoke(("dummy", 99), build_message(address, [0, 5]))
+
+        assert seen_values == [[False, 5]]
+        assert json.loads(osc_path_node.to_json())["VALUE"] == [False, 5]
+
+    @pytest.mark.parametrize("address", ["/test"], indirect=False)
+    @pytest.mark.parametrize(
+        "osc_path_node",
+        [OSCPathNode("/test", value=67, access=OSCAccess.READWRITE_VALUE)],
+        indirect=False,
+    )
+    @pytest.mark.parametrize("message_values", [[5], ["invalid"]], indirect=False)
+    def test_values_not_stored_by_default_or_when_invalid(
+        self, osc_path_node, dispatcher, callback, address, message_values
+    ):
+        map_node(
+            osc_path_node,
+            dispatcher,
+            callback,
+            store_values=message_values == ["invalid"],
+        )
+
+        for h in dispatcher.handlers_for_address(address):
+            h.invoke(("dummy", 99), build_message(address, message_values))
+
+        assert osc_path_node.value == [67]
+
+    @pytest.mark.parametrize("address", ["/test"], indirect=False)
+    @pytest.mark.parametrize(
+        "osc_path_node",
+        [OSCPathNode("/test", value=67, access=OSCAccess.READWRITE_VALUE)],
+        indirect=False,
+    )
+    def test_values_stored_without_callback(self, osc_path_node, dispatcher, address):
+        map_node(osc_path_node, dispatcher, None, store_values=True)
+
+        for h in dispatcher.handlers_for_address(address):
+            h.invoke(("dummy", 99), build_message(address, [5]))
+
+        assert osc_path_node.value == [5]
+
+    def test_readers_see_consistent_stored_values(self, dispatcher, address_space):
+        node = OSCPathNode("/pair", value=[0, 0], access=OSCAccess.READWRITE_VALUE)
+        handler = map_node(node, dispatcher, None, address_space, store_values=True)
+        inconsistent = []
+
+        def read():
+            for _ in range(2000):
+                value = json.loads(address_space.root_node.to_json())["CONTENTS"][
+                    "pair"
+                ]["VALUE"]
+                if value[0] != value[1]:
+                    inconsistent.append(value)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(20000):
+            handler.callback("/pair", i, i)
+        reader.join()
+
+        assert inconsistent == []
+        assert node.value == [19999, 19999]
+
+
+def build_message(address: str, values: list):
+    message_builder = osc_message_builder.OscMessageBuilder(address)
+    for v in values:
+        message_builder.add_arg(v)
+    return message_builder.build()
+
+
+def build_bundle(*messages: tuple[str, list]) -> bytes:
+    bundle_builder = osc_bundle_builder.OscBundleBuilder(osc_bundle_builder.IMMEDIATELY)
+    for address, values in messages:
+        message_builder = osc_message_builder.OscMessageBuilder(address)
+        for v in values:
+            message_builder.add_arg(v)
+        bundle_builder.add_content(message_builder.build())
+    return bundle_builder.build().dgram
+
+
+@pytest.fixture
+def bundle_dispatcher():
+    return BundleDispatcher()
+
+
+@pytest.fixture
+def fader_node():
+    return OSCPathNode("/fader", value=[0, True], access=OSCAccess.READWRITE_VALUE)
+
+
+@pytest.fixture
+def label_node():
+    return OSCPathNode("/label", value="", access=OSCAccess.READWRITE_VALUE)
+
+
+class TestBundleDispatcher:
+    def test_batch_callback_called_once_with_all_valid_values(
+        self, bundle_dispatcher, fader_node, callback, mocker
+    ):
+        batch_callback = mocker.stub(name="batch_callback_stub")
+        map_node(fader_node, bundle_dispatcher, callback, batch_callback=batch_callback)
+        bundle = build_bundle(
+            ("/fader", [1, True]), ("/fader", ["invalid", True]), ("/fader", [3, 0])
+        )
+
+        bundle_dispatcher.call_handlers_for_packet(bundle, ("dummy", 99))
+
+        batch_callback.assert_called_once_with("/fader", [[1, True], [3, False]])
+        callback.assert_not_called()
+
+    def test_messages_grouped_by_node_without_batch_callback(
+        self, bundle_dispatcher, fader_node, label_node, callback
+    ):
+        map_node(fader_node, bundle_dispatcher, callback)
+        map_node(label_node, bundle_dispatcher, callback)
+        bundle = build_bundle(("/fader", [1, 1]), ("/label", ["a"]), ("/fader", [2, 0]))
+
+        bundle_dispatcher.call_handlers_for_packet(bundle, ("dummy", 99))
+
+        assert [c.args for c in callback.call_args_list] == [
+            ("/fader", 1, True),
+            ("/fader", 2, False),
+            ("/label", "a"),
+        ]
+
+    @pytest.mark.parametrize("needs_reply_address", [False, True], indirect=False)
+    @pytest.mark.parametrize("fixed_args", [["first fixed", 123], ()], indirect=False)
+    def test_batch_callback_called_with_reply_address_and_fixed_args(
+        self,
+        bundle_dispatcher,
+        label_node,
+        callback,
+        mocker,
+        needs_reply_address,
+        fixed_args,
+    ):
+        batch_callback = mocker.stub(name="batch_callback_stub")
+        map_node(
+            label_node,
+            bundle_dispatcher,
+            callback,
+            None,
+            *fixed_args,
+            needs_reply_address=needs_reply_address,
+            batch_callback=batch_callback,
+        )
+
+        bundle_dispatcher.call_handlers_for_packet(
+            build_bundle(("/label", ["a"]), ("/label", ["b"])), ("dummy", 99)
+        )
+
+        expected_args = ["/label"]
+        if needs_reply_address:
+            expected_args.insert(0, ("dummy", 99))
+        if fixed_args:
+            expected_args.append(fixed_args)
+        batch_callback.assert_called_once_with(*expected_args, [["a"], ["b"]])
+
+    def test_single_message_passed_to_batch_callback(
+        self, bundle_dispatcher, label_node, callback, mocker
+    ):
+        batch_callback = mocker.stub(name="batch_callback_stub")
+        map_node(label_node, bundle_dispatcher, callback, batch_callback=batch_callback)
+        message_builder = osc_message_builder.OscMessageBuilder("/label")
+        message_builder.add_arg("a")
+
+        bundle_dispatcher.call_handlers_for_packet(
+            message_builder.build().dgram, ("dummy", 99)
+        )
+
+        batch_callback.assert_called_once_with("/label", [["a"]])
+
+    def test_plain_handlers_called_for_each_message(
+        self, bundle_dispatcher, label_node, callback, mocker
+    ):
+        plain_callback = mocker.stub(name="plain_callback_stub")
+        map_node(label_node, bundle_dispatcher, callback)
+        bundle_dispatcher.map("/label", plain_callback)
+
+        bundle_dispatcher.call_handlers_for_packet(
+            build_bundle(("/label", ["a"]), ("/label", [5])), ("dummy", 99)
+        )
+
+        callback.assert_called_once_with("/label", "a")
+        assert [c.args for c in plain_callback.call_args_list] == [
+            ("/label", "a"),
+            ("/label", 5),
+        ]
+
+    def test_batch_callback_requires_bundle_dispatcher(
+        self, dispatcher, label_node, callback
+    ):
+        with pytest.raises(TypeError):
+            map_node(label_node, dispatcher, callback, batch_callback=callback)
+
+    def test_only_last_valid_values_of_bundle_are_stored(
+        self, bundle_dispatcher, fader_node, mocker
+    ):
+        batch_callback = mocker.stub(name="batch_callback_stub")
+        set_validated_values = mocker.spy(OSCPathNode, "set_validated_values")
+        map_node(
+            fader_node,
+            bundle_dispatcher,
+            None,
+            batch_callback=batch_callback,
+            store_values=True,
+        )
+        bundle = build_bundle(
+            ("/fader", [1, True]), ("/fader", [2, 0]), ("/fader", ["invalid", True])
+        )
+
+        bundle_dispatcher.call_handlers_for_packet(bundle, ("dummy", 99))
+
+        set_validated_values.assert_called_once_with(fader_node, [2, False])
+        assert fader_node.value == [2, False]
+        batch_callback.assert_called_once_with("/fader", [[1, True], [2, False]])
@@ -1,5 +1,9 @@
+import json
+import threading
+
 import pytest
 
+from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
 from pythonoscquery.shared.osc_path_node import OSCPathNode
 
@@ -105,3 +109,210 @@ class TestOSCAddressSpace:
         address_space.add_node(node)
         # Assert
         assert address_space.number_of_nodes == 4
+
+    def test_address_space_finds_child_nodes_of_added_container(self, address_space):
+        # Arrange
+        child = OSCPathNode("/foo/bar")
+        node = OSCPathNode("/foo", contents=[child])
+        # Act
+        address_space.add_node(node)
+        # Assert
+        assert address_space.find_node("/foo") is node
+        assert address_space.find_node("/foo/bar") is child
+        assert address_space.number_of_nodes == 3
+
+    def test_address_space_remove_node(self, address_space):
+        # Arrange
+        address_space.add_node(OSCPathNode("/foo/bar/baz"))
+        address_space.add_node(OSCPathNode("/foo/qux"))
+        # Act
+        removed = address_space.remove_node("/foo/bar")
+        # Assert
+        assert removed.full_path == "/foo/bar"
+        assert address_space.find_node("/foo/bar") is None
+        assert address_space.find_node("/foo/bar/baz") is None
+        assert address_space.find_node("/foo/qux") is not None
+        assert address_space.number_of_nodes == 3
+        assert removed not in address_space.find_node("/foo").contents
+
+    def test_address_space_removed_node_can_be_added_again(self, address_space):
+        # Arrange
+        address_space.add_node(OSCPathNode("/foo/bar"))
+        address_space.remove_node("/foo")
+        # Act
+        node = OSCPathNode("/foo/bar")
+        address_space.add_node(node)
+        # Assert
+        assert address_space.find_node("/foo/bar") is node
+        assert address_space.number_of_nodes == 3
+
+    def test_address_space_remove_non_existing_node_returns_none(self, address_space):
+        assert address_space.remove_node("/foo") is None
+
+    def test_address_space_remove_root_node_raises(self, address_space):
+        with pytest.raises(ValueError):
+            address_space.remove_node("/")
+
+    def test_address_space_add_nodes(self, address_space):
+        # Arrange
+        nodes = [
+            OSCPathNode("/foo/bar/baz"),
+            OSCPathNode("/foo/bar/qux"),
+            OSCPathNode("/other"),
+        ]
+        # Act
+        address_space.add_nodes(nodes)
+        # Assert
+        assert address_space.number_of_nodes == 6
+        for node in nodes:
+            assert address_space.find_node(node.full_path) is node
+        assert [n.full_path for n in address_space.find_node("/foo/bar").contents] == [
+            "/foo/bar/baz",
+            "/foo/bar/qux",
+        ]
+
+    def test_address_space_add_nodes_skips_existing_nodes(self, address_space):
+        # Arrange
+        existing = OSCPathNode("/foo/bar")
+        address_space.add_node(existing)
+        # Act
+        address_space.add_nodes([OSCPathNode("/foo/bar"), OSCPathNode("/foo/baz")])
+        # Assert
+        assert address_space.number_of_nodes == 4
+        assert address_space.find_node("/foo/bar") is existing
+
+    def test_address_space_add_nodes_accepts_generator(self, address_space):
+        # Act
+        address_space.add_nodes(OSCPathNode(f"/foo/{i}") for i in range(10))
+        # Assert
+        assert address_space.number_of_nodes == 12
+
+    def test_address_space_add_nodes_copies_children_once_per_container(
+        self, address_space, mocker
+    ):
+        # Arrange
+        address_space.add_node(OSCPathNode("/wide/existing"))
+        add_children = mocker.spy(OSCPathNode, "add_children")
+        # Act
+        address_space.add_nodes(
+            [OSCPathNode(f"/wide/node{i}") for i in range(1000)]
+            + [OSCPathNode("/new/container/node")]
+        )
+        # Assert
+        # "/wide", "/", "/new" and "/new/container" each get their new children at once
+        assert add_children.call_count == 4
+        assert len(address_space.find_node("/wide").contents) == 1001
+        assert address_space.find_node("/new/container/node").full_path == (
+            "/new/container/node"
+        )
+
+    def test_address_space_iteration_is_not_changed_by_added_nodes(self, address_space):
+        # Arrange
+        address_space.add_nodes(OSCPathNode(f"/foo/node{i}") for i in range(10))
+        nodes = iter(address_space.find_node("/foo"))
+        first = [next(nodes), next(nodes)]
+        # Act
+        for i in range(10, 20):
+            address_space.add_node(OSCPathNode(f"/foo/node{i}"))
+        address_space.remove_node("/foo/node5")
+        iterated = first + list(nodes)
+        # Assert
+        assert [node.full_path for node in iterated] == ["/foo"] + [
+            f"/foo/node{i}" for i in range(10)
+        ]
+        assert len(address_space.find_node("/foo").contents) == 19
+
+    def test_address_space_add_node_changes_unshared_children_in_place(
+        self, address_space
+    ):
+        # Arrange
+        address_space.add_node(OSCPathNode("/foo/node0"))
+        container = address_space.find_node("/foo")
+        children = container._children
+        # Act
+        address_space.add_node(OSCPathNode("/foo/node1"))
+        unshared = container._children
+        list(container)
+        address_space.add_node(OSCPathNode("/foo/node2"))
+        # Assert
+        assert unshared is children
+        assert container._children is not children
+        assert list(children) == ["node0", "node1"]
+
+    def test_address_space_add_nodes_keeps_nodes_before_invalid_one(
+        self, address_space
+    ):
+        # Arrange
+        address_space.add_node(
+            OSCPathNode("/method", access=OSCAccess.READWRITE_VALUE, value=1)
+        )
+        # Act
+        with pytest.raises(ValueError):
+            address_space.add_nodes(
+                [OSCPathNode("/foo"), OSCPathNode("/method/child"), OSCPathNode("/bar")]
+            )
+        # Assert
+        assert address_space.find_node("/foo") in address_space.root_node.contents
+        assert address_space.find_node("/method/child") is None
+        assert address_space.find_node("/bar") is None
+
+    def test_address_spaces_count_their_own_nodes(self):
+        # Arrange
+        ns_1 = OSCAddressSpace()
+        ns_2 = OSCAddressSpace()
+        # Act
+        ns_1.add_node(OSCPathNode("/foo/bar"))
+        # Assert
+        assert ns_1.number_of_nodes == 3
+        assert ns_2.number_of_nodes == 1
+
+    def test_address_space_version_changes(self, address_space):
+        # Arrange
+        versions = [address_space.version]
+        node = OSCPathNode("/foo/bar", access=OSCAccess.READWRITE_VALUE, value=1)
+        # Act
+        address_space.add_node(node)
+        versions.append(address_space.version)
+        node.value = 2
+        versions.append(address_space.version)
+        address_space.remove_node("/foo")
+        versions.append(address_space.version)
+        # Assert
+        assert len(set(versions)) == 4
+
+    def test_address_space_can_be_read_while_nodes_are_added_and_removed(
+        self, address_space
+    ):
+        # Arrange
+        address_space.add_nodes(OSCPathNode(f"/foo/node{i}") for i in range(100))
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    json.loads("".join(address_space.root_node.iter_json()))
+                    json.loads(address_space.root_node.to_json())
+                    list(address_space.root_node)
+                except Exception as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        # Act
+        for i in range(500):
+            address_space.add_node(OSCPathNode(f"/foo/new{i}"))
+            address_space.remove_node(f"/foo/node{i % 100}")
+            address_space.add_node(OSCPathNode(f"/foo/node{i % 100}"))
+        stop.set()
+        reader.join()
+        # Assert
+        assert errors == []
+        assert (
+            len(
+                json.loads(address_space.root_node.to_json())["CONTENTS"]["foo"][
+                    "CONTENTS"
+                ]
+            )
+            == 600
+        )
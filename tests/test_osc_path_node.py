@@ -1,10 +1,14 @@
 import builtins
+import gzip
+import json
+import zlib
+from array import array
 
 import pytest
 
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
-from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.osc_path_node import OSCNodeEncoder, OSCPathNode
 from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
 
 
@@ -211,6 +215,52 @@ class TestOSCPathNode:
         # Assert
         assert node.are_values_valid([12.55, False, 897, "gsdfg", 12]) is False
 
+    @pytest.mark.parametrize("values", [(12, "hi", False), [3.5], ()])
+    def test_node_validate_values_returns_matching_values_unchanged(self, values):
+        # Arrange
+        node = OSCPathNode(
+            "/test",
+            access=OSCAccess.READWRITE_VALUE if values else OSCAccess.NO_VALUE,
+            value=[type(v)() for v in values],
+        )
+        # Act
+        validated = node.validate_values(values)
+        # Assert
+        assert validated is values
+
+    @pytest.mark.parametrize("values", [(1, 0, 5), [1, 0, 5]])
+    def test_node_validate_values_converts_bool_substitutes(self, values):
+        # Arrange
+        node = OSCPathNode(
+            "/test", access=OSCAccess.READWRITE_VALUE, value=[True, False, 1]
+        )
+        # Act
+        validated = node.validate_values(values)
+        # Assert
+        assert validated == [True, False, 5]
+        assert type(validated[0]) is bool
+        # The given values are left as they are
+        assert type(values[0]) is int
+
+    @pytest.mark.parametrize("values", [(1.0,), (1.0, 2.0, 3.0), (1.0, 2)])
+    def test_node_validate_values_rejects_wrong_number_or_types(self, values):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=[0.0, 0.0])
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.validate_values(values)
+
+    def test_nodes_with_same_types_share_validator(self):
+        # Arrange
+        first = OSCPathNode("/a", access=OSCAccess.READWRITE_VALUE, value=[1, "x"])
+        second = OSCPathNode("/b", access=OSCAccess.READWRITE_VALUE, value=[2, "y"])
+        other = OSCPathNode("/c", access=OSCAccess.READWRITE_VALUE, value=["x", 1])
+        # Act
+        # Assert
+        assert first.validator is second.validator
+        assert first.validator is not other.validator
+
     def test_node_attributes_are_set(self):
         # Arrange
         child = OSCPathNode(
@@ -481,3 +531,434 @@ class TestOSCPathNode:
         # Assert
         with pytest.raises(ValueError):
             method_node.add_child(child_node)
+
+    def test_node_name_is_last_path_segment(self):
+        assert OSCPathNode("/test/foo/bar").name == "bar"
+        assert OSCPathNode("/").name == ""
+
+    def test_get_child_by_name(self):
+        # Arrange
+        child = OSCPathNode("/test/foo")
+        node = OSCPathNode("/test", contents=[child])
+        # Act
+        # Assert
+        assert node.get_child("foo") is child
+        assert node.get_child("bar") is None
+        assert child.get_child("foo") is None
+
+    def test_adding_child_with_existing_name_raises(self):
+        # Arrange
+        node = OSCPathNode("/test", contents=[OSCPathNode("/test/foo")])
+        # Act
+        # Assert
+        with pytest.raises(ValueError):
+            node.add_child(OSCPathNode("/test/foo"))
+
+    def test_contents_keep_insertion_order(self):
+        # Arrange
+        node = OSCPathNode("/test")
+        names = ["zeta", "alpha", "mu", "beta"]
+        # Act
+        for name in names:
+            node.add_child(OSCPathNode(f"/test/{name}"))
+        # Assert
+        assert [child.name for child in node.contents] == names
+        assert list(json.loads(node.to_json())["CONTENTS"]) == names
+
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("/test", "/test"),
+            ("/test/foo", "/test/foo"),
+            ("/test/foo/bar", "/test/foo/bar"),
+            ("/test/foo/baz", None),
+            ("/testing", None),
+            ("/other", None),
+        ],
+        indirect=False,
+    )
+    def test_find_subnode(self, path, expected):
+        # Arrange
+        bar = OSCPathNode("/test/foo/bar")
+        foo = OSCPathNode("/test/foo", contents=[bar])
+        node = OSCPathNode("/test", contents=[foo])
+        # Act
+        found = node.find_subnode(path)
+        # Assert
+        if expected is None:
+            assert found is None
+        else:
+            assert found.full_path == expected
+
+    def test_find_subnode_from_root(self):
+        # Arrange
+        child = OSCPathNode("/test")
+        root = OSCPathNode("/", contents=[child])
+        # Act
+        # Assert
+        assert root.find_subnode("/") is root
+        assert root.find_subnode("/test") is child
+
+    @pytest.mark.parametrize(
+        "attribute",
+        [
+            None,
+            OSCQueryAttribute.FULL_PATH,
+            OSCQueryAttribute.VALUE,
+            OSCQueryAttribute.ACCESS,
+            OSCQueryAttribute.CONTENTS,
+            OSCQueryAttribute.DESCRIPTION,
+            OSCQueryAttribute.TYPE,
+            OSCQueryAttribute.RANGE,
+        ],
+        indirect=False,
+    )
+    def test_node_json_matches_node_encoder(self, address_space, attribute):
+        # Arrange
+        address_space.add_nodes(
+            [
+                OSCPathNode(
+                    "/test/foo",
+                    access=OSCAccess.READONLY_VALUE,
+                    value=[99, 'he said "hello"', True, False, 123.5],
+                    description="foo ✓",
+                ),
+                OSCPathNode("/test/bar/baz", description="baz"),
+            ]
+        )
+        # Act
+        # Assert
+        for node in address_space.root_node:
+            assert node.to_json(attribute) == json.dumps(
+                node, cls=OSCNodeEncoder, attribute_filter=attribute
+            )
+
+    def test_node_json_is_cached(self):
+        # Arrange
+        node = OSCPathNode("/test", contents=[OSCPathNode("/test/foo")])
+        # Act
+        first = node.to_json()
+        second = node.to_json()
+        # Assert
+        assert first is second
+
+    def test_node_json_changed_value_invalidates_ancestors(self, address_space):
+        # Arrange
+        node = OSCPathNode("/test/foo", access=OSCAccess.READONLY_VALUE, value=1)
+        sibling = OSCPathNode("/test/bar", access=OSCAccess.READONLY_VALUE, value=2)
+        address_space.add_nodes([node, sibling])
+        root_json = address_space.root_node.to_json()
+        sibling_json = sibling.to_json()
+        # Act
+        node.value = 5
+        # Assert
+        assert node.to_json(OSCQueryAttribute.VALUE) == '{"VALUE": [5]}'
+        assert address_space.root_node.to_json() != root_json
+        assert json.loads(address_space.root_node.to_json())["CONTENTS"]["test"][
+            "CONTENTS"
+        ]["foo"]["VALUE"] == [5]
+        assert sibling.to_json() is sibling_json
+
+    def test_node_json_changed_description_invalidates_ancestors(self, address_space):
+        # Arrange
+        node = OSCPathNode("/test/foo", description="before")
+        address_space.add_node(node)
+        address_space.root_node.to_json()
+        # Act
+        node.description = "after"
+        # Assert
+        assert '"DESCRIPTION": "after"' in address_space.root_node.to_json()
+
+    def test_node_json_added_and_removed_children_invalidate_ancestors(
+        self, address_space
+    ):
+        # Arrange
+        address_space.add_node(OSCPathNode("/test/foo"))
+        address_space.root_node.to_json()
+        # Act 1
+        address_space.add_node(OSCPathNode("/test/bar"))
+        # Assert 1
+        assert '"/test/bar"' in address_space.root_node.to_json()
+        # Act 2
+        address_space.remove_node("/test/bar")
+        # Assert 2
+        assert '"/test/bar"' not in address_space.root_node.to_json()
+
+    def test_node_value_setter_rejects_wrong_types(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=[1, 2.0])
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.value = [1, "hello"]
+        assert node.value == [1, 2.0]
+
+    @pytest.mark.parametrize(
+        "attribute",
+        [
+            None,
+            OSCQueryAttribute.FULL_PATH,
+            OSCQueryAttribute.VALUE,
+            OSCQueryAttribute.CONTENTS,
+            OSCQueryAttribute.DESCRIPTION,
+        ],
+        indirect=False,
+    )
+    def test_node_iter_json_renders_same_json(self, address_space, attribute):
+        # Arrange
+        address_space.add_nodes(
+            [
+                OSCPathNode("/test/foo", access=OSCAccess.READONLY_VALUE, value=1.5),
+                OSCPathNode("/test/bar/baz", description="baz"),
+                OSCPathNode("/other", access=OSCAccess.READWRITE_VALUE, value="x"),
+            ]
+        )
+        root = address_space.root_node
+        # Act
+        streamed = "".join(root.iter_json(attribute))
+        # Assert
+        assert streamed == root.to_json(attribute)
+
+    def test_node_iter_json_does_not_fill_cache(self, address_space):
+        # Arrange
+        address_space.add_node(OSCPathNode("/test/foo/bar"))
+        root = address_space.root_node
+        # Act
+        parts = list(root.iter_json())
+        # Assert
+        assert len(parts) > 1
+        assert root._json_cache is None
+        assert address_space.find_node("/test")._json_cache is None
+
+    def test_node_iter_json_reuses_cached_json(self, address_space):
+        # Arrange
+        address_space.add_node(OSCPathNode("/test/foo/bar"))
+        cached = address_space.find_node("/test").to_json()
+        # Act
+        parts = list(address_space.root_node.iter_json())
+        # Assert
+        assert cached in parts
+
+    def test_node_version_changes_with_subtree(self, address_space):
+        # Arrange
+        node = OSCPathNode("/test/foo", access=OSCAccess.READWRITE_VALUE, value=1)
+        sibling = OSCPathNode("/other")
+        address_space.add_nodes([node, sibling])
+        container = address_space.find_node("/test")
+        versions = (address_space.root_node.version, container.version, node.version)
+        sibling_version = sibling.version
+        # Act
+        node.value = 2
+        # Assert
+        assert address_space.root_node.version != versions[0]
+        assert container.version != versions[1]
+        assert node.version != versions[2]
+        assert sibling.version == sibling_version
+
+    @pytest.mark.parametrize("encoding", ["gzip", "deflate"], indirect=False)
+    def test_node_compressed_json_is_cached_until_change(self, address_space, encoding):
+        # Arrange
+        node = OSCPathNode("/test/foo", access=OSCAccess.READWRITE_VALUE, value=1)
+        address_space.add_node(node)
+        root = address_space.root_node
+        # Act
+        first = root.to_compressed_json(encoding=encoding)
+        second = root.to_compressed_json(encoding=encoding)
+        node.value = 2
+        third = root.to_compressed_json(encoding=encoding)
+        # Assert
+        assert first is second
+        decompress = gzip.decompress if encoding == "gzip" else zlib.decompress
+        assert json.loads(decompress(third)) == json.loads(root.to_json())
+
+    def test_node_compressed_json_unsupported_encoding_raises(self):
+        with pytest.raises(ValueError):
+            OSCPathNode("/test").to_compressed_json(encoding="br")
+
+    def test_node_json_rendered_before_change_is_not_used_after_it(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=1)
+        version = node.version
+        # Act
+        node.value = 2
+        # A reader that started rendering before the change stores its result only afterwards
+        node._cache_json(None, version, '{"VALUE": [1]}')
+        # Assert
+        assert json.loads(node.to_json())["VALUE"] == [2]
+        assert "".join(node.iter_json()) == node.to_json()
+
+    def test_node_iter_json_renders_children_present_when_started(self, address_space):
+        # Arrange
+        address_space.add_nodes([OSCPathNode("/a"), OSCPathNode("/b")])
+        parts = address_space.root_node.iter_json()
+        streamed = next(parts)
+        # Act
+        address_space.add_node(OSCPathNode("/c"))
+        address_space.remove_node("/b")
+        streamed += "".join(parts)
+        # Assert
+        assert list(json.loads(streamed)["CONTENTS"]) == ["a", "b"]
+
+    def test_node_value_listeners_are_called_after_value_is_set(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=1)
+        seen = []
+
+        def listener(changed_node):
+            seen.append((changed_node, json.loads(changed_node.to_json())["VALUE"]))
+
+        node.add_value_listener(listener)
+        # Act
+        node.value = 2
+        node.remove_value_listener(listener)
+        node.value = 3
+        # Assert
+        assert seen == [(node, [2])]
+
+    def test_node_remove_unknown_value_listener_raises(self):
+        with pytest.raises(ValueError):
+            OSCPathNode("/test").remove_value_listener(print)
+
+    def test_node_set_validated_values_stores_copy_and_invalidates_json(self):
+        # Arrange
+        node = OSCPathNode("/test", access=OSCAccess.READWRITE_VALUE, value=[1, 2])
+        node.to_json()
+        version = node.version
+        values = (3, 4)
+        # Act
+        node.set_validated_values(values)
+        # Assert
+        assert node.value == [3, 4]
+        assert node.version != version
+        assert json.loads(node.to_json())["VALUE"] == [3, 4]
+
+
+class TestArrayBackedOSCPathNode:
+    def test_array_node_renders_like_list_node(self):
+        # Arrange
+        list_node = OSCPathNode(
+            "/meters", access=OSCAccess.READWRITE_VALUE, value=[0.5, 0.25, 1.0]
+        )
+        array_node = OSCPathNode(
+            "/meters",
+            access=OSCAccess.READWRITE_VALUE,
+            value=array("d", [0.5, 0.25, 1.0]),
+        )
+        # Act
+        # Assert
+        assert array_node.to_json() == list_node.to_json()
+        assert (
+            array_node.to_json(OSCQueryAttribute.VALUE) == '{"VALUE": [0.5, 0.25, 1.0]}'
+        )
+        assert array_node.type == [float, float, float]
+        assert json.dumps(array_node, cls=OSCNodeEncoder) == array_node.to_json()
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            [1, 2, 255],
+            (1, 2, 255),
+            array("B", [1, 2, 255]),
+            memoryview(bytes([1, 2, 255])),
+        ],
+    )
+    def test_array_node_stores_values_in_array(self, values):
+        # Arrange
+        node = OSCPathNode(
+            "/dmx", access=OSCAccess.READWRITE_VALUE, value=array("B", bytes(3))
+        )
+        # Act
+        node.value = values
+        # Assert
+        assert node.value == array("B", [1, 2, 255])
+        assert json.loads(node.to_json())["VALUE"] == [1, 2, 255]
+
+    def test_array_node_keeps_copy_of_values(self):
+        # Arrange
+        node = OSCPathNode(
+            "/meters", access=OSCAccess.READWRITE_VALUE, value=array("f", [0.0, 0.0])
+        )
+        values = array("f", [0.5, 0.25])
+        # Act
+        validated = node.validate_values(values)
+        node.value = values
+        values[0] = 1.0
+        # Assert
+        assert validated is values
+        assert node.value == array("f", [0.5, 0.25])
+
+    @pytest.mark.parametrize(
+        "typecode, values, expected",
+        [
+            ("f", bytearray(4), [0.0, 0.0, 0.0, 0.0]),
+            ("H", b"abcd", [97, 98, 99, 100]),
+            ("B", b"abcd", [97, 98, 99, 100]),
+            ("d", memoryview(b"abcd"), [97.0, 98.0, 99.0, 100.0]),
+        ],
+    )
+    def test_array_node_takes_bytes_as_byte_values(self, typecode, values, expected):
+        # Arrange
+        node = OSCPathNode(
+            "/dmx", access=OSCAccess.READWRITE_VALUE, value=array(typecode, [0] * 4)
+        )
+        # Act
+        node.value = values
+        # Assert
+        assert node.value == array(typecode, expected)
+        assert json.loads(node.to_json())["VALUE"] == expected
+
+    def test_array_node_rejects_bytes_of_wrong_length(self):
+        # Arrange
+        node = OSCPathNode(
+            "/meters", access=OSCAccess.READWRITE_VALUE, value=array("f", [0.0] * 4)
+        )
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.value = bytearray(16)
+        assert node.value == array("f", [0.0] * 4)
+
+    def test_array_node_accepts_ints_for_floats(self):
+        # Arrange
+        node = OSCPathNode(
+            "/meters", access=OSCAccess.READWRITE_VALUE, value=array("d", [0.0, 0.0])
+        )
+        # Act
+        node.value = [1, 2.5]
+        # Assert
+        assert node.value.tolist() == [1.0, 2.5]
+        assert all(type(v) is float for v in node.value)
+
+    @pytest.mark.parametrize(
+        "values", [[1, 2], [1, 2, 3, 4], [1, "2", 3], [1, 2, 256], [1, 2, 3.5]]
+    )
+    def test_array_node_rejects_invalid_values(self, values):
+        # Arrange
+        node = OSCPathNode(
+            "/dmx", access=OSCAccess.READWRITE_VALUE, value=array("B", bytes(3))
+        )
+        # Act
+        # Assert
+        with pytest.raises(TypeError):
+            node.value = values
+        assert node.value == array("B", bytes(3))
+
+    def test_array_node_with_character_type_code_raises(self):
+        with pytest.raises(ValueError):
+            OSCPathNode(
+                "/text", access=OSCAccess.READWRITE_VALUE, value=array("u", "ab")
+            )
+
+    def test_array_nodes_with_same_type_and_size_share_validator(self):
+        # Arrange
+        first = OSCPathNode(
+            "/a", access=OSCAccess.READWRITE_VALUE, value=array("f", [0.0] * 8)
+        )
+        second = OSCPathNode(
+            "/b", access=OSCAccess.READWRITE_VALUE, value=array("f", [1.0] * 8)
+        )
+        list_node = OSCPathNode("/c", access=OSCAccess.READWRITE_VALUE, value=[0.0] * 8)
+        # Act
+        # Assert
+        assert first.validator is second.validator
+        assert first.validator is not list_node.validator
@@ -0,0 +1,210 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+from zeroconf import ServiceInfo
+
+from pythonoscquery.osc_query_async_client import AsyncOSCQueryClient
+from pythonoscquery.osc_query_async_server import OSCQueryAsyncHTTPServer
+from pythonoscquery.osc_query_service import OSCQueryHTTPHandler, OSCQueryHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        [
+            OSCPathNode(
+                "/test/foo",
+                value=99,
+                access=OSCAccess.READWRITE_VALUE,
+                description="Test node",
+            ),
+            OSCPathNode(
+                "/test/write_only", value=1.5, access=OSCAccess.WRITEONLY_VALUE
+            ),
+        ]
+    )
+    # Big enough to be sent compressed
+    address_space.add_nodes(OSCPathNode(f"/other/node{i}") for i in range(50))
+    return address_space
+
+
+@pytest.fixture(params=["threading", "asyncio", "asyncio streamed"])
+def http_server(request, address_space):
+    host_info = OSCHostInfo("Unit test server", {"VALUE": True}, "127.0.0.1", 9000)
+    if request.param == "threading":
+        server = OSCQueryHTTPServer(
+            address_space, host_info, ("127.0.0.1", 0), OSCQueryHTTPHandler
+        )
+    else:
+        server = OSCQueryAsyncHTTPServer(
+            address_space,
+            host_info,
+            ("127.0.0.1", 0),
+            stream_responses=request.param == "asyncio streamed",
+        )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    if request.param == "threading":
+        server.server_close()
+    thread.join()
+
+
+def make_service_info(port: int) -> ServiceInfo:
+    return ServiceInfo(
+        "_oscjson._tcp.local.",
+        "Unit test server._oscjson._tcp.local.",
+        port=port,
+        addresses=[socket.inet_aton("127.0.0.1")],
+    )
+
+
+@pytest.fixture
+def service_info(http_server):
+    return make_service_info(http_server.server_address[1])
+
+
+def run(coroutine_function, *args):
+    """Run the coroutine function with a new client for the service info, which is closed afterwards."""
+
+    async def run_with_client():
+        async with AsyncOSCQueryClient(*args) as client:
+            return await coroutine_function(client)
+
+    return asyncio.run(run_with_client())
+
+
+class TestAsyncOSCQueryClient:
+    def test_get_host_info(self, service_info):
+        # Act
+        host_info = run(lambda client: client.get_host_info(), service_info)
+        # Assert
+        assert host_info.name == "Unit test server"
+        assert host_info.osc_port == 9000
+        assert host_info.osc_transport == "UDP"
+
+    def test_query_node(self, service_info):
+        # Act
+        node = run(lambda client: client.query_node("/test/foo"), service_info)
+        # Assert
+        assert node.full_path == "/test/foo"
+        assert node.value == [99]
+        assert node.description == "Test node"
+
+    def test_query_compressed_namespace(self, service_info, address_space):
+        # Act
+        node = run(lambda client: client.query_node("/"), service_info)
+        # Assert
+        assert len(node.contents[1].contents) == 50
+
+    def test_query_missing_node(self, service_info):
+        assert run(lambda client: client.query_node("/bogus"), service_info) is None
+
+    def test_query_node_revalidates_cached_json(self, service_info, address_space):
+        # Arrange
+        async def query_three_times(client):
+            first = await client.query_node("/test")
+            second = await client.query_node("/test")
+            address_space.find_node("/test/foo").value = 5
+            third = await client.query_node("/test")
+            return first, second, third
+
+        # Act
+        first, second, third = run(query_three_times, service_info)
+        # Assert
+        assert second.contents == first.contents
+        assert second.contents[0].value == [99]
+        assert third.contents[0].value == [5]
+
+    def test_query_attribute(self, service_info):
+        # Arrange
+        async def query_attributes(client):
+            return (
+                await client.query_value("/test/foo"),
+                await client.query_attribute("/test/foo", OSCQueryAttribute.TYPE),
+                await client.query_value("/test/write_only"),
+                await client.query_value("/bogus"),
+            )
+
+        # Act
+        value, type_, write_only_value, missing_value = run(
+            query_attributes, service_info
+        )
+        # Assert
+        assert value == [99]
+        assert type_ == "i"
+        assert write_only_value is None
+        assert missing_value is None
+
+    def test_query_values(self, service_info):
+        # Act
+        values = run(
+            lambda client: client.query_values(["/test/foo", "/test", "/bogus"]),
+            service_info,
+        )
+        # Assert
+        assert values == {"/test/foo": [99], "/test": None, "/bogus": None}
+
+    def test_query_attribute_batch(self, service_info):
+        # Act
+        descriptions = run(
+            lambda client: client.query_attribute_batch(
+                ["/test/foo", "/test/write_only"], OSCQueryAttribute.DESCRIPTION
+            ),
+            service_info,
+        )
+        # Assert
+        assert descriptions == {"/test/foo": "Test node", "/test/write_only": None}
+
+    def test_concurrent_queries_share_connections(self, service_info):
+        # Arrange
+        async def query_concurrently(client):
+            values = await asyncio.gather(
+                *(client.query_value("/test/foo") for _ in range(20))
+            )
+            return values, len(client._idle_connections)
+
+        # Act
+        values, idle_connections = run(query_concurrently, service_info, 2)
+        # Assert
+        assert values == [[99]] * 20
+        assert idle_connections <= 2
+
+    def test_reconnects_after_service_closed_connection(self, service_info):
+        # Arrange
+        async def query_after_close(client):
+            await client.query_value("/test/foo")
+            for _, writer in client._idle_connections:
+                # Stands in for the service closing the idle connection
+                writer.transport.abort()
+            return await client.query_value("/test/foo")
+
+        # Act
+        value = run(query_after_close, service_info)
+        # Assert
+        assert value == [99]
+
+    def test_unresponsive_service_times_out(self):
+        # Arrange
+        server_socket = socket.create_server(("127.0.0.1", 0))
+        service_info = make_service_info(server_socket.getsockname()[1])
+        # Act
+        node = run(lambda client: client.query_node("/"), service_info, 1, 0.2)
+        server_socket.close()
+        # Assert
+        assert node is None
+
+    def test_service_info_must_be_oscquery_service(self):
+        with pytest.raises(Exception):
+            AsyncOSCQueryClient(
+                ServiceInfo("_http._tcp.local.", "Web server._http._tcp.local.")
+            )
@@ -0,0 +1,230 @@
+import http.client
+import logging
+import socket
+import threading
+
+import pytest
+import urllib3
+
+from pythonoscquery.osc_query_async_server import OSCQueryAsyncHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        [
+            OSCPathNode(
+                "/test",
+                value=99,
+                access=OSCAccess.READONLY_VALUE,
+                description="Test node",
+            ),
+            OSCPathNode(
+                "/write_only",
+                value=123,
+                access=OSCAccess.WRITEONLY_VALUE,
+                description="Write only node",
+            ),
+        ]
+    )
+    return address_space
+
+
+@pytest.fixture
+def host_info():
+    return OSCHostInfo("Unit test server", {"VALUE": True}, "127.0.0.1", 9000, "UDP")
+
+
+@pytest.fixture
+def stream_responses():
+    return False
+
+
+@pytest.fixture
+def server(address_space, host_info, stream_responses):
+    server = OSCQueryAsyncHTTPServer(
+        address_space,
+        host_info,
+        ("127.0.0.1", 0),
+        stream_responses=stream_responses,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def url(server):
+    host, port = server.server_address
+    return f"http://{host}:{port}"
+
+
+class TestOSCQueryAsyncHTTPServer:
+    def test_host_info(self, url):
+        response = urllib3.request("GET", f"{url}/?HOST_INFO")
+        assert response.status == 200
+        assert response.json()["NAME"] == "Unit test server"
+
+    @pytest.mark.parametrize("stream_responses", [False, True], indirect=False)
+    def test_namespace(self, url, address_space):
+        response = urllib3.request("GET", f"{url}/")
+        assert response.status == 200
+        assert response.data.decode() == address_space.root_node.to_json()
+
+    def test_attribute(self, url):
+        response = urllib3.request("GET", f"{url}/test?VALUE")
+        assert response.status == 200
+        assert response.json() == {"VALUE": [99]}
+
+    @pytest.mark.parametrize(
+        "path, status",
+        [
+            ("/some_bogus_address", 404),
+            ("/test?BOGUSATTRIBUTE", 400),
+            ("/write_only?VALUE", 204),
+        ],
+        indirect=False,
+    )
+    def test_error_status(self, url, path, status):
+        response = urllib3.request("GET", f"{url}{path}")
+        assert response.status == status
+
+    def test_batch_query(self, url):
+        # Act
+        response = urllib3.request(
+            "POST", f"{url}/", json={"PATHS": ["/test"], "ATTRIBUTES": ["VALUE"]}
+        )
+        # Assert
+        assert response.status == 200
+        assert response.json() == {"/test": {"VALUE": [99]}}
+
+    def test_too_large_request(self, server):
+        # Arrange
+        connection = http.client.HTTPConnection(*server.server_address)
+        # Act
+        connection.putrequest("POST", "/")
+        connection.putheader("Content-Length", str(64 * 1024 * 1024))
+        connection.endheaders()
+        response = connection.getresponse()
+        # Assert
+        assert response.status == 413
+        assert response.getheader("Connection") == "close"
+        connection.close()
+
+    @pytest.mark.parametrize(
+        "header, value",
+        [
+            ("Content-Length", "ten"),
+            ("Content-Length", "-1"),
+            ("Transfer-Encoding", "chunked"),
+        ],
+    )
+    def test_batch_query_without_valid_length_closes_connection(
+        self, server, header, value
+    ):
+        # Arrange
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        # Act
+        connection.putrequest("POST", "/")
+        connection.putheader(header, value)
+        connection.endheaders()
+        response = connection.getresponse()
+        # Assert
+        assert response.status == 400
+        assert response.getheader("Connection") == "close"
+        connection.close()
+
+    def test_unsupported_method(self, url):
+        response = urllib3.request("DELETE", f"{url}/test")
+        assert response.status == 501
+
+    def test_shutdown_without_serving_closes_socket(self, address_space, host_info):
+        server = OSCQueryAsyncHTTPServer(address_space, host_info, ("127.0.0.1", 0))
+        server.shutdown()
+        assert server.socket.fileno() == -1
+
+    def test_shutdown_ends_handlers_of_idle_connections(self, address_space, host_info):
+        # Arrange
+        server = OSCQueryAsyncHTTPServer(address_space, host_info, ("127.0.0.1", 0))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        errors = []
+        handler = logging.Handler(logging.ERROR)
+        handler.emit = errors.append
+        logging.getLogger("asyncio").addHandler(handler)
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request("GET", "/test?VALUE")
+        connection.getresponse().read()
+        # Act
+        server.shutdown()
+        thread.join()
+        logging.getLogger("asyncio").removeHandler(handler)
+        connection.close()
+        # Assert
+        assert not server._handlers
+        assert errors == []
+
+    def test_connection_is_kept_alive(self, server, address_space):
+        # Arrange
+        connection = http.client.HTTPConnection(*server.server_address)
+        # Act
+        responses = []
+        for path in ("/test?VALUE", "/write_only?VALUE", "/bogus", "/"):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            responses.append((response.status, response.read()))
+        # Assert
+        assert responses == [
+            (200, b'{"VALUE": [99]}'),
+            (204, b""),
+            (404, b"OSC Path not found"),
+            (200, address_space.root_node.to_json().encode()),
+        ]
+        connection.close()
+
+    @pytest.mark.parametrize("stream_responses", [True], indirect=False)
+    def test_streamed_response_keeps_connection_alive(self, server, address_space):
+        # Arrange
+        connection = http.client.HTTPConnection(*server.server_address)
+        # Act
+        bodies = []
+        for _ in range(2):
+            connection.request("GET", "/")
+            response = connection.getresponse()
+            bodies.append(response.read())
+        # Assert
+        assert bodies == [address_space.root_node.to_json().encode()] * 2
+        connection.close()
+
+    @pytest.mark.parametrize(
+        "request_version, connection_header, expected",
+        [
+            ("HTTP/1.1", None, None),
+            ("HTTP/1.1", "close", "close"),
+            ("HTTP/1.0", None, "close"),
+            ("HTTP/1.0", "keep-alive", "keep-alive"),
+        ],
+        indirect=False,
+    )
+    def test_connection_header(
+        self, server, request_version, connection_header, expected
+    ):
+        # Arrange
+        request = f"GET /test?VALUE {request_version}\r\n"
+        if connection_header:
+            request += f"Connection: {connection_header}\r\n"
+        # Act
+        with socket.create_connection(server.server_address) as sock:
+            sock.sendall(request.encode() + b"\r\n")
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+        # Assert
+        assert response.status == 200
+        assert response.getheader("Connection") == expected
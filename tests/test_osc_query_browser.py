@@ -0,0 +1,249 @@
+import socket
+import threading
+import time
+
+import pytest
+from zeroconf import ServiceInfo
+
+from pythonoscquery.osc_query_browser import OSCQueryBrowser, ServiceCache
+from pythonoscquery.osc_query_client import OSCQueryClient
+from pythonoscquery.osc_query_service import OSCQueryHTTPHandler, OSCQueryHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+TIMEOUT = 0.5
+
+
+def make_service_info(name: str, port: int) -> ServiceInfo:
+    return ServiceInfo(
+        "_oscjson._tcp.local.",
+        f"{name}._oscjson._tcp.local.",
+        port=port,
+        addresses=[socket.inet_aton("127.0.0.1")],
+    )
+
+
+@pytest.fixture
+def http_servers():
+    servers = []
+    for name in ("Mixer", "Lights"):
+        address_space = OSCAddressSpace()
+        address_space.add_node(
+            OSCPathNode(
+                f"/{name.lower()}/level", value=0.5, access=OSCAccess.READWRITE_VALUE
+            )
+        )
+        address_space.add_node(
+            OSCPathNode("/shared", value=name, access=OSCAccess.READONLY_VALUE)
+        )
+        server = OSCQueryHTTPServer(
+            address_space,
+            OSCHostInfo(name, {}, "127.0.0.1", 9000, "UDP"),
+            ("127.0.0.1", 0),
+            OSCQueryHTTPHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def unresponsive_socket():
+    # Accepts connections (into its backlog), but never answers
+    server_socket = socket.create_server(("127.0.0.1", 0))
+    yield server_socket
+    server_socket.close()
+
+
+@pytest.fixture
+def cache_namespaces():
+    return False
+
+
+@pytest.fixture
+def browser(mocker, http_servers, unresponsive_socket, cache_namespaces):
+    mocker.patch("pythonoscquery.osc_query_browser.Zeroconf")
+    mocker.patch("pythonoscquery.osc_query_browser.ServiceBrowser")
+    browser = OSCQueryBrowser(timeout=TIMEOUT, cache_namespaces=cache_namespaces)
+    services = {
+        "Unresponsive": unresponsive_socket.getsockname()[1],
+        "Mixer": http_servers[0].server_address[1],
+        "Lights": http_servers[1].server_address[1],
+    }
+    for name, port in services.items():
+        svc = make_service_info(name, port)
+        browser.listener.oscjson_services[svc.name] = svc
+    yield browser
+    browser.close()
+
+
+class TestOSCQueryBrowser:
+    def test_find_service_by_name(self, browser):
+        # Act
+        svc = browser.find_service_by_name("Lights")
+        # Assert
+        assert svc.name == "Lights._oscjson._tcp.local."
+
+    def test_find_service_by_name_not_found(self, browser):
+        assert browser.find_service_by_name("Projector") is None
+
+    def test_find_nodes_by_endpoint_address(self, browser):
+        # Act
+        start = time.perf_counter()
+        found = browser.find_nodes_by_endpoint_address("/shared")
+        elapsed = time.perf_counter() - start
+        # Assert
+        assert sorted(hi.name for _, hi, _ in found) == ["Lights", "Mixer"]
+        assert all(node.value == [hi.name] for _, hi, node in found)
+        # The unresponsive service is waited for once, not for every other service
+        assert elapsed < 3 * TIMEOUT
+
+    def test_find_nodes_by_endpoint_address_only_returns_services_with_node(
+        self, browser
+    ):
+        # Act
+        found = browser.find_nodes_by_endpoint_address("/mixer/level")
+        # Assert
+        assert [svc.name for svc, _, _ in found] == ["Mixer._oscjson._tcp.local."]
+
+    def test_iter_nodes_by_endpoint_address_yields_before_slow_services_answer(
+        self, browser
+    ):
+        # Arrange
+        start = time.perf_counter()
+        results = browser.iter_nodes_by_endpoint_address("/shared")
+        # Act
+        next(results)
+        # Assert
+        assert time.perf_counter() - start < TIMEOUT
+        results.close()
+
+    def test_iter_host_infos(self, browser):
+        # Act
+        names = [hi.name for _, hi in browser.iter_host_infos()]
+        # Assert
+        assert sorted(names) == ["Lights", "Mixer"]
+
+    def test_host_infos_are_cached(self, browser, mocker):
+        # Arrange
+        get_host_info = mocker.spy(OSCQueryClient, "get_host_info")
+        browser.find_service_by_name("Projector")
+        # Act
+        browser.find_service_by_name("Projector")
+        browser.find_nodes_by_endpoint_address("/shared")
+        # Assert
+        # The two services that answered are only asked once, the unresponsive one every time
+        assert get_host_info.call_count == 2 + 3
+
+    def test_updated_service_is_queried_again(self, browser, mocker):
+        # Arrange
+        browser.find_service_by_name("Projector")
+        get_host_info = mocker.spy(OSCQueryClient, "get_host_info")
+        name = "Mixer._oscjson._tcp.local."
+        zc = mocker.Mock()
+        zc.get_service_info.return_value = browser.listener.oscjson_services[name]
+        # Act
+        browser.listener.update_service(zc, "_oscjson._tcp.local.", name)
+        browser.find_service_by_name("Projector")
+        # Assert
+        queried = [
+            call.args[0].service_info.name for call in get_host_info.call_args_list
+        ]
+        assert sorted(queried) == [name, "Unresponsive._oscjson._tcp.local."]
+
+    def test_removed_service_is_dropped_from_cache(self, browser):
+        # Arrange
+        name = "Mixer._oscjson._tcp.local."
+        browser.find_service_by_name("Projector")
+        # Act
+        browser.listener.remove_service(None, "_oscjson._tcp.local.", name)
+        # Assert
+        assert browser.listener.host_infos.get(name) is None
+        assert name not in browser.listener.clients
+        assert (
+            browser.listener.host_infos.get("Lights._oscjson._tcp.local.") is not None
+        )
+
+    def test_clients_are_reused_for_repeated_lookups(self, browser, mocker):
+        # Arrange
+        init = mocker.spy(OSCQueryClient, "__init__")
+        browser.find_nodes_by_endpoint_address("/shared")
+        # Act
+        browser.find_nodes_by_endpoint_address("/mixer/level")
+        browser.find_nodes_by_endpoint_address("/shared")
+        # Assert
+        assert init.call_count == 3
+        assert all(
+            call.kwargs["session"] is browser._session for call in init.call_args_list
+        )
+
+    def test_client_is_dropped_when_service_is_updated(self, browser, mocker):
+        # Arrange
+        name = "Mixer._oscjson._tcp.local."
+        browser.find_service_by_name("Projector")
+        client = browser.listener.clients[name]
+        zc = mocker.Mock()
+        zc.get_service_info.return_value = make_service_info(
+            "Mixer", browser.listener.oscjson_services[name].port
+        )
+        # Act
+        browser.listener.update_service(zc, "_oscjson._tcp.local.", name)
+        found = browser.find_nodes_by_endpoint_address("/mixer/level")
+        # Assert
+        assert found[0][0] is zc.get_service_info.return_value
+        assert browser.listener.clients[name] is not client
+        assert browser.listener.clients[name].service_info is found[0][0]
+
+    @pytest.mark.parametrize("cache_namespaces", [True], indirect=False)
+    def test_nodes_are_found_in_cached_namespaces(self, browser, http_servers, mocker):
+        # Arrange
+        query_node = mocker.spy(OSCQueryClient, "query_node")
+        browser.find_nodes_by_endpoint_address("/shared")
+        http_servers[0].address_space.find_node("/mixer/level").value = 1.0
+        # Act
+        found = browser.find_nodes_by_endpoint_address("/mixer/level")
+        # Assert
+        assert query_node.call_count == 2
+        assert found[0][2].value == [0.5]
+        assert browser.find_nodes_by_endpoint_address("/bogus") == []
+
+
+class TestServiceCache:
+    def test_value_expires(self, mocker):
+        # Arrange
+        monotonic = mocker.patch(
+            "pythonoscquery.osc_query_browser.time.monotonic", return_value=100.0
+        )
+        cache = ServiceCache(10)
+        cache.put("svc", "value", cache.generation("svc"))
+        # Act
+        monotonic.return_value = 109.0
+        before_expiry = cache.get("svc")
+        monotonic.return_value = 110.0
+        after_expiry = cache.get("svc")
+        # Assert
+        assert before_expiry == "value"
+        assert after_expiry is None
+
+    def test_value_queried_before_invalidation_is_not_stored(self):
+        # Arrange
+        cache = ServiceCache(10)
+        generation = cache.generation("svc")
+        # Act
+        cache.invalidate("svc")
+        cache.put("svc", "outdated", generation)
+        # Assert
+        assert cache.get("svc") is None
+
+    def test_zero_ttl_disables_cache(self):
+        # Arrange
+        cache = ServiceCache(0)
+        # Act
+        cache.put("svc", "value", cache.generation("svc"))
+        # Assert
+        assert cache.get("svc") is None
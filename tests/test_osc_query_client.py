@@ -0,0 +1,261 @@
+import socket
+import threading
+import time
+
+import pytest
+from zeroconf import ServiceInfo
+
+from pythonoscquery.osc_query_client import OSCQueryClient, make_session
+from pythonoscquery.osc_query_http import BATCH_QUERY_EXTENSION
+from pythonoscquery.osc_query_service import OSCQueryHTTPHandler, OSCQueryHTTPServer
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+from pythonoscquery.shared.oscquery_spec import OSCQueryAttribute
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_node(
+        OSCPathNode(
+            "/test/foo",
+            value=99,
+            access=OSCAccess.READWRITE_VALUE,
+            description="Test node",
+        )
+    )
+    return address_space
+
+
+@pytest.fixture
+def http_server(address_space):
+    server = OSCQueryHTTPServer(
+        address_space,
+        OSCHostInfo("Unit test server", {"VALUE": True}, "127.0.0.1", 9000, "UDP"),
+        ("127.0.0.1", 0),
+        OSCQueryHTTPHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def service_info(http_server):
+    return ServiceInfo(
+        "_oscjson._tcp.local.",
+        "Unit test server._oscjson._tcp.local.",
+        port=http_server.server_address[1],
+        addresses=[socket.inet_aton("127.0.0.1")],
+    )
+
+
+@pytest.fixture
+def client(service_info):
+    with OSCQueryClient(service_info) as client:
+        yield client
+
+
+@pytest.fixture
+def requests_get(mocker, client):
+    return mocker.spy(client.session, "get")
+
+
+@pytest.fixture
+def unresponsive_service_info():
+    # Accepts connections (into its backlog), but never answers
+    server_socket = socket.create_server(("127.0.0.1", 0))
+    yield ServiceInfo(
+        "_oscjson._tcp.local.",
+        "Unresponsive server._oscjson._tcp.local.",
+        port=server_socket.getsockname()[1],
+        addresses=[socket.inet_aton("127.0.0.1")],
+    )
+    server_socket.close()
+
+
+class TestOSCQueryClient:
+    def test_get_host_info(self, client):
+        host_info = client.get_host_info()
+        assert host_info.name == "Unit test server"
+        assert host_info.osc_port == 9000
+
+    def test_query_node(self, client):
+        node = client.query_node("/test/foo")
+        assert node.full_path == "/test/foo"
+        assert node.value == [99]
+        assert node.description == "Test node"
+
+    def test_query_missing_node(self, client):
+        assert client.query_node("/bogus") is None
+
+    def test_query_node_revalidates_cached_json(self, client, requests_get):
+        # Arrange
+        first = client.query_node("/test")
+        # Act
+        second = client.query_node("/test")
+        # Assert
+        first_response, second_response = requests_get.spy_return_list
+        assert (
+            requests_get.call_args_list[1].kwargs["headers"]["If-None-Match"]
+            == first_response.headers["ETag"]
+        )
+        assert second_response.status_code == 304
+        assert second.contents == first.contents
+        assert client.last_json["CONTENTS"]["foo"]["VALUE"] == [99]
+
+    def test_query_node_sees_changes(self, client, address_space):
+        # Arrange
+        client.query_node("/test")
+        # Act
+        address_space.find_node("/test/foo").value = 5
+        node = client.query_node("/test")
+        # Assert
+        assert node.contents[0].value == [5]
+
+    def test_query_node_requests_compression(self, client, address_space, requests_get):
+        # Arrange
+        for i in range(20):
+            address_space.add_node(OSCPathNode(f"/test/container{i}"))
+        # Act
+        node = client.query_node("/")
+        # Assert
+        assert requests_get.spy_return.headers["Content-Encoding"] == "gzip"
+        assert len(node.contents[0].contents) == 21
+
+    def test_queries_reuse_connection(self, client, http_server, mocker):
+        # Arrange
+        process_request = mocker.spy(http_server, "process_request")
+        # Act
+        client.get_host_info()
+        client.query_node("/test")
+        client.query_node("/test/foo")
+        # Assert
+        assert process_request.call_count == 1
+
+    def test_close_closes_session(self, client, mocker):
+        # Arrange
+        session_close = mocker.spy(client.session, "close")
+        # Act
+        with client:
+            client.query_node("/test")
+        # Assert
+        session_close.assert_called_once()
+
+    def test_shared_session(self, service_info, http_server, mocker):
+        # Arrange
+        session = make_session(hosts=8)
+        session_get = mocker.spy(session, "get")
+        clients = [OSCQueryClient(service_info, session=session) for _ in range(2)]
+        # Act
+        for client in clients:
+            client.query_node("/test")
+        # Assert
+        assert session_get.call_count == 2
+
+    def test_unresponsive_service_times_out(self, unresponsive_service_info):
+        # Arrange
+        client = OSCQueryClient(unresponsive_service_info, timeout=0.2)
+        start = time.perf_counter()
+        # Act
+        node = client.query_node("/")
+        host_info = client.get_host_info()
+        # Assert
+        assert node is None
+        assert host_info is None
+        assert time.perf_counter() - start < 5
+
+    def test_query_value(self, client):
+        assert client.query_value("/test/foo") == [99]
+
+    def test_query_attribute(self, client):
+        assert client.query_attribute("/test/foo", OSCQueryAttribute.TYPE) == "i"
+        assert client.query_attribute("/test/foo", OSCQueryAttribute.ACCESS) == 3
+
+    def test_query_value_of_container_or_missing_node(self, client):
+        assert client.query_value("/test") is None
+        assert client.query_value("/bogus") is None
+
+    def test_query_value_only_transfers_value(
+        self, client, address_space, requests_get
+    ):
+        # Arrange
+        for i in range(100):
+            address_space.add_node(
+                OSCPathNode(
+                    f"/test/sibling{i}", value=i, access=OSCAccess.READWRITE_VALUE
+                )
+            )
+        # Act
+        client.query_value("/test/foo")
+        # Assert
+        assert requests_get.spy_return.content == b'{"VALUE": [99]}'
+
+    def test_query_values(self, client, address_space, http_server, mocker):
+        # Arrange
+        address_space.add_node(
+            OSCPathNode("/test/bar", value=[1.5, "x"], access=OSCAccess.READONLY_VALUE)
+        )
+        process_request = mocker.spy(http_server, "process_request")
+        # Act
+        values = client.query_values(["/test/foo", "/test/bar", "/test", "/bogus"])
+        # Assert
+        assert values == {
+            "/test/foo": [99],
+            "/test/bar": [1.5, "x"],
+            "/test": None,
+            "/bogus": None,
+        }
+        assert process_request.call_count == 1
+
+    def test_query_attribute_batch(self, client):
+        # Act
+        descriptions = client.query_attribute_batch(
+            ["/test/foo", "/test"], OSCQueryAttribute.DESCRIPTION
+        )
+        # Assert
+        assert descriptions == {"/test/foo": "Test node", "/test": None}
+
+    def test_query_batch(self, client):
+        # Act
+        result = client.query_batch(
+            ["/test/foo", "/bogus"], [OSCQueryAttribute.VALUE, OSCQueryAttribute.TYPE]
+        )
+        # Assert
+        assert result == {"/test/foo": {"VALUE": [99], "TYPE": "i"}, "/bogus": None}
+
+    def test_query_values_uses_batch_query_if_supported(
+        self, client, http_server, address_space, mocker
+    ):
+        # Arrange
+        http_server.host_info.extensions[BATCH_QUERY_EXTENSION] = True
+        address_space.add_node(
+            OSCPathNode("/test/bar", value=1.5, access=OSCAccess.READONLY_VALUE)
+        )
+        session_post = mocker.spy(client.session, "post")
+        session_get = mocker.spy(client.session, "get")
+        # Act
+        values = client.query_values(["/test/foo", "/test/bar", "/test", "/bogus"])
+        client.query_values(["/test/foo"])
+        # Assert
+        assert values == {
+            "/test/foo": [99],
+            "/test/bar": [1.5],
+            "/test": None,
+            "/bogus": None,
+        }
+        assert session_post.call_count == 2
+        # Only the host info, once
+        assert session_get.call_count == 1
+
+    def test_supports_batch_query(self, client, http_server):
+        # Arrange
+        http_server.host_info.extensions[BATCH_QUERY_EXTENSION] = True
+        # Act
+        # Assert
+        assert client.supports_batch_query()
@@ -0,0 +1,223 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from pythonoscquery.osc_query_http import (
+    etag_matches,
+    negotiate_encoding,
+    request_body_length,
+    resolve_batch_request,
+    resolve_request,
+)
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        OSCPathNode(
+            f"/fixture{i}/dimmer",
+            value=0.5,
+            access=OSCAccess.READWRITE_VALUE,
+            description="Dimmer",
+        )
+        for i in range(50)
+    )
+    return address_space
+
+
+@pytest.fixture
+def host_info():
+    return OSCHostInfo("Unit test server", {"VALUE": True})
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    return zlib.decompress(body)
+
+
+class TestResolveRequest:
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            (None, None),
+            ("", None),
+            ("gzip", "gzip"),
+            ("deflate", "deflate"),
+            ("gzip, deflate", "gzip"),
+            ("deflate, gzip", "gzip"),
+            ("gzip;q=0.5, deflate", "deflate"),
+            ("gzip;q=0, deflate;q=0", None),
+            ("br", None),
+            ("*", "gzip"),
+            ("gzip;q=0, *", "deflate"),
+            ("*;q=0.5, deflate", "deflate"),
+            ("deflate;q=0.5, *", "gzip"),
+            ("*, gzip;q=0, deflate;q=0", None),
+            ("*;q=0", None),
+            ("identity", None),
+            ("GZIP", "gzip"),
+        ],
+        indirect=False,
+    )
+    def test_negotiate_encoding(self, accept_encoding, expected):
+        assert negotiate_encoding(accept_encoding) == expected
+
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({}, 0),
+            ({"Content-Length": "42"}, 42),
+            ({"Content-Length": " 42 "}, 42),
+            ({"Content-Length": "ten"}, None),
+            ({"Content-Length": "-1"}, None),
+            ({"Content-Length": "+1"}, None),
+            ({"Content-Length": "²"}, None),
+            ({"Transfer-Encoding": "chunked"}, None),
+            ({"Transfer-Encoding": "chunked", "Content-Length": "3"}, None),
+        ],
+    )
+    def test_request_body_length(self, headers, expected):
+        assert request_body_length(headers) == expected
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            (None, False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"xyz", "abc"', True),
+            ('"xyz"', False),
+            ("*", True),
+        ],
+        indirect=False,
+    )
+    def test_etag_matches(self, if_none_match, expected):
+        assert etag_matches('"abc"', if_none_match) is expected
+
+    @pytest.mark.parametrize("encoding", ["gzip", "deflate"], indirect=False)
+    @pytest.mark.parametrize("stream", [False, True], indirect=False)
+    def test_compressed_response(self, address_space, host_info, encoding, stream):
+        # Act
+        response = resolve_request(
+            address_space,
+            host_info,
+            "/",
+            stream=stream,
+            headers={"Accept-Encoding": encoding},
+        )
+        if stream:
+            body = b"".join(response.iter_encoded_body())
+        else:
+            body = response.encoded_body()
+        # Assert
+        assert response.status == 200
+        assert response.headers["Content-Encoding"] == encoding
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert len(body) < len(address_space.root_node.to_json())
+        assert decompress(body, encoding).decode() == address_space.root_node.to_json()
+
+    def test_short_response_is_not_compressed(self, address_space, host_info):
+        # Act
+        response = resolve_request(
+            address_space,
+            host_info,
+            "/fixture1/dimmer?VALUE",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        # Assert
+        assert "Content-Encoding" not in response.headers
+        assert json.loads(response.encoded_body()) == {"VALUE": [0.5]}
+
+    def test_etag_differs_per_encoding(self, address_space, host_info):
+        # Act
+        plain = resolve_request(address_space, host_info, "/", headers={})
+        compressed = resolve_request(
+            address_space, host_info, "/", headers={"Accept-Encoding": "gzip"}
+        )
+        # Assert
+        assert plain.headers["ETag"] != compressed.headers["ETag"]
+
+
+def batch_query(paths, attributes=None) -> bytes:
+    query = {"PATHS": paths}
+    if attributes is not None:
+        query["ATTRIBUTES"] = attributes
+    return json.dumps(query).encode()
+
+
+class TestResolveBatchRequest:
+    def test_batch_query_of_values(self, address_space):
+        # Arrange
+        address_space.add_node(
+            OSCPathNode("/write_only", value=1, access=OSCAccess.WRITEONLY_VALUE)
+        )
+        body = batch_query(
+            ["/fixture1/dimmer", "/fixture2/dimmer", "/write_only", "/bogus"],
+            ["VALUE"],
+        )
+        # Act
+        response = resolve_batch_request(address_space, "/", body)
+        # Assert
+        assert response.status == 200
+        assert json.loads(response.body) == {
+            "/fixture1/dimmer": {"VALUE": [0.5]},
+            "/fixture2/dimmer": {"VALUE": [0.5]},
+            "/write_only": {},
+            "/bogus": None,
+        }
+
+    def test_batch_query_of_several_attributes(self, address_space):
+        # Arrange
+        body = batch_query(["/fixture1/dimmer"], ["VALUE", "TYPE", "VALUE"])
+        # Act
+        response = resolve_batch_request(address_space, "/", body)
+        # Assert
+        assert json.loads(response.body) == {
+            "/fixture1/dimmer": {"VALUE": [0.5], "TYPE": "f"}
+        }
+
+    def test_batch_query_of_complete_nodes(self, address_space):
+        # Arrange
+        body = batch_query(["/fixture1", "/fixture1"])
+        # Act
+        response = resolve_batch_request(address_space, "/", body)
+        # Assert
+        assert json.loads(response.body) == {
+            "/fixture1": json.loads(address_space.find_node("/fixture1").to_json())
+        }
+
+    @pytest.mark.parametrize("encoding", ["gzip", "deflate"], indirect=False)
+    def test_batch_query_compressed_response(self, address_space, encoding):
+        # Arrange
+        body = batch_query([f"/fixture{i}/dimmer" for i in range(50)], ["VALUE"])
+        # Act
+        response = resolve_batch_request(
+            address_space, "/", body, {"Accept-Encoding": encoding}
+        )
+        # Assert
+        assert response.headers["Content-Encoding"] == encoding
+        assert len(json.loads(decompress(response.body, encoding))) == 50
+
+    @pytest.mark.parametrize(
+        "path, body, status",
+        [
+            ("/", b"not json", 400),
+            ("/", b"[]", 400),
+            ("/", b'{"ATTRIBUTES": ["VALUE"]}', 400),
+            ("/", b'{"PATHS": "/fixture1"}', 400),
+            ("/", b'{"PATHS": ["/fixture1"], "ATTRIBUTES": ["BOGUS"]}', 400),
+            ("/", b'{"PATHS": ["/fixture1"], "ATTRIBUTES": ["HOST_INFO"]}', 400),
+            ("/fixture1", b'{"PATHS": ["/fixture1"]}', 404),
+        ],
+        indirect=False,
+    )
+    def test_invalid_batch_query(self, address_space, path, body, status):
+        assert resolve_batch_request(address_space, path, body).status == status
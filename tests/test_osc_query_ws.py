@@ -0,0 +1,323 @@
+import base64
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from ipaddress import IPv4Address
+
+import pytest
+import urllib3
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+from pythonoscquery.osc_query_service import OSCQueryService
+from pythonoscquery.osc_query_ws import (
+    DEFAULT_MAX_SEND_RATE,
+    OPCODE_BINARY,
+    OPCODE_CLOSE,
+    OPCODE_PING,
+    OPCODE_PONG,
+    OPCODE_TEXT,
+    OSCQueryWebSocketServer,
+    unmask,
+)
+from pythonoscquery.shared.osc_access import OSCAccess
+from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_path_node import OSCPathNode
+
+TIMEOUT = 2.0
+
+
+@pytest.fixture
+def address_space():
+    address_space = OSCAddressSpace()
+    address_space.add_nodes(
+        [
+            OSCPathNode("/fader/1", value=0.5, access=OSCAccess.READWRITE_VALUE),
+            OSCPathNode("/fader/2", value=0.5, access=OSCAccess.READWRITE_VALUE),
+            OSCPathNode("/display", value="", access=OSCAccess.READWRITE_VALUE),
+        ]
+    )
+    return address_space
+
+
+@pytest.fixture
+def max_send_rate():
+    return DEFAULT_MAX_SEND_RATE
+
+
+@pytest.fixture
+def ws_server(address_space, max_send_rate):
+    server = OSCQueryWebSocketServer(
+        address_space, ("127.0.0.1", 0), max_send_rate=max_send_rate
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+class WebSocketClient:
+    """Minimal WebSocket client for the tests, which sends masked frames as required for clients."""
+
+    def __init__(self, port: int):
+        self.socket = socket.create_connection(("127.0.0.1", port), timeout=TIMEOUT)
+        self.file = self.socket.makefile("rb")
+
+    def handshake(self, key: bytes | None = None) -> bytes:
+        key = key or base64.b64encode(os.urandom(16))
+        self.socket.sendall(
+            b"GET / HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\n"
+            b"Connection: Upgrade\r\nSec-WebSocket-Key: " + key + b"\r\n"
+            b"Sec-WebSocket-Version: 13\r\n\r\n"
+        )
+        response = b""
+        while not response.endswith(b"\r\n\r\n"):
+            response += self.file.readline()
+        return response
+
+    def send(self, opcode: int, payload: bytes, fin: bool = True):
+        mask = os.urandom(4)
+        header = struct.pack("!BB", (0x80 if fin else 0) | opcode, 0x80 | len(payload))
+        self.socket.sendall(header + mask + unmask(payload, mask))
+
+    def send_command(self, command: str, path: str):
+        self.send(
+            OPCODE_TEXT, bytes(json.dumps({"COMMAND": command, "DATA": path}), "utf-8")
+        )
+
+    def receive(self) -> tuple[int, bytes]:
+        first, second = self.file.read(2)
+        length = second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", self.file.read(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", self.file.read(8))
+        return first & 0x0F, self.file.read(length)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+def connect(server: OSCQueryWebSocketServer) -> WebSocketClient:
+    client = WebSocketClient(server.server_address[1])
+    client.handshake()
+    return client
+
+
+@pytest.fixture
+def client(ws_server):
+    client = connect(ws_server)
+    yield client
+    client.close()
+
+
+def wait_for_listeners(server: OSCQueryWebSocketServer, count: int):
+    deadline = time.monotonic() + TIMEOUT
+    while sum(len(c) for c in server._listeners.values()) != count:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestOSCQueryWebSocketServer:
+    def test_handshake(self, ws_server):
+        # Arrange
+        client = WebSocketClient(ws_server.server_address[1])
+        # Act
+        # Example key from RFC 6455
+        response = client.handshake(b"dGhlIHNhbXBsZSBub25jZQ==")
+        client.close()
+        # Assert
+        assert response.startswith(b"HTTP/1.1 101 ")
+        assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n" in response
+
+    def test_plain_http_request_is_rejected(self, ws_server):
+        # Act
+        response = urllib3.request(
+            "GET", f"http://127.0.0.1:{ws_server.server_address[1]}/", retries=False
+        )
+        # Assert
+        assert response.status == 400
+
+    def test_listen_pushes_value_changes(self, ws_server, client, address_space):
+        # Arrange
+        client.send_command("LISTEN", "/fader/1")
+        wait_for_listeners(ws_server, 1)
+        # Act
+        address_space.find_node("/fader/1").value = 0.75
+        opcode, packet = client.receive()
+        # Assert
+        assert opcode == OPCODE_BINARY
+        message = OscMessage(packet)
+        assert message.address == "/fader/1"
+        assert message.params == [0.75]
+
+    def test_only_listened_nodes_are_pushed(self, ws_server, client, address_space):
+        # Arrange
+        client.send_command("LISTEN", "/fader/1")
+        wait_for_listeners(ws_server, 1)
+        # Act
+        address_space.find_node("/fader/2").value = 0.1
+        address_space.find_node("/fader/1").value = 0.2
+        _, packet = client.receive()
+        # Assert
+        assert OscMessage(packet).address == "/fader/1"
+
+    def test_ignore_stops_pushing(self, ws_server, client, address_space):
+        # Arrange
+        node = address_space.find_node("/fader/1")
+        client.send_command("LISTEN", "/fader/1")
+        wait_for_listeners(ws_server, 1)
+        # Act
+        client.send_command("IGNORE", "/fader/1")
+        wait_for_listeners(ws_server, 0)
+        node.value = 0.25
+        # Assert
+        assert node._value_listeners == ()
+        client.socket.settimeout(0.2)
+        with pytest.raises(socket.timeout):
+            client.receive()
+
+    def test_disconnect_removes_listeners(self, ws_server, client, address_space):
+        # Arrange
+        client.send_command("LISTEN", "/fader/1")
+        wait_for_listeners(ws_server, 1)
+        # Act
+        client.close()
+        wait_for_listeners(ws_server, 0)
+        # Assert
+        assert address_space.find_node("/fader/1")._value_listeners == ()
+
+    @pytest.mark.parametrize("max_send_rate", [10])
+    def test_rapid_changes_are_coalesced(self, ws_server, client, address_space):
+        # Arrange
+        node = address_space.find_node("/fader/1")
+        client.send_command("LISTEN", "/fader/1")
+        wait_for_listeners(ws_server, 1)
+        # Act
+        for i in range(1000):
+            node.value = float(i)
+        received = [OscMessage(client.receive()[1]).params]
+        while received[-1] != [999.0]:
+            received.append(OscMessage(client.receive()[1]).params)
+        # Assert
+        # The first change is sent right away, the last one when the send interval has passed
+        assert len(received) <= 3
+
+    @pytest.mark.parametrize("max_send_rate", [10])
+    def test_waiting_changes_are_sent_as_bundle(self, ws_server, client, address_space):
+        # Arrange
+        for path in ("/fader/1", "/fader/2"):
+            client.send_command("LISTEN", path)
+        wait_for_listeners(ws_server, 2)
+        address_space.find_node("/fader/1").value = 0.125
+        client.receive()
+        # Act
+        address_space.find_node("/fader/1").value = 0.25
+        address_space.find_node("/fader/2").value = 0.5
+        address_space.find_node("/fader/1").value = 0.75
+        _, packet = client.receive()
+        # Assert
+        bundle = OscBundle(packet)
+        assert [(m.address, m.params) for m in bundle] == [
+            ("/fader/1", [0.75]),
+            ("/fader/2", [0.5]),
+        ]
+
+    @pytest.mark.parametrize("max_send_rate", [None])
+    def test_slow_client_does_not_stall_others(self, ws_server, client, address_space):
+        # Arrange
+        slow_client = connect(ws_server)
+        node = address_space.find_node("/display")
+        for listening_client in (slow_client, client):
+            listening_client.send_command("LISTEN", "/display")
+        wait_for_listeners(ws_server, 2)
+        # Act
+        # The slow client never reads, so its socket buffers fill up
+        start = time.perf_counter()
+        for i in range(100):
+            node.value = f"{i:03}" + "x" * 100_000
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        received = OscMessage(client.receive()[1]).params
+        while received[0][:3] != "099":
+            received = OscMessage(client.receive()[1]).params
+        slow_client.close()
+        # Assert
+        assert elapsed < 1.0
+
+    def test_fragmented_command(self, ws_server, client):
+        # Arrange
+        command = b'{"COMMAND": "LISTEN", "DATA": "/fader/2"}'
+        # Act
+        client.send(OPCODE_TEXT, command[:10], fin=False)
+        client.send(OPCODE_PING, b"in between")
+        client.send(0x0, command[10:])
+        # Assert
+        assert client.receive() == (OPCODE_PONG, b"in between")
+        wait_for_listeners(ws_server, 1)
+
+    def test_close(self, client):
+        # Act
+        client.send(OPCODE_CLOSE, struct.pack("!H", 1000))
+        # Assert
+        assert client.receive() == (OPCODE_CLOSE, struct.pack("!H", 1000))
+        assert client.file.read() == b""
+
+    def test_shutdown_does_not_wait_for_handshake(self, address_space):
+        # Arrange
+        server = OSCQueryWebSocketServer(address_space, ("127.0.0.1", 0))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        silent_client = socket.create_connection(server.server_address, timeout=TIMEOUT)
+        deadline = time.monotonic() + TIMEOUT
+        while not server._handlers:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        # Act
+        start = time.perf_counter()
+        server.shutdown()
+        elapsed = time.perf_counter() - start
+        thread.join()
+        silent_client.close()
+        # Assert
+        assert elapsed < 1.0
+        assert not server._handlers
+
+    def test_unmasked_frame_closes_connection(self, client):
+        # Act
+        client.socket.sendall(struct.pack("!BB", 0x80 | OPCODE_TEXT, 0))
+        # Assert
+        assert client.receive() == (OPCODE_CLOSE, struct.pack("!H", 1002))
+
+
+class TestOSCQueryServiceWebSocket:
+    def test_host_info_announces_websocket(self, address_space):
+        # Arrange
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            ws_port = s.getsockname()[1]
+        service = OSCQueryService(
+            address_space,
+            "Unit test server",
+            8083,
+            8083,
+            IPv4Address("127.0.0.1"),
+            ws_port=ws_port,
+        )
+        service.start()
+        # Act
+        host_info = urllib3.request("GET", "http://127.0.0.1:8083/?HOST_INFO").json()
+        client = WebSocketClient(ws_port)
+        response = client.handshake()
+        client.close()
+        service.stop()
+        # Assert
+        assert host_info["WS_IP"] == "127.0.0.1"
+        assert host_info["WS_PORT"] == ws_port
+        assert host_info["EXTENSIONS"]["LISTEN"] is True
+        assert response.startswith(b"HTTP/1.1 101 ")
@@ -1,11 +1,21 @@
+import http.client
+import json
+import socket
+import threading
 from ipaddress import IPv4Address
 
 import pytest
 import urllib3
 
-from pythonoscquery.osc_query_service import OSCQueryService
+from pythonoscquery.osc_query_async_server import OSCQueryAsyncHTTPServer
+from pythonoscquery.osc_query_service import (
+    OSCQueryHTTPHandler,
+    OSCQueryHTTPServer,
+    OSCQueryService,
+)
 from pythonoscquery.shared.osc_access import OSCAccess
 from pythonoscquery.shared.osc_address_space import OSCAddressSpace
+from pythonoscquery.shared.osc_host_info import OSCHostInfo
 from pythonoscquery.shared.osc_path_node import OSCPathNode
 
 
@@ -145,3 +155,235 @@ class TestOSCQueryService:
         status = response.status
         # Assert 7
         assert status == 204
+
+    def test_query_streamed(self, address_space, simple_node):
+        # Arrange
+        server = OSCQueryService(
+            address_space,
+            "Unit test streaming server",
+            8081,
+            8081,
+            IPv4Address("127.0.0.1"),
+            stream_responses=True,
+        )
+        server.start()
+        address_space.add_nodes(
+            [simple_node]
+            + [
+                OSCPathNode(
+                    f"/group/channel{i}", value=0.0, access=OSCAccess.READONLY_VALUE
+                )
+                for i in range(2000)
+            ]
+        )
+        # Act
+        response = urllib3.request("GET", "http://127.0.0.1:8081/")
+        # Assert
+        assert response.status == 200
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.json() == json.loads(address_space.root_node.to_json())
+
+        # Act 2
+        response = urllib3.request("GET", "http://127.0.0.1:8081/test?VALUE")
+        # Assert 2
+        assert response.status == 200
+        assert response.json() == {"VALUE": [99]}
+
+        server.stop()
+
+    def test_query_asyncio(self, address_space, simple_node):
+        # Arrange
+        server = OSCQueryService(
+            address_space,
+            "Unit test asyncio server",
+            8082,
+            8082,
+            IPv4Address("127.0.0.1"),
+            use_asyncio=True,
+        )
+        server.start()
+        address_space.add_node(simple_node)
+        # Act
+        response = urllib3.request("GET", "http://127.0.0.1:8082/test?VALUE")
+        # Assert
+        assert isinstance(server.http_server, OSCQueryAsyncHTTPServer)
+        assert response.status == 200
+        assert response.json() == {"VALUE": [99]}
+
+        server.stop()
+
+
+@pytest.fixture
+def http_server(address_space, simple_node, write_only_node):
+    address_space.add_nodes([simple_node, write_only_node])
+    server = OSCQueryHTTPServer(
+        address_space,
+        OSCHostInfo("Unit test server", {"VALUE": True}),
+        ("127.0.0.1", 0),
+        OSCQueryHTTPHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestOSCQueryHTTPHandler:
+    def test_connection_is_kept_alive(self, http_server, address_space):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        # Act
+        responses = []
+        for path in ("/test?VALUE", "/write_only?VALUE", "/bogus", "/"):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            responses.append((response.status, response.read()))
+        # Assert
+        assert responses == [
+            (200, b'{"VALUE": [99]}'),
+            (204, b""),
+            (404, b"OSC Path not found"),
+            (200, address_space.root_node.to_json().encode()),
+        ]
+        connection.close()
+
+    def test_streamed_response_keeps_connection_alive(self, http_server, address_space):
+        # Arrange
+        http_server.stream_responses = True
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        # Act
+        bodies = []
+        for _ in range(2):
+            connection.request("GET", "/")
+            response = connection.getresponse()
+            assert response.getheader("Transfer-Encoding") == "chunked"
+            bodies.append(response.read())
+        # Assert
+        assert bodies == [address_space.root_node.to_json().encode()] * 2
+        connection.close()
+
+    @pytest.mark.parametrize(
+        "request_version, connection_header, expected",
+        [
+            ("HTTP/1.1", None, None),
+            ("HTTP/1.1", "close", "close"),
+            ("HTTP/1.0", None, "close"),
+            ("HTTP/1.0", "keep-alive", "keep-alive"),
+        ],
+        indirect=False,
+    )
+    def test_connection_header(
+        self, http_server, request_version, connection_header, expected
+    ):
+        # Arrange
+        request = f"GET /test?VALUE {request_version}\r\n"
+        if connection_header:
+            request += f"Connection: {connection_header}\r\n"
+        # Act
+        with socket.create_connection(http_server.server_address) as sock:
+            sock.sendall(request.encode() + b"\r\n")
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+        # Assert
+        assert response.status == 200
+        assert response.getheader("Connection") == expected
+
+    def test_not_modified_when_etag_matches(self, http_server, address_space):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        response.read()
+        etag = response.getheader("ETag")
+        # Act
+        connection.request("GET", "/", headers={"If-None-Match": etag})
+        response = connection.getresponse()
+        # Assert
+        assert etag is not None
+        assert response.status == 304
+        assert response.read() == b""
+        assert response.getheader("ETag") == etag
+        connection.close()
+
+    def test_etag_changes_when_subtree_changes(self, http_server, address_space):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        response.read()
+        etag = response.getheader("ETag")
+        # Act
+        address_space.find_node("/test").value = 100
+        connection.request("GET", "/", headers={"If-None-Match": etag})
+        response = connection.getresponse()
+        # Assert
+        assert response.status == 200
+        assert json.loads(response.read())["CONTENTS"]["test"]["VALUE"] == [100]
+        assert response.getheader("ETag") != etag
+        connection.close()
+
+    def test_etag_differs_per_attribute(self, http_server):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        etags = []
+        # Act
+        for path in ("/test", "/test?VALUE", "/test?TYPE"):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            etags.append(response.getheader("ETag"))
+        # Assert
+        assert len(set(etags)) == 3
+        connection.close()
+
+    def test_batch_query(self, http_server):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        body = json.dumps({"PATHS": ["/test", "/bogus"], "ATTRIBUTES": ["VALUE"]})
+        # Act
+        responses = []
+        for _ in range(2):
+            connection.request("POST", "/", body)
+            response = connection.getresponse()
+            responses.append((response.status, json.loads(response.read())))
+        # Assert
+        assert responses == [(200, {"/test": {"VALUE": [99]}, "/bogus": None})] * 2
+        connection.close()
+
+    def test_too_large_batch_query_closes_connection(self, http_server):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address)
+        # Act
+        connection.putrequest("POST", "/")
+        connection.putheader("Content-Length", str(64 * 1024 * 1024))
+        connection.endheaders()
+        response = connection.getresponse()
+        # Assert
+        assert response.status == 413
+        assert response.getheader("Connection") == "close"
+        connection.close()
+
+    @pytest.mark.parametrize(
+        "header, value",
+        [
+            ("Content-Length", "ten"),
+            ("Content-Length", "-1"),
+            ("Transfer-Encoding", "chunked"),
+        ],
+    )
+    def test_batch_query_without_valid_length_closes_connection(
+        self, http_server, header, value
+    ):
+        # Arrange
+        connection = http.client.HTTPConnection(*http_server.server_address, timeout=5)
+        # Act
+        connection.putrequest("POST", "/")
+        connection.putheader(header, value)
+        connection.endheaders()
+        response = connection.getresponse()
+        # Assert
+        assert response.status == 400
+        assert response.getheader("Connection") == "close"
+        connection.close()
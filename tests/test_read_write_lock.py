@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from pythonoscquery.shared.read_write_lock import ReadWriteLock
+
+
+@pytest.fixture
+def lock():
+    return ReadWriteLock()
+
+
+def run_in_thread(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestReadWriteLock:
+    def test_many_readers_hold_lock_at_once(self, lock):
+        # Arrange
+        number_of_readers = 5
+        barrier = threading.Barrier(number_of_readers, timeout=5)
+
+        def reader():
+            with lock.read_lock:
+                # Only passes if all readers are inside the lock at the same time
+                barrier.wait()
+
+        # Act
+        threads = [run_in_thread(reader) for _ in range(number_of_readers)]
+        for thread in threads:
+            thread.join(timeout=5)
+        # Assert
+        assert not barrier.broken
+
+    def test_writer_waits_for_readers(self, lock):
+        # Arrange
+        events = []
+        lock.acquire_read()
+
+        def writer():
+            with lock:
+                events.append("write")
+
+        # Act
+        thread = run_in_thread(writer)
+        time.sleep(0.05)
+        events.append("read done")
+        lock.release_read()
+        thread.join(timeout=5)
+        # Assert
+        assert events == ["read done", "write"]
+
+    def test_reader_waits_for_writer(self, lock):
+        # Arrange
+        events = []
+        lock.acquire_write()
+
+        def reader():
+            with lock.read_lock:
+                events.append("read")
+
+        # Act
+        thread = run_in_thread(reader)
+        time.sleep(0.05)
+        events.append("write done")
+        lock.release_write()
+        thread.join(timeout=5)
+        # Assert
+        assert events == ["write done", "read"]
+
+    def test_waiting_writer_is_preferred_over_new_readers(self, lock):
+        # Arrange
+        events = []
+        lock.acquire_read()
+
+        def writer():
+            with lock.write_lock:
+                events.append("write")
+
+        def reader():
+            with lock.read_lock:
+                events.append("read")
+
+        # Act
+        writer_thread = run_in_thread(writer)
+        time.sleep(0.05)
+        reader_thread = run_in_thread(reader)
+        time.sleep(0.05)
+        lock.release_read()
+        writer_thread.join(timeout=5)
+        reader_thread.join(timeout=5)
+        # Assert
+        assert events == ["write", "read"]
+
+    def test_release_without_acquire_raises(self, lock):
+        with pytest.raises(RuntimeError):
+            lock.release_read()
+        with pytest.raises(RuntimeError):
+            lock.release_write()